@@ -1,5 +1,9 @@
 """
 ASGI config for ProjectHelper project.
+
+Запускается gunicorn с воркерами uvicorn (SERVER_MODE=asgi). Асинхронные
+view из projects/async_views.py выполняются прямо в цикле событий воркера. Потоковые ответы синхронных view
+(выгрузки, архивы, файлы) отдаются по частям через ASGIStreamingMiddleware.
 """
 
 import os
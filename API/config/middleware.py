@@ -0,0 +1,192 @@
+"""
+Middleware уровня проекта.
+"""
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него работаем только с gzip
+    brotli = None
+
+
+def parse_accept_encoding(header):
+    """Разбирает Accept-Encoding в словарь {кодировка: q}"""
+    encodings = {}
+    for item in header.split(','):
+        parts = [part.strip() for part in item.split(';')]
+        coding = parts[0].lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        encodings[coding] = q
+    return encodings
+
+
+class GzipCompressor:
+    """Сжатие gzip через zlib (поддерживает потоковый режим)"""
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def _compressobj(self):
+        # wbits=31 - формат gzip с заголовком и контрольной суммой
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        compressor = self._compressobj()
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_stream(self, chunks):
+        compressor = self._compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    async def acompress_stream(self, chunks):
+        compressor = self._compressobj()
+        async for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class BrotliCompressor:
+    """Сжатие brotli (используется, если установлен пакет brotli)"""
+    encoding = 'br'
+
+    def __init__(self, quality):
+        self.quality = quality
+
+    def compress(self, data):
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=self.quality)
+
+    def compress_stream(self, chunks):
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=self.quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    async def acompress_stream(self, chunks):
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=self.quality)
+        async for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+def get_compressor(accept_encoding):
+    """Выбирает алгоритм сжатия по заголовку Accept-Encoding клиента"""
+    accepted = parse_accept_encoding(accept_encoding)
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return BrotliCompressor(settings.API_COMPRESSION_BROTLI_QUALITY)
+    if accepted.get('gzip', accepted.get('*', 0)) > 0:
+        return GzipCompressor(settings.API_COMPRESSION_GZIP_LEVEL)
+    return None
+
+
+class APICompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает ответы API (gzip/brotli по Accept-Encoding клиента).
+
+    Сжимаются только ответы по префиксам API_COMPRESSION_PATHS с текстовым
+    типом содержимого и размером не меньше API_COMPRESSION_MIN_SIZE.
+    Потоковые ответы сжимаются по частям без буферизации.
+    """
+
+    def process_response(self, request, response):
+        if not settings.API_COMPRESSION_ENABLED:
+            return response
+
+        if not request.path.startswith(tuple(settings.API_COMPRESSION_PATHS)):
+            return response
+
+        # Уже сжатые ответы и ответы без тела не трогаем
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+
+        # Файлы с поддержкой Range отдаются как есть: сжатие сломает диапазоны байт
+        if response.has_header('Accept-Ranges') or response.has_header('X-Accel-Redirect'):
+            return response
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in settings.API_COMPRESSION_CONTENT_TYPES:
+            return response
+
+        if not response.streaming and len(response.content) < settings.API_COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        compressor = get_compressor(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if compressor is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compressor.acompress_stream(response.streaming_content)
+            else:
+                response.streaming_content = compressor.compress_stream(response.streaming_content)
+            # Размер сжатого потока заранее неизвестен
+            del response.headers['Content-Length']
+        else:
+            compressed_content = compressor.compress(response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Сильный ETag после сжатия становится слабым (RFC 9110, 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = compressor.encoding
+
+        return response
+
+
+async def iterate_in_thread(chunks):
+    """Асинхронный итератор по синхронному: каждая часть читается отдельным вызовом в потоке"""
+    chunks = iter(chunks)
+    # thread_sensitive: генераторы выгрузок читают базу в том же потоке, что и view
+    read_chunk = sync_to_async(next)
+    while True:
+        chunk = await read_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ASGIStreamingMiddleware(MiddlewareMixin):
+    """
+    Отдает синхронные потоковые ответы под ASGI по частям.
+
+    Django 4.2 под ASGI читает синхронный итератор StreamingHttpResponse
+    целиком (sync_to_async(list)) и только потом отправляет ответ: архив
+    проекта, выгрузка проектов и файлы из локального хранилища оказывались бы
+    в памяти воркера. Middleware заменяет итератор асинхронным; закрытие
+    исходного итератора и файла остается за response.close().
+    """
+
+    def process_response(self, request, response):
+        if isinstance(request, ASGIRequest) and response.streaming and not response.is_async:
+            response.streaming_content = iterate_in_thread(response.streaming_content)
+        return response
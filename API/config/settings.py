@@ -46,10 +46,14 @@ INSTALLED_APPS = [
     # Local apps
     'projects',
     'users',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    # Первым: обрабатывает ответ последним, уже после сжатия
+    'config.middleware.ASGIStreamingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.APICompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,6 +95,21 @@ DATABASES = {
 }
 
 
+# Cache
+# Кэш общий для всех процессов и реплик: по умолчанию таблица в базе (manage.py createcachetable),
+# можно RedisCache. Кэш в памяти процесса допускается только с DEBUG (проверка projects.E001)
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'django_cache'),
+    }
+}
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache':
+    # По умолчанию таблица хранит 300 записей - меньше, чем пользователей с кэшем bootstrap
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000'))}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -131,6 +150,88 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Медиафайлы с дедупликацией по содержимому (см. projects/storage.py)
+MEDIA_DEDUPLICATION = os.getenv('MEDIA_DEDUPLICATION', 'True') == 'True'
+
+# Хранилище медиафайлов: local - диск (MEDIA_ROOT), s3 - S3-совместимое
+# хранилище (MinIO, Yandex Object Storage) с прямой загрузкой по подписанным ссылкам
+MEDIA_STORAGE = os.getenv('MEDIA_STORAGE', 'local')
+S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME', 'projecthelper')
+S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL', '')
+# Адрес хранилища, доступный из браузера (для подписанных ссылок)
+S3_PUBLIC_ENDPOINT_URL = os.getenv('S3_PUBLIC_ENDPOINT_URL', '')
+S3_ACCESS_KEY_ID = os.getenv('S3_ACCESS_KEY_ID', '')
+S3_SECRET_ACCESS_KEY = os.getenv('S3_SECRET_ACCESS_KEY', '')
+S3_REGION_NAME = os.getenv('S3_REGION_NAME', 'us-east-1')
+S3_PRESIGNED_URL_EXPIRES = int(os.getenv('S3_PRESIGNED_URL_EXPIRES', '900'))
+
+if MEDIA_STORAGE == 's3':
+    DEFAULT_STORAGE = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': S3_BUCKET_NAME,
+            'endpoint_url': S3_ENDPOINT_URL or None,
+            'access_key': S3_ACCESS_KEY_ID or None,
+            'secret_key': S3_SECRET_ACCESS_KEY or None,
+            'region_name': S3_REGION_NAME or None,
+            'addressing_style': 'path',
+            'signature_version': 's3v4',
+            'file_overwrite': False,
+            'default_acl': None,
+            'querystring_expire': S3_PRESIGNED_URL_EXPIRES,
+        },
+    }
+else:
+    DEFAULT_STORAGE = {
+        'BACKEND': (
+            'projects.storage.DeduplicatedFileSystemStorage' if MEDIA_DEDUPLICATION
+            else 'django.core.files.storage.FileSystemStorage'
+        ),
+    }
+
+STORAGES = {
+    'default': DEFAULT_STORAGE,
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Раздача файлов проектов только по подписанным ссылкам с проверкой доступа.
+# Если задан MEDIA_ACCEL_REDIRECT_LOCATION, файл отдает nginx (X-Accel-Redirect)
+MEDIA_ACCEL_REDIRECT_LOCATION = os.getenv('MEDIA_ACCEL_REDIRECT_LOCATION', '')
+MEDIA_DOWNLOAD_URL_MAX_AGE = int(os.getenv('MEDIA_DOWNLOAD_URL_MAX_AGE', '3600'))
+MEDIA_DOWNLOAD_CACHE_MAX_AGE = int(os.getenv('MEDIA_DOWNLOAD_CACHE_MAX_AGE', '3600'))
+
+# Очередь фоновых задач (приложение jobs, обработчик: manage.py run_worker)
+JOBS_CONCURRENCY = int(os.getenv('JOBS_CONCURRENCY', '4'))
+JOBS_WORKER_MODE = os.getenv('JOBS_WORKER_MODE', 'thread')
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', '1'))
+JOBS_LEASE_SECONDS = int(os.getenv('JOBS_LEASE_SECONDS', '600'))
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', '5'))
+JOBS_RETRY_BASE_DELAY = int(os.getenv('JOBS_RETRY_BASE_DELAY', '10'))
+JOBS_RETRY_MAX_DELAY = int(os.getenv('JOBS_RETRY_MAX_DELAY', '3600'))
+JOBS_KEEP_DONE_HOURS = int(os.getenv('JOBS_KEEP_DONE_HOURS', '24'))
+
+# Уменьшенные копии аватаров и картинок в карточках (projects/thumbnails.py)
+THUMBNAIL_FORMAT = os.getenv('THUMBNAIL_FORMAT', 'WEBP').upper()
+THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', '80'))
+THUMBNAIL_SIZES = {
+    'avatar': {
+        'small': {'size': (48, 48), 'crop': True},
+        'medium': {'size': (160, 160), 'crop': True},
+    },
+    'card_file': {
+        'preview': {'size': (480, 360)},
+    },
+}
+
+# Загрузка файлов по частям (/api/projects/uploads/)
+# Каталог временных файлов должен быть на том же диске, что и MEDIA_ROOT
+UPLOAD_SESSION_DIR = os.getenv('UPLOAD_SESSION_DIR', str(MEDIA_ROOT / '.uploads'))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', str(2 * 1024 ** 3)))
+UPLOAD_CHUNK_MAX_SIZE = int(os.getenv('UPLOAD_CHUNK_MAX_SIZE', str(8 * 1024 ** 2)))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv('UPLOAD_SESSION_TTL_HOURS', '24'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -169,3 +270,50 @@ SECURE_PROXY_SSL_HEADER = None  # Для HTTP в локальной разраб
 # Ключ для регистрации преподавателей (измените в production!)
 TEACHER_REGISTRATION_KEY = os.getenv('TEACHER_REGISTRATION_KEY', 'teacher-secret-key-change-in-production')
 
+# Сжатие ответов API (gzip, а также brotli, если установлен пакет brotli)
+API_COMPRESSION_ENABLED = os.getenv('API_COMPRESSION_ENABLED', 'True') == 'True'
+API_COMPRESSION_PATHS = ['/api/']
+API_COMPRESSION_MIN_SIZE = int(os.getenv('API_COMPRESSION_MIN_SIZE', '1024'))
+API_COMPRESSION_GZIP_LEVEL = int(os.getenv('API_COMPRESSION_GZIP_LEVEL', '6'))
+API_COMPRESSION_BROTLI_QUALITY = int(os.getenv('API_COMPRESSION_BROTLI_QUALITY', '4'))
+API_COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'text/html',
+    'text/plain',
+    'text/csv',
+    'application/x-ndjson',
+]
+
+# Потоковая выгрузка проектов для преподавателя: строк на одну выборку из курсора
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '500'))
+
+# Импорт списка студентов (/api/projects/teams/import/) и пакетные приглашения в команду
+ROSTER_IMPORT_MAX_ROWS = int(os.getenv('ROSTER_IMPORT_MAX_ROWS', '5000'))
+TEAM_INVITE_MAX_EMAILS = int(os.getenv('TEAM_INVITE_MAX_EMAILS', '100'))
+
+# Письма с кодом активации аккаунтов из импорта списка (по умолчанию выводятся в консоль)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@projecthelper.local')
+# Страница активации аккаунта; в письмо подставляются ?email=...&token=...
+ACCOUNT_CLAIM_URL = os.getenv('ACCOUNT_CLAIM_URL', 'http://localhost/claim')
+
+# Пакетные запросы (/api/batch/)
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '20'))
+BATCH_ALLOWED_PREFIXES = ['/api/projects/', '/api/auth/']
+
+# Время жизни закэшированного ответа bootstrap (секунды)
+BOOTSTRAP_CACHE_TIMEOUT = int(os.getenv('BOOTSTRAP_CACHE_TIMEOUT', '300'))
+
+# Очередь проверки: на сколько минут преподаватель берет работу (claim_next)
+REVIEW_CLAIM_MINUTES = int(os.getenv('REVIEW_CLAIM_MINUTES', '30'))
+
+# Пакетная проверка проектов и этапов (bulk_review): решений в одном запросе
+REVIEW_BULK_MAX_ITEMS = int(os.getenv('REVIEW_BULK_MAX_ITEMS', '100'))
+
+# Пакетные отметки преподавателя (project-checks/batch/, kanban-card-checks/batch/)
+TEACHER_CHECKS_MAX_ITEMS = int(os.getenv('TEACHER_CHECKS_MAX_ITEMS', '500'))
@@ -0,0 +1,79 @@
+import gzip
+import unittest
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .middleware import APICompressionMiddleware, brotli
+
+BODY = b'{"items": [' + b'{"name": "item"},' * 200 + b'{}]}'
+
+
+@override_settings(API_COMPRESSION_ENABLED=True, API_COMPRESSION_MIN_SIZE=1024)
+class APICompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, path='/api/projects/', accept_encoding='gzip, br'):
+        request = self.factory.get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        middleware = APICompressionMiddleware(lambda request: response)
+        return middleware(request)
+
+    def json_response(self, body=BODY, **headers):
+        response = HttpResponse(body, content_type='application/json')
+        for name, value in headers.items():
+            response.headers[name] = value
+        return response
+
+    @unittest.skipIf(brotli is None, 'Нужен пакет brotli')
+    def test_brotli_preferred(self):
+        response = self.process(self.json_response())
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip(self):
+        response = self.process(self.json_response(), accept_encoding='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_no_accepted_encoding(self):
+        response = self.process(self.json_response(), accept_encoding='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, BODY)
+        # Ответ зависит от Accept-Encoding даже без сжатия
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_response_not_compressed(self):
+        response = self.process(self.json_response(b'{"ok": true}'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_outside_api_and_binary_types_not_compressed(self):
+        self.assertFalse(self.process(self.json_response(), path='/admin/').has_header('Content-Encoding'))
+        image = HttpResponse(BODY, content_type='image/png')
+        self.assertFalse(self.process(image).has_header('Content-Encoding'))
+
+    def test_range_and_accel_redirect_not_compressed(self):
+        for header, value in (('Accept-Ranges', 'bytes'), ('X-Accel-Redirect', '/protected/media/report.json')):
+            with self.subTest(header=header):
+                response = self.process(self.json_response(**{header: value}))
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, BODY)
+
+    def test_strong_etag_becomes_weak(self):
+        response = self.process(self.json_response(ETag='"abc"'), accept_encoding='gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        weak = self.process(self.json_response(ETag='W/"abc"'), accept_encoding='gzip')
+        self.assertEqual(weak['ETag'], 'W/"abc"')
+
+    def test_streaming_response(self):
+        response = StreamingHttpResponse(iter([BODY[:100], BODY[100:]]), content_type='text/csv')
+        response = self.process(response, accept_encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), BODY)
+
+    @override_settings(API_COMPRESSION_ENABLED=False)
+    def test_disabled(self):
+        self.assertFalse(self.process(self.json_response()).has_header('Content-Encoding'))
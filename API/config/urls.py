@@ -1,19 +1,24 @@
 """
 URL configuration for ProjectHelper project.
 """
+import os
+
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import BatchView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('users.urls')),
     path('api/projects/', include('projects.urls')),
+    path('api/batch/', BatchView.as_view(), name='batch'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Публично доступны только аватары, остальные файлы - через download-эндпоинты
+    urlpatterns += static(settings.MEDIA_URL + 'avatars/', document_root=os.path.join(settings.MEDIA_ROOT, 'avatars'))
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 
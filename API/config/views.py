@@ -0,0 +1,136 @@
+"""
+Служебные представления уровня проекта.
+"""
+import asyncio
+import json
+import logging
+from contextlib import nullcontext
+from io import BytesIO
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger('django.request')
+
+BATCH_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+# Заголовки внешнего запроса, которые не переносятся во вложенные запросы
+BATCH_SKIPPED_META = (
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_ACCEPT_ENCODING',
+    'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_RANGE',
+)
+
+
+class BatchView(APIView):
+    """
+    Пакетное выполнение запросов к API.
+
+    Принимает {"requests": [{"method", "path", "body"}], "atomic": false}.
+    Запросы выполняются по порядку от имени уже аутентифицированного
+    пользователя. При atomic=true все запросы выполняются в одной транзакции,
+    которая откатывается на первом ответе с ошибкой.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('requests')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'requests должен быть непустым списком'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return Response(
+                {'error': f'Не больше {settings.BATCH_MAX_REQUESTS} запросов в пакете'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        atomic = request.data.get('atomic', False)
+        # Строки "false"/"0" истинны для bool(): принимаем только true/false
+        if not isinstance(atomic, bool):
+            return Response({'error': 'atomic: true или false'}, status=status.HTTP_400_BAD_REQUEST)
+        results = []
+        committed = True
+        with transaction.atomic() if atomic else nullcontext():
+            for item in items:
+                result = self.perform_item(request, item)
+                results.append(result)
+                if atomic and result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    committed = False
+                    break
+
+        return Response({'atomic': atomic, 'committed': committed, 'results': results})
+
+    def perform_item(self, request, item):
+        """Выполняет один вложенный запрос и возвращает его статус и тело"""
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'path обязателен'}}
+
+        method = str(item.get('method', 'GET')).upper()
+        if method not in BATCH_METHODS:
+            return {'status': status.HTTP_405_METHOD_NOT_ALLOWED, 'body': {'error': 'Метод не поддерживается'}}
+
+        path, _, query_string = item['path'].partition('?')
+        if not path.startswith(tuple(settings.BATCH_ALLOWED_PREFIXES)):
+            return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'Путь недоступен для пакетного запроса'}}
+
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return {'status': status.HTTP_404_NOT_FOUND, 'body': {'error': 'Не найдено'}}
+
+        view = match.func
+        if asyncio.iscoroutinefunction(view):
+            # Асинхронные view (/async/) выполняются в этом же потоке и соединении с базой
+            view = async_to_sync(view)
+        subrequest = self.build_subrequest(request, method, path, query_string, item.get('body'))
+        try:
+            response = view(subrequest, *match.args, **match.kwargs)
+            return {'status': response.status_code, 'body': self.get_response_body(response)}
+        except Exception:
+            logger.exception('Ошибка вложенного запроса %s %s', method, path)
+            return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': {'error': 'Внутренняя ошибка сервера'}}
+
+    def build_subrequest(self, request, method, path, query_string, body):
+        """Собирает вложенный запрос с уже известным пользователем"""
+        payload = json.dumps(body).encode() if body is not None else b''
+        environ = {
+            key: value for key, value in request.META.items()
+            if isinstance(value, str) and key not in BATCH_SKIPPED_META
+        }
+        environ.update({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': query_string,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(payload)),
+            'wsgi.input': BytesIO(payload),
+            'wsgi.url_scheme': request.scheme,
+        })
+        subrequest = WSGIRequest(environ)
+        subrequest.user = request.user
+        if hasattr(request._request, 'session'):
+            # Сессия нужна асинхронным view, которые сами определяют пользователя
+            subrequest.session = request._request.session
+        # DRF использует эти атрибуты вместо повторной аутентификации
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+        return subrequest
+
+    def get_response_body(self, response):
+        if hasattr(response, 'data'):
+            return response.data
+        if response.streaming:
+            return None
+        if response.get('Content-Type', '').startswith('application/json'):
+            return json.loads(response.content or b'null')
+        return response.content.decode(response.charset or 'utf-8', errors='replace')
@@ -6,28 +6,31 @@ while ! nc -z db 5432; do
 done
 echo "Database is ready!"
 
-echo "Making migrations..."
-python manage.py makemigrations || echo "No new migrations to make"
+# Подготовка базы и статики: миграции, исправление истории миграций, collectstatic.
+# В конце сохраняется отпечаток, по которому следующие запуски ее пропускают
+prepare() {
+    echo "Making migrations..."
+    python manage.py makemigrations || echo "No new migrations to make"
 
-# Удаляем автоматически созданные миграции для удаления старых моделей (они уже удалены в 0004)
-# Ищем миграции, которые пытаются удалить ProjectChatMessage, ProjectMember, DevelopmentStage, StageHint
-# НЕ удаляем миграцию 0004, так как она создает новые модели
-for file in /app/projects/migrations/000*_remove_*.py; do
-    if [ -f "$file" ]; then
-        filename=$(basename "$file")
-        # Пропускаем миграции 0004 и 0005
-        if [ "$filename" != "0004_remove_old_models_create_new.py" ] && [ "$filename" != "0005_remove_projectchatmessage_author_and_more.py" ]; then
-            if grep -q "projectchatmessage\|projectmember\|developmentstage\|stagehint" "$file" 2>/dev/null; then
-                echo "Removing duplicate migration: $filename"
-                rm -f "$file"
+    # Удаляем автоматически созданные миграции для удаления старых моделей (они уже удалены в 0004)
+    # Ищем миграции, которые пытаются удалить ProjectChatMessage, ProjectMember, DevelopmentStage, StageHint
+    # НЕ удаляем миграцию 0004, так как она создает новые модели
+    for file in /app/projects/migrations/[0-9][0-9][0-9][0-9]_remove_*.py; do
+        if [ -f "$file" ]; then
+            filename=$(basename "$file")
+            # Пропускаем миграции 0004 и 0005
+            if [ "$filename" != "0004_remove_old_models_create_new.py" ] && [ "$filename" != "0005_remove_projectchatmessage_author_and_more.py" ]; then
+                if grep -q "projectchatmessage\|projectmember\|developmentstage\|stagehint" "$file" 2>/dev/null; then
+                    echo "Removing duplicate migration: $filename"
+                    rm -f "$file"
+                fi
             fi
         fi
-    fi
-done
+    done
 
-echo "Applying migrations..."
-# Проверяем состояние базы данных и исправляем несоответствия в истории миграций
-python -c "
+    echo "Applying migrations..."
+    # Проверяем состояние базы данных и исправляем несоответствия в истории миграций
+    python -c "
 import os
 import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -38,16 +41,16 @@ try:
     # Проверяем, существует ли таблица django_migrations
     cursor.execute(\"SELECT 1 FROM information_schema.tables WHERE table_name='django_migrations' LIMIT 1\")
     has_migrations_table = cursor.fetchone()
-    
+
     if has_migrations_table:
         # Проверяем, существует ли таблица django_content_type
         cursor.execute(\"SELECT 1 FROM information_schema.tables WHERE table_name='django_content_type' LIMIT 1\")
         has_content_type = cursor.fetchone()
-        
+
         # Проверяем, есть ли записи о contenttypes в django_migrations
         cursor.execute(\"SELECT COUNT(*) FROM django_migrations WHERE app='contenttypes'\")
         contenttypes_count = cursor.fetchone()[0]
-        
+
         # Если таблицы contenttypes нет, но есть записи о миграциях - очищаем все
         if not has_content_type and contenttypes_count == 0:
             # Проверяем, есть ли другие записи о миграциях
@@ -62,12 +65,58 @@ except Exception as e:
     print(f'Could not check database state: {e}')
 " 2>/dev/null || echo "Could not check database state"
 
-# Применяем все миграции - Django сам определит правильный порядок
-python manage.py migrate || exit 1
+    # Применяем все миграции - Django сам определит правильный порядок
+    python manage.py migrate || exit 1
+    # Таблица общего кэша (CACHE_BACKEND=DatabaseCache)
+    python manage.py createcachetable || exit 1
+
+    echo "Collecting static files..."
+    if python manage.py collectstatic --noinput; then
+        python manage.py startup_fingerprint --save || echo "Could not save startup fingerprint"
+    else
+        echo "Static files collection failed"
+    fi
+}
 
-echo "Collecting static files..."
-python manage.py collectstatic --noinput || echo "Static files collection failed"
+# STARTUP_MODE:
+#   auto    - подготовка только если миграции или статика изменились (по умолчанию)
+#   release - только подготовка, без сервера (одноразовый сервис migrate)
+#   serve   - без подготовки: ждать, пока ее выполнит release, и запустить сервер
+#   legacy  - подготовка при каждом запуске
+case "${STARTUP_MODE:-auto}" in
+  release)
+    prepare
+    exit 0
+    ;;
+  serve)
+    python manage.py startup_fingerprint --wait "${STARTUP_WAIT_TIMEOUT:-300}" || exit 1
+    ;;
+  legacy)
+    prepare
+    ;;
+  *)
+    if python manage.py startup_fingerprint --check; then
+      echo "Migrations and static files are up to date, skipping preparation"
+    else
+      prepare
+    fi
+    ;;
+esac
 
-echo "Starting server..."
-exec python manage.py runserver 0.0.0.0:8000
+# SERVER_MODE: dev - runserver с автоперезагрузкой, wsgi/asgi - gunicorn
+# с несколькими воркерами (настройки в gunicorn.conf.py)
+case "${SERVER_MODE:-dev}" in
+  wsgi)
+    echo "Starting gunicorn (WSGI)..."
+    exec gunicorn config.wsgi:application --config gunicorn.conf.py
+    ;;
+  asgi)
+    echo "Starting gunicorn with uvicorn workers (ASGI)..."
+    exec gunicorn config.asgi:application --config gunicorn.conf.py
+    ;;
+  *)
+    echo "Starting server..."
+    exec python manage.py runserver 0.0.0.0:8000
+    ;;
+esac
 
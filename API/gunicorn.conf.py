@@ -0,0 +1,56 @@
+"""
+Настройки gunicorn для SERVER_MODE=wsgi/asgi (см. entrypoint.sh).
+
+Все параметры задаются переменными окружения GUNICORN_*. Плавный перезапуск
+воркеров без разрыва соединений: kill -HUP <pid мастера>. С
+GUNICORN_PRELOAD=True приложение загружается в мастере один раз до fork
+(меньше памяти, быстрее старт воркеров), но новый код после HUP не
+подхватывается - для этого нужен перезапуск контейнера.
+"""
+import multiprocessing
+import os
+
+
+def env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('true', '1', 'yes')
+
+
+server_mode = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+if server_mode == 'asgi':
+    # Потоки в ASGI-воркере не используются: параллельность дает цикл событий
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    # gthread держит keep-alive соединения, sync закрывает их после каждого ответа
+    worker_class = 'gthread' if threads > 1 else 'sync'
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+# Keep-alive: сколько секунд ждать следующего запроса в том же соединении
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Воркер перезапускается после max_requests запросов (защита от утечек памяти);
+# jitter разносит перезапуски воркеров по времени
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# За nginx: доверяем X-Forwarded-* от прокси
+forwarded_allow_ips = os.getenv('GUNICORN_FORWARDED_ALLOW_IPS', '*')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Соединения с базой, открытые в мастере при preload, воркерам не передаем
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
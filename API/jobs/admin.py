@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'priority', 'run_at', 'attempts', 'max_attempts', 'locked_by', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'key', 'last_error']
+    readonly_fields = ['locked_by', 'locked_until', 'created_at', 'finished_at']
+    actions = ['retry_now']
+
+    @admin.action(description='Повторить сейчас')
+    def retry_now(self, request, queryset):
+        queryset.exclude(status='running').update(
+            status='queued', run_at=timezone.now(), attempts=0, last_error='', finished_at=None
+        )
@@ -0,0 +1,89 @@
+import os
+import signal
+import socket
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connections
+
+from jobs.queue import claim_jobs, execute_job, purge_finished_jobs
+
+# Как часто удалять старые выполненные задачи, секунд
+PURGE_INTERVAL = 3600
+
+
+def init_process():
+    """Инициализация дочернего процесса пула"""
+    django.setup()
+
+
+class Command(BaseCommand):
+    """Обработчик очереди фоновых задач"""
+    help = 'Выполняет задачи из очереди jobs в пуле потоков или процессов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOBS_CONCURRENCY,
+                            help='Сколько задач выполнять одновременно')
+        parser.add_argument('--mode', choices=['thread', 'process'], default=settings.JOBS_WORKER_MODE,
+                            help='Пул потоков (задачи с вводом-выводом) или процессов (задачи на CPU)')
+        parser.add_argument('--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL,
+                            help='Пауза между опросами пустой очереди, секунд')
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить готовые задачи и выйти')
+
+    def handle(self, *args, **options):
+        concurrency = max(options['concurrency'], 1)
+        worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        if options['mode'] == 'process':
+            # Соединения с базой нельзя наследовать в дочерних процессах
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=concurrency, initializer=init_process)
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job')
+
+        self.stdout.write(f'Обработчик {worker_id}: {options["mode"]} x {concurrency}')
+        running = set()
+        last_purge = -PURGE_INTERVAL
+        with executor:
+            while not self.stopping:
+                if time.monotonic() - last_purge > PURGE_INTERVAL:
+                    purge_finished_jobs()
+                    last_purge = time.monotonic()
+
+                free = concurrency - len(running)
+                try:
+                    jobs = claim_jobs(worker_id, free) if free else []
+                except OperationalError as error:
+                    # База недоступна или занята (SQLite): пробуем на следующем опросе
+                    self.stderr.write(f'Не удалось получить задачи: {error}')
+                    jobs = []
+                close_old_connections()
+                for job in jobs:
+                    running.add(executor.submit(execute_job, job.pk))
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                # Ждем освобождения места в пуле (или новых задач на следующем опросе)
+                done, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        self.stderr.write(f'Ошибка обработчика: {future.exception()!r}')
+
+            # Дожидаемся уже начатых задач перед выходом
+            wait(running)
+        self.stdout.write('Обработчик остановлен')
+
+    def stop(self, signum, frame):
+        self.stopping = True
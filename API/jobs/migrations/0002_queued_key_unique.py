@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:35
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_keys(apps, schema_editor):
+    """Из одинаковых задач в очереди оставляем последнюю поставленную (как enqueue)"""
+    job_model = apps.get_model('jobs', 'Job')
+    queued = job_model.objects.filter(status='queued').exclude(key='')
+    duplicates = queued.order_by().values('name', 'key').annotate(total=Count('pk'), last=Max('pk')).filter(total__gt=1)
+    for duplicate in duplicates:
+        queued.filter(name=duplicate['name'], key=duplicate['key']).exclude(pk=duplicate['last']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'queued'), models.Q(('key', ''), _negated=True)), fields=('name', 'key'), name='jobs_job_queued_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Фоновая задача в очереди"""
+    STATUS_CHOICES = [
+        ('queued', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('done', 'Выполнена'),
+        ('failed', 'Ошибка'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='Параметры')
+    key = models.CharField(max_length=200, blank=True, verbose_name='Ключ для замены запланированной задачи')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name='Статус')
+    priority = models.SmallIntegerField(default=0, verbose_name='Приоритет')
+    run_at = models.DateTimeField(default=timezone.now, verbose_name='Выполнить не раньше')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name='Максимум попыток')
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Обработчик')
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name='Занята до')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата завершения')
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ['-priority', 'run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='jobs_job_claim_idx'),
+            models.Index(fields=['name', 'key'], name='jobs_job_key_idx'),
+        ]
+        constraints = [
+            # В очереди не больше одной задачи с тем же именем и ключом (см. enqueue)
+            models.UniqueConstraint(
+                fields=['name', 'key'],
+                condition=models.Q(status='queued') & ~models.Q(key=''),
+                name='jobs_job_queued_key_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
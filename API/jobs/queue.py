@@ -0,0 +1,164 @@
+"""
+Очередь фоновых задач в таблице базы данных.
+
+Задача - функция, зарегистрированная через @task в модуле tasks.py
+приложения. enqueue() добавляет запись в таблицу jobs_job в текущей
+транзакции, поэтому задача не будет выполнена, если транзакция откатится.
+
+Обработчики (manage.py run_worker) забирают задачи через
+SELECT ... FOR UPDATE SKIP LOCKED и помечают их занятыми на JOBS_LEASE_SECONDS.
+Если обработчик упал, по истечении аренды задачу заберет другой, а если
+попытки кончились - она помечается failed (задача, которая роняет
+обработчик, не повторяется бесконечно). Упавшая задача повторяется с
+экспоненциальной задержкой до max_attempts раз.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(name):
+    """Регистрирует функцию как фоновую задачу с именем name"""
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, *, priority=0, run_at=None, delay=None, max_attempts=None, key=''):
+    """
+    Ставит задачу в очередь.
+
+    run_at/delay - выполнить не раньше указанного момента. Если задан key
+    и задача с тем же именем и ключом еще ждет в очереди, она переносится
+    на новый срок вместо создания второй. Вторую такую задачу не даст
+    создать и параллельному запросу уникальный индекс jobs_job_queued_key_uniq.
+    """
+    if name not in registry:
+        raise ValueError(f'Неизвестная задача: {name}')
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    values = {
+        'payload': payload or {},
+        'priority': priority,
+        'run_at': run_at,
+        'max_attempts': max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    }
+    if not key:
+        return Job.objects.create(name=name, **values)
+    while True:
+        with transaction.atomic():
+            # Блокировка не дает обработчику забрать задачу, пока меняется ее срок
+            job = Job.objects.select_for_update().filter(name=name, key=key, status='queued').first()
+            if job is not None:
+                for field, value in values.items():
+                    setattr(job, field, value)
+                job.save(update_fields=list(values))
+                return job
+            try:
+                with transaction.atomic():
+                    return Job.objects.create(name=name, key=key, **values)
+            except IntegrityError:
+                # Такую же задачу только что поставил параллельный запрос - переносим ее
+                continue
+
+
+def claimable_jobs(now):
+    """Задачи, готовые к выполнению, и задачи с истекшей арендой и оставшимися попытками"""
+    return Job.objects.filter(
+        Q(status='queued', run_at__lte=now)
+        | Q(status='running', locked_until__lt=now, attempts__lt=F('max_attempts'))
+    )
+
+
+def fail_exhausted_jobs(now):
+    """Помечает failed задачи с истекшей арендой (обработчик упал), у которых кончились попытки"""
+    return Job.objects.filter(status='running', locked_until__lt=now, attempts__gte=F('max_attempts')).update(
+        status='failed',
+        last_error='Обработчик не завершил задачу до конца аренды',
+        locked_until=None,
+        finished_at=now,
+    )
+
+
+def claim_jobs(worker_id, limit):
+    """Забирает до limit задач для обработчика worker_id"""
+    now = timezone.now()
+    locked_until = now + timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    claimed = []
+    fail_exhausted_jobs(now)
+    with transaction.atomic():
+        # Параллельные обработчики пропускают строки, заблокированные другими.
+        # Там, где SKIP LOCKED нет (SQLite), задачу делит условный UPDATE ниже
+        candidates = list(
+            claimable_jobs(now)
+            .select_for_update(skip_locked=True)
+            .order_by('-priority', 'run_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        for job_id in candidates:
+            updated = claimable_jobs(now).filter(pk=job_id).update(
+                status='running',
+                locked_by=worker_id,
+                locked_until=locked_until,
+                attempts=F('attempts') + 1,
+            )
+            if updated:
+                claimed.append(job_id)
+    return list(Job.objects.filter(pk__in=claimed).order_by('-priority', 'run_at', 'id'))
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед повтором со случайным разбросом"""
+    delay = min(settings.JOBS_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.JOBS_RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def run_job(job):
+    """Выполняет задачу и записывает результат; возвращает True при успехе"""
+    owned = Job.objects.filter(pk=job.pk, locked_by=job.locked_by, status='running')
+    func = registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {job.name} не зарегистрирована')
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Задача %s #%s завершилась ошибкой (попытка %s из %s)',
+                       job.name, job.pk, job.attempts, job.max_attempts, exc_info=True)
+        if job.attempts >= job.max_attempts:
+            owned.update(status='failed', last_error=error, locked_until=None, finished_at=timezone.now())
+        else:
+            owned.update(status='queued', last_error=error, locked_until=None,
+                         run_at=timezone.now() + get_retry_delay(job.attempts))
+        return False
+    owned.update(status='done', locked_until=None, finished_at=timezone.now())
+    return True
+
+
+def execute_job(job_id):
+    """Выполнение задачи в потоке или процессе обработчика"""
+    try:
+        job = Job.objects.get(pk=job_id)
+        return run_job(job)
+    finally:
+        close_old_connections()
+
+
+def purge_finished_jobs():
+    """Удаляет выполненные задачи старше JOBS_KEEP_DONE_HOURS"""
+    deadline = timezone.now() - timedelta(hours=settings.JOBS_KEEP_DONE_HOURS)
+    deleted, _ = Job.objects.filter(status='done', finished_at__lt=deadline).delete()
+    return deleted
@@ -0,0 +1,100 @@
+import threading
+import unittest
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim_jobs, enqueue, run_job, task
+
+calls = []
+
+
+@task('jobs.test_record')
+def record(value=None):
+    calls.append(value)
+
+
+class LeaseTests(TestCase):
+    def expire_lease(self, job):
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+    def test_expired_lease_is_reclaimed(self):
+        job = enqueue('jobs.test_record', max_attempts=2)
+        self.assertEqual([claimed.pk for claimed in claim_jobs('first', 10)], [job.pk])
+        self.assertEqual(claim_jobs('second', 10), [])
+
+        # Обработчик first упал, не завершив задачу
+        self.expire_lease(job)
+        claimed = claim_jobs('second', 10)
+        self.assertEqual([(item.pk, item.locked_by, item.attempts) for item in claimed], [(job.pk, 'second', 2)])
+        self.assertTrue(run_job(claimed[0]))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, 'done')
+
+    def test_expired_lease_without_attempts_fails(self):
+        job = enqueue('jobs.test_record', max_attempts=1)
+        claim_jobs('first', 10)
+        self.expire_lease(job)
+
+        self.assertEqual(claim_jobs('second', 10), [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_until), ('failed', 1, None))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_job_is_retried(self):
+        job = enqueue('jobs.test_record', {'value': 'x', 'unknown': 1}, max_attempts=2)
+        claimed, = claim_jobs('first', 10)
+        self.assertFalse(run_job(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertGreater(job.run_at, timezone.now())
+
+
+class EnqueueKeyTests(TestCase):
+    def test_queued_job_is_rescheduled(self):
+        run_at = timezone.now() + timedelta(hours=1)
+        first = enqueue('jobs.test_record', {'value': 1}, key='task:1')
+        second = enqueue('jobs.test_record', {'value': 2}, key='task:1', run_at=run_at)
+        self.assertEqual(first.pk, second.pk)
+        job = Job.objects.get()
+        self.assertEqual((job.payload, job.run_at), ({'value': 2}, run_at))
+
+    def test_running_job_is_not_replaced(self):
+        first = enqueue('jobs.test_record', key='task:1')
+        claim_jobs('worker', 10)
+        second = enqueue('jobs.test_record', key='task:1')
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.filter(status='queued').count(), 1)
+
+    def test_second_queued_job_is_rejected(self):
+        Job.objects.create(name='jobs.test_record', key='task:1')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.create(name='jobs.test_record', key='task:1')
+        Job.objects.create(name='jobs.test_record')
+        Job.objects.create(name='jobs.test_record')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Нужен PostgreSQL')
+class ConcurrentEnqueueTests(TransactionTestCase):
+    def test_parallel_enqueue_creates_one_job(self):
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def worker(number):
+            try:
+                barrier.wait()
+                enqueue('jobs.test_record', {'value': number}, key='task:1')
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(Job.objects.filter(key='task:1').count(), 1)
@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import (
     Team, TeamMember, Project, ProjectComment, ProjectFile, ProjectCheck,
     Stage, StageComment, Task, KnowledgeBase,
-    KanbanCard, KanbanCardFile, KanbanCardComment, KanbanCardCheck
+    KanbanCard, KanbanCardFile, KanbanCardComment, KanbanCardCheck, UploadSession, StatusTransition
 )
 
 
@@ -105,3 +105,28 @@ class KanbanCardCheckAdmin(admin.ModelAdmin):
     list_display = ['card', 'teacher', 'is_checked', 'updated_at']
     list_filter = ['is_checked', 'updated_at']
     search_fields = ['card__title', 'teacher__email', 'comment']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'mode', 'target', 'target_id', 'size', 'received', 'created_by', 'updated_at']
+    list_filter = ['mode', 'target', 'created_at']
+    search_fields = ['filename', 'created_by__email']
+
+
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ['project', 'entity', 'title', 'from_value', 'to_value', 'actor', 'created_at']
+    list_filter = ['entity', 'to_value', 'created_at']
+    search_fields = ['title', 'project__name', 'actor__email']
+    list_select_related = ['project', 'actor']
+
+    # Журнал только дополняется
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
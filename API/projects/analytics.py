@@ -0,0 +1,230 @@
+"""
+Аналитика потока по журналу смены статусов (StatusTransition).
+
+Переходы читаются через values_list и раскладываются в колонки массивов
+NumPy. Длительности, медианы, p90, гистограммы и пропускная способность по
+неделям считаются векторными операциями (сдвиг, маски, searchsorted,
+bincount) без цикла по строкам журнала; в Python остается только цикл по
+группам (команда, колонка).
+
+Время пребывания в колонке - интервал между соседними переходами карточки
+(для первого перехода - от создания карточки). Ожидание проверки - интервал
+от перехода этапа в submitted до следующего перехода. Пропускная способность -
+задачи, переведенные в completed, за неделю.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .models import KanbanCard, Project, StatusTransition
+
+HOUR = 3600.0
+WEEK = 7 * 24 * HOUR
+
+# Границы корзин гистограмм в часах; последняя корзина открыта справа
+HISTOGRAM_EDGES_HOURS = [0, 1, 4, 12, 24, 48, 72, 168, 336]
+HISTOGRAM_BINS = np.array(HISTOGRAM_EDGES_HOURS + [np.inf]) * HOUR
+
+CARD_COLUMNS = [column for column, _ in KanbanCard.COLUMN_CHOICES]
+
+DEFAULT_WEEKS = 8
+MAX_WEEKS = 52
+
+
+def to_seconds(datetimes):
+    """Unix-время в секундах: datetime с часовым поясом NumPy разбирать не умеет"""
+    return np.fromiter(map(datetime.timestamp, datetimes), dtype=np.float64, count=len(datetimes))
+
+
+def lookup(keys, values, query, missing):
+    """Значения для query по отсортированному массиву keys; missing, если ключа нет"""
+    if not len(keys):
+        return np.full(len(query), missing, dtype=np.result_type(values, type(missing)))
+    found = np.searchsorted(keys, query).clip(max=len(keys) - 1)
+    return np.where(keys[found] == query, values[found], missing)
+
+
+def encode(values, labels):
+    """Номера меток labels для массива строк; -1 для неизвестных"""
+    order = np.argsort(labels)
+    return lookup(np.array(labels)[order], order, values, -1)
+
+
+def load_transitions(entity, field):
+    """Переходы одного типа в виде колонок, отсортированные по объекту и времени"""
+    rows = list(
+        StatusTransition.objects.filter(entity=entity, field=field)
+        .order_by('entity_id', 'created_at', 'id')
+        .values_list('entity_id', 'created_at', 'from_value', 'to_value', 'project_id')
+    )
+    if not rows:
+        return None
+    entity_ids, created, from_values, to_values, project_ids = zip(*rows)
+    entity_ids = np.array(entity_ids, dtype=np.int64)
+    time = to_seconds(created)
+    # Первый переход каждого объекта и время предыдущего перехода того же объекта
+    first = np.ones(len(entity_ids), dtype=bool)
+    first[1:] = entity_ids[1:] != entity_ids[:-1]
+    previous = np.empty_like(time)
+    previous[1:] = time[:-1]
+    previous[first] = np.nan
+    return {
+        'entity_id': entity_ids,
+        'time': time,
+        'previous': previous,
+        'first': first,
+        'from': np.array(from_values),
+        'to': np.array(to_values),
+        'project_id': np.array(project_ids, dtype=np.int64),
+    }
+
+
+class Teams:
+    """Команды (по названию) и индекс команды для каждого проекта"""
+
+    def __init__(self):
+        rows = list(Project.objects.order_by('id').values_list('id', 'team_id', 'team__name'))
+        self.names = {team_id: name for _, team_id, name in rows}
+        self.team_ids = sorted(self.names, key=lambda team_id: (self.names[team_id], team_id))
+        position = {team_id: index for index, team_id in enumerate(self.team_ids)}
+        self.project_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.project_team = np.array([position[row[1]] for row in rows], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.team_ids)
+
+    def index(self, project_ids):
+        """Индексы команд для массива id проектов; -1 для удаленных проектов"""
+        return lookup(self.project_ids, self.project_team, project_ids, -1)
+
+    def describe(self, index):
+        team_id = self.team_ids[index]
+        return {'team_id': team_id, 'team_name': self.names[team_id]}
+
+
+def distribution(seconds):
+    """Число, медиана, p90 (часы) и гистограмма по HISTOGRAM_EDGES_HOURS"""
+    if not len(seconds):
+        return {'count': 0, 'median': None, 'p90': None, 'histogram': [0] * len(HISTOGRAM_EDGES_HOURS)}
+    median, p90 = np.percentile(seconds, [50, 90]) / HOUR
+    counts, _ = np.histogram(seconds, bins=HISTOGRAM_BINS)
+    return {
+        'count': int(len(seconds)),
+        'median': round(float(median), 1),
+        'p90': round(float(p90), 1),
+        'histogram': counts.tolist(),
+    }
+
+
+def grouped_distributions(keys, seconds):
+    """Распределения по группам: одна сортировка по ключу, затем срезы"""
+    order = np.argsort(keys, kind='stable')
+    keys, seconds = keys[order], seconds[order]
+    groups, starts = np.unique(keys, return_index=True)
+    ends = np.append(starts[1:], len(keys))
+    return {
+        int(group): distribution(seconds[start:end])
+        for group, start, end in zip(groups, starts, ends)
+    }
+
+
+def card_column_time(teams):
+    """Сколько карточки находятся в каждой колонке: по всем командам и по каждой"""
+    columns = len(CARD_COLUMNS)
+    durations = np.empty(0)
+    team_index = column_index = np.empty(0, dtype=np.int64)
+    data = load_transitions('card', 'column')
+    if data is not None:
+        # Для первого перехода карточки интервал начинается с ее создания
+        cards = list(KanbanCard.objects.order_by('id').values_list('id', 'created_at'))
+        card_ids = np.array([card[0] for card in cards], dtype=np.int64)
+        card_created = to_seconds([card[1] for card in cards])
+        previous = data['previous'].copy()
+        previous[data['first']] = lookup(card_ids, card_created, data['entity_id'][data['first']], np.nan)
+
+        durations = data['time'] - previous
+        column_index = encode(data['from'], CARD_COLUMNS)
+        team_index = teams.index(data['project_id'])
+        # NaN: карточка удалена; отрицательные интервалы - перенос времени записей
+        valid = (durations >= 0) & (column_index >= 0) & (team_index >= 0)
+        durations, team_index, column_index = durations[valid], team_index[valid], column_index[valid]
+
+    cohort = grouped_distributions(column_index, durations)
+    by_team = grouped_distributions(team_index * columns + column_index, durations)
+    empty = distribution(durations[:0])
+    return {
+        'cohort': {column: cohort.get(index, empty) for index, column in enumerate(CARD_COLUMNS)},
+        'teams': [
+            dict(teams.describe(team), columns={
+                column: by_team.get(team * columns + index, empty) for index, column in enumerate(CARD_COLUMNS)
+            })
+            for team in range(len(teams))
+        ],
+    }
+
+
+def stage_review_wait(teams, now):
+    """Сколько этапы ждут проверки в submitted: завершенные ожидания и текущие"""
+    waits = pending = np.empty(0)
+    team_index = np.empty(0, dtype=np.int64)
+    data = load_transitions('stage', 'status')
+    if data is not None:
+        reviewed = ~data['first'] & (data['from'] == 'submitted')
+        waits = (data['time'] - data['previous'])[reviewed]
+        team_index = teams.index(data['project_id'][reviewed])
+        # Последний переход этапа - в submitted: этап ждет проверки сейчас
+        last = np.ones(len(data['first']), dtype=bool)
+        last[:-1] = data['first'][1:]
+        pending = now.timestamp() - data['time'][last & (data['to'] == 'submitted')]
+
+    known = team_index >= 0
+    by_team = grouped_distributions(team_index[known], waits[known])
+    empty = distribution(waits[:0])
+    return {
+        'cohort': distribution(waits),
+        'pending': distribution(pending),
+        'teams': [dict(teams.describe(team), **by_team.get(team, empty)) for team in range(len(teams))],
+    }
+
+
+def throughput(teams, now, weeks):
+    """Выполненные задачи по неделям (с понедельника) для каждой команды и всех вместе"""
+    today = timezone.localdate(now)
+    first_week = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    start = timezone.make_aware(datetime.combine(first_week, datetime.min.time())).timestamp()
+
+    counts = np.zeros((len(teams), weeks), dtype=np.int64)
+    data = load_transitions('task', 'status')
+    if data is not None and len(teams):
+        done = (data['to'] == 'completed') & (data['time'] >= start) & (data['time'] <= now.timestamp())
+        week_index = ((data['time'][done] - start) // WEEK).astype(np.int64)
+        team_index = teams.index(data['project_id'][done])
+        known = team_index >= 0
+        counts = np.bincount(
+            team_index[known] * weeks + week_index[known], minlength=len(teams) * weeks
+        ).reshape(len(teams), weeks)
+
+    per_team_week = counts.ravel()
+    return {
+        'weeks': [(first_week + timedelta(weeks=week)).isoformat() for week in range(weeks)],
+        'cohort': counts.sum(axis=0).tolist(),
+        'per_team_week': {
+            'median': round(float(np.median(per_team_week)), 1) if len(per_team_week) else None,
+            'p90': round(float(np.percentile(per_team_week, 90)), 1) if len(per_team_week) else None,
+        },
+        'teams': [dict(teams.describe(team), counts=counts[team].tolist()) for team in range(len(teams))],
+    }
+
+
+def flow_analytics(weeks=DEFAULT_WEEKS):
+    """Полный отчет по потоку для панели преподавателя"""
+    now = timezone.now()
+    teams = Teams()
+    return {
+        'generated_at': now,
+        'histogram_edges_hours': HISTOGRAM_EDGES_HOURS,
+        'card_column_time': card_column_time(teams),
+        'stage_review_wait': stage_review_wait(teams, now),
+        'throughput': throughput(teams, now, weeks),
+    }
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class ProjectsConfig(AppConfig):
@@ -6,6 +7,7 @@ class ProjectsConfig(AppConfig):
     name = 'projects'
     verbose_name = 'Проекты'
 
-
-
-
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .cache import check_shared_cache
+        checks.register(check_shared_cache, checks.Tags.caches)
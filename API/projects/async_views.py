@@ -0,0 +1,425 @@
+"""
+Асинхронные варианты основных эндпоинтов чтения для работы под ASGI (SERVER_MODE=asgi).
+
+Запросы к базе идут через асинхронный ORM Django (aget, acount, async for),
+поэтому воркер uvicorn, пока ждет базу или медленного клиента, обслуживает
+другие запросы, а не держит поток на каждый запрос.
+
+DRF не поддерживает асинхронные view, а его сериализаторы сами обращаются к
+базе (count и exists у связей), поэтому ответы собираются здесь из .values()
+фиксированным числом запросов в том же формате, что и у синхронных
+эндпоинтов. ?format=normalized и ETag эти варианты не поддерживают.
+"""
+from collections import defaultdict
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user, get_user_model
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .media import build_download_url
+from .models import (
+    Project, ProjectComment, ProjectFile, ProjectCheck, Stage, StageComment, Task, TeamMember,
+    KnowledgeBase, KanbanCard, KanbanCardFile, KanbanCardComment, KanbanCardCheck,
+)
+from .progress import PROGRESS_FIELDS
+
+User = get_user_model()
+
+# Даты в том же формате, что и у сериализаторов DRF
+datetime_field = serializers.DateTimeField()
+
+USER_SHORT_FIELDS = ['id', 'email', 'first_name', 'last_name', 'avatar', 'thumbnails']
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+
+def error_response(message, status):
+    return json_response({'error': message}, status=status)
+
+
+def is_teacher(user):
+    return user.is_staff or getattr(user, 'is_teacher', False)
+
+
+async def get_request_user(request):
+    """Пользователь по заголовку Authorization: Token ... (как TokenAuthentication) или по сессии"""
+    auth = request.headers.get('Authorization', '').split()
+    if auth and auth[0].lower() == 'token':
+        if len(auth) != 2:
+            return None
+        token = await Token.objects.select_related('user').filter(key=auth[1]).afirst()
+        if token is None or not token.user.is_active:
+            return None
+        return token.user
+    user = await sync_to_async(get_user)(request)
+    return user if user.is_authenticated else None
+
+
+def async_api_view(teacher_only=False):
+    """GET-view с проверкой авторизации; пользователь доступен в request.user"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                response = error_response(f'Метод {request.method} не разрешен', 405)
+                response['Allow'] = 'GET, HEAD'
+                return response
+            user = await get_request_user(request)
+            if user is None:
+                return error_response('Учетные данные не были предоставлены', 401)
+            if teacher_only and not is_teacher(user):
+                return error_response('Доступно только преподавателям', 403)
+            # Подменяем ленивый request.user, чтобы синхронный код (подписи ссылок) не ходил в базу
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def represent(value):
+    if isinstance(value, datetime):
+        return datetime_field.to_representation(value)
+    return value
+
+
+def serialize_row(row, fields):
+    return {field: represent(row[field]) for field in fields}
+
+
+def absolute_file_url(request, name):
+    """Ссылка на файл из хранилища, как у FileField в DRF"""
+    if not name:
+        return None
+    return request.build_absolute_uri(default_storage.url(name))
+
+
+def serialize_short_user(request, row):
+    sizes = (row['thumbnails'] or {}).get('sizes', {})
+    return {
+        'id': row['id'],
+        'email': row['email'],
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'avatar': absolute_file_url(request, row['avatar']),
+        'avatar_thumbnails': {size_name: absolute_file_url(request, name) for size_name, name in sizes.items()},
+    }
+
+
+async def fetch_users(request, ids):
+    """Краткие данные пользователей одним запросом: {id: данные}"""
+    ids = {pk for pk in ids if pk}
+    if not ids:
+        return {}
+    return {
+        row['id']: serialize_short_user(request, row)
+        async for row in User.objects.filter(pk__in=ids).values(*USER_SHORT_FIELDS)
+    }
+
+
+async def fetch_grouped(queryset, parent_field, fields):
+    """Строки queryset.values(...), сгруппированные по родителю: {id родителя: [строки]}"""
+    groups = defaultdict(list)
+    async for row in queryset.values(parent_field, *fields):
+        groups[row[parent_field]].append(row)
+    return groups
+
+
+def collect_ids(groups, *fields):
+    return {row[field] for rows in groups.values() for row in rows for field in fields}
+
+
+async def paginate(request, queryset):
+    """Постраничный вывод как у PageNumberPagination; возвращает (срез, обертка ответа) или (None, ошибка)"""
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 0
+    count = await queryset.acount()
+    pages = max((count + page_size - 1) // page_size, 1)
+    if not 1 <= page <= pages:
+        return None, error_response('Неверная страница', 404)
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if page < pages else None
+    if page <= 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+
+    def wrap(results):
+        return {'count': count, 'next': next_url, 'previous': previous_url, 'results': results}
+
+    offset = (page - 1) * page_size
+    return queryset[offset:offset + page_size], wrap
+
+
+@async_api_view()
+async def current_user(request):
+    """Профиль текущего пользователя (как /api/auth/users/me/)"""
+    user = request.user
+    profile = serialize_short_user(request, {field: getattr(user, field) for field in USER_SHORT_FIELDS})
+    profile.update({
+        'username': user.username,
+        'date_joined': represent(user.date_joined),
+        'is_staff': user.is_staff,
+    })
+    return json_response(profile)
+
+
+KNOWLEDGE_BASE_FIELDS = ['id', 'section', 'title', 'content', 'order', 'created_at', 'updated_at']
+
+
+@async_api_view()
+async def knowledge_base(request):
+    """Материалы базы знаний (как /api/projects/knowledge-base/)"""
+    queryset = KnowledgeBase.objects.all()
+    section = request.GET.get('section')
+    if section:
+        queryset = queryset.filter(section=section)
+    page, wrap = await paginate(request, queryset)
+    if page is None:
+        return wrap
+    rows = [serialize_row(row, KNOWLEDGE_BASE_FIELDS) async for row in page.values(*KNOWLEDGE_BASE_FIELDS)]
+    return json_response(wrap(rows))
+
+
+CARD_FIELDS = ['id', 'title', 'description', 'column', 'order', 'created_at', 'updated_at']
+CARD_FILE_FIELDS = ['id', 'file', 'thumbnails', 'name', 'uploaded_by_id', 'created_at']
+COMMENT_FIELDS = ['id', 'author_id', 'text', 'created_at', 'updated_at']
+CHECK_FIELDS = ['id', 'teacher_id', 'is_checked', 'comment', 'created_at', 'updated_at']
+
+
+def serialize_comment(row, users):
+    return dict(serialize_row(row, ['id', 'text', 'created_at', 'updated_at']), author=users.get(row['author_id']))
+
+
+def serialize_check(row, users, parent_field, parent_id):
+    data = serialize_row(row, ['id', 'is_checked', 'comment', 'created_at', 'updated_at'])
+    data[parent_field] = parent_id
+    data['teacher'] = users.get(row['teacher_id'])
+    return data
+
+
+def serialize_card_file(request, row, users):
+    file_url = build_download_url(request, 'kanban-card-file-download', row['id']) if row['file'] else None
+    sizes = (row['thumbnails'] or {}).get('sizes', {}) if file_url else {}
+    return {
+        'id': row['id'],
+        'card': row['card_id'],
+        'file': absolute_file_url(request, row['file']),
+        'file_url': file_url,
+        'thumbnail_urls': {size_name: f'{file_url}&rendition={size_name}' for size_name in sizes},
+        'name': row['name'],
+        'uploaded_by': users.get(row['uploaded_by_id']),
+        'created_at': represent(row['created_at']),
+    }
+
+
+@async_api_view()
+async def kanban_cards(request):
+    """Снимок канбан-доски: карточки с файлами, комментариями и отметками (как /api/projects/kanban-cards/)"""
+    user = request.user
+    teacher = is_teacher(user)
+    memberships = {
+        row['team_id']: row['role']
+        async for row in TeamMember.objects.filter(user=user, is_confirmed=True).values('team_id', 'role')
+    }
+
+    queryset = KanbanCard.objects.all()
+    project_id = request.GET.get('project')
+    if project_id:
+        if not project_id.isdigit():
+            return error_response('Неверный id проекта', 400)
+        project = await Project.objects.filter(pk=project_id).values('team_id').afirst()
+        if project is None:
+            return error_response('Проект не найден', 404)
+        if not teacher and project['team_id'] not in memberships:
+            return error_response('Нет доступа к этому проекту', 403)
+        queryset = queryset.filter(project_id=project_id)
+    elif not teacher:
+        queryset = queryset.filter(project__team_id__in=list(memberships))
+
+    page, wrap = await paginate(request, queryset)
+    if page is None:
+        return wrap
+    cards = [
+        row async for row in page.values(
+            'project_id', 'project__team_id', 'created_by_id', 'files_count', 'comments_count', *CARD_FIELDS
+        )
+    ]
+    card_ids = [card['id'] for card in cards]
+    files = await fetch_grouped(KanbanCardFile.objects.filter(card_id__in=card_ids), 'card_id', CARD_FILE_FIELDS)
+    comments = await fetch_grouped(KanbanCardComment.objects.filter(card_id__in=card_ids), 'card_id', COMMENT_FIELDS)
+    checks = await fetch_grouped(KanbanCardCheck.objects.filter(card_id__in=card_ids), 'card_id', CHECK_FIELDS)
+    users = await fetch_users(request, (
+        {card['created_by_id'] for card in cards}
+        | collect_ids(files, 'uploaded_by_id')
+        | collect_ids(comments, 'author_id')
+        | collect_ids(checks, 'teacher_id')
+    ))
+
+    results = []
+    for card in cards:
+        role = memberships.get(card['project__team_id'])
+        results.append(dict(
+            serialize_row(card, CARD_FIELDS),
+            project=card['project_id'],
+            created_by=users.get(card['created_by_id']),
+            files=[serialize_card_file(request, row, users) for row in files.get(card['id'], [])],
+            files_count=card['files_count'],
+            comments=[serialize_comment(row, users) for row in comments.get(card['id'], [])],
+            comments_count=card['comments_count'],
+            teacher_checks=[
+                serialize_check(row, users, 'card', card['id']) for row in checks.get(card['id'], [])
+            ],
+            can_edit=role == 'team_leader' or teacher,
+            can_move=role is not None or teacher,
+        ))
+    return json_response(wrap(results))
+
+
+PROJECT_FIELDS = [
+    'id', 'name', 'passport_text', 'description', 'status', 'kanban_column', 'order',
+    'created_at', 'updated_at', 'submitted_at', 'reviewed_at', 'claimed_until',
+]
+PROJECT_FILE_FIELDS = ['id', 'file', 'name', 'uploaded_by_id', 'created_at']
+
+
+@async_api_view(teacher_only=True)
+async def pending_projects(request):
+    """Проекты на проверке (как /api/projects/teacher-dashboard/pending_projects/)"""
+    projects = [
+        row async for row in Project.objects.filter(status='submitted').order_by('-submitted_at').values(
+            'team_id', 'team__name', 'passport', 'created_by_id', 'reviewed_by_id', 'claimed_by_id',
+            'comments_count', 'files_count',
+            *PROGRESS_FIELDS, *PROJECT_FIELDS
+        )
+    ]
+    project_ids = [project['id'] for project in projects]
+    comments = await fetch_grouped(ProjectComment.objects.filter(project_id__in=project_ids), 'project_id', COMMENT_FIELDS)
+    files = await fetch_grouped(ProjectFile.objects.filter(project_id__in=project_ids), 'project_id', PROJECT_FILE_FIELDS)
+    checks = await fetch_grouped(ProjectCheck.objects.filter(project_id__in=project_ids), 'project_id', CHECK_FIELDS)
+    member_teams = {
+        team_id async for team_id in TeamMember.objects.filter(user=request.user).values_list('team_id', flat=True)
+    }
+    users = await fetch_users(request, (
+        {project['created_by_id'] for project in projects}
+        | {project['reviewed_by_id'] for project in projects}
+        | {project['claimed_by_id'] for project in projects}
+        | collect_ids(comments, 'author_id')
+        | collect_ids(files, 'uploaded_by_id')
+        | collect_ids(checks, 'teacher_id')
+    ))
+
+    results = []
+    for project in projects:
+        # Как в ProjectSerializer: править и отправлять могут участники, пока проект в черновике или на доработке
+        editable = project['status'] in ('draft', 'revision') and project['team_id'] in member_teams
+        results.append(dict(
+            serialize_row(project, PROJECT_FIELDS),
+            team=project['team_id'],
+            team_name=project['team__name'],
+            passport=absolute_file_url(request, project['passport']),
+            passport_url=(
+                build_download_url(request, 'project-download-passport', project['id'])
+                if project['passport'] else None
+            ),
+            created_by=users.get(project['created_by_id']),
+            reviewed_by=users.get(project['reviewed_by_id']),
+            claimed_by=users.get(project['claimed_by_id']),
+            comments=[serialize_comment(row, users) for row in comments.get(project['id'], [])],
+            comments_count=project['comments_count'],
+            files=[
+                {
+                    'id': row['id'],
+                    'project': project['id'],
+                    'file': absolute_file_url(request, row['file']),
+                    'file_url': (
+                        build_download_url(request, 'project-file-download', row['id']) if row['file'] else None
+                    ),
+                    'name': row['name'],
+                    'uploaded_by': users.get(row['uploaded_by_id']),
+                    'created_at': represent(row['created_at']),
+                }
+                for row in files.get(project['id'], [])
+            ],
+            files_count=project['files_count'],
+            **{field: project[field] for field in PROGRESS_FIELDS},
+            teacher_checks=[serialize_check(row, users, 'project', project['id']) for row in checks.get(project['id'], [])],
+            can_edit=editable,
+            can_submit=editable,
+        ))
+    return json_response(results)
+
+
+STAGE_FIELDS = [
+    'id', 'name', 'description', 'criteria', 'artifact_description', 'deadline', 'status', 'order',
+    'created_at', 'updated_at', 'submitted_at', 'reviewed_at', 'claimed_until',
+]
+TASK_FIELDS = [
+    'id', 'name', 'description', 'assigned_to_id', 'assigned_by_id', 'deadline', 'is_overdue', 'status', 'blocker',
+    'created_at', 'updated_at', 'completed_at',
+]
+
+
+@async_api_view(teacher_only=True)
+async def pending_stages(request):
+    """Этапы на проверке (как /api/projects/teacher-dashboard/pending_stages/)"""
+    stages = [
+        row async for row in Stage.objects.filter(status='submitted').order_by('-submitted_at').values(
+            'project_id', 'project__team_id', 'artifact', 'reviewed_by_id', 'claimed_by_id',
+            'tasks_count', 'comments_count',
+            *STAGE_FIELDS
+        )
+    ]
+    stage_ids = [stage['id'] for stage in stages]
+    tasks = await fetch_grouped(Task.objects.filter(stage_id__in=stage_ids), 'stage_id', TASK_FIELDS)
+    comments = await fetch_grouped(StageComment.objects.filter(stage_id__in=stage_ids), 'stage_id', COMMENT_FIELDS)
+    member_teams = {
+        team_id async for team_id in TeamMember.objects.filter(user=request.user).values_list('team_id', flat=True)
+    }
+    users = await fetch_users(request, (
+        {stage['reviewed_by_id'] for stage in stages}
+        | {stage['claimed_by_id'] for stage in stages}
+        | collect_ids(tasks, 'assigned_to_id', 'assigned_by_id')
+        | collect_ids(comments, 'author_id')
+    ))
+
+    results = []
+    for stage in stages:
+        results.append(dict(
+            serialize_row(stage, STAGE_FIELDS),
+            project=stage['project_id'],
+            artifact=absolute_file_url(request, stage['artifact']),
+            artifact_url=(
+                build_download_url(request, 'stage-download-artifact', stage['id']) if stage['artifact'] else None
+            ),
+            reviewed_by=users.get(stage['reviewed_by_id']),
+            claimed_by=users.get(stage['claimed_by_id']),
+            tasks=[
+                dict(
+                    serialize_row(row, [field for field in TASK_FIELDS if not field.endswith('_id')]),
+                    stage=stage['id'],
+                    assigned_to=users.get(row['assigned_to_id']),
+                    assigned_by=users.get(row['assigned_by_id']),
+                )
+                for row in tasks.get(stage['id'], [])
+            ],
+            tasks_count=stage['tasks_count'],
+            comments=[serialize_comment(row, users) for row in comments.get(stage['id'], [])],
+            comments_count=stage['comments_count'],
+            can_submit=stage['status'] == 'in_progress' and stage['project__team_id'] in member_teams,
+        ))
+    return json_response(results)
@@ -0,0 +1,76 @@
+"""
+Версии данных для кэширования агрегированных ответов.
+
+У каждого пользователя своя версия данных bootstrap, у преподавателей есть
+еще общая версия (им видны все проекты). Изменение команды, участника,
+проекта или этапа меняет версии только участников затронутых команд и
+преподавательскую, поэтому запись в одной команде не сбрасывает кэш
+остальных пользователей. Версия - время изменения в наносекундах: она
+пишется обычным set и не требует атомарного incr от бэкенда кэша.
+
+Версии должны быть общими для всех процессов и реплик, поэтому кэш в памяти
+процесса (LocMemCache) без DEBUG не допускается (check_shared_cache).
+"""
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import TeamMember
+
+USER_VERSION_KEY = 'projects:data-version:user:{}'
+TEACHERS_VERSION_KEY = 'projects:data-version:teachers'
+
+# Бэкенды, кэш которых не виден другим процессам
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def get_data_version(user_id, is_teacher=False):
+    """Текущая версия данных bootstrap пользователя"""
+    keys = [USER_VERSION_KEY.format(user_id)]
+    if is_teacher:
+        keys.append(TEACHERS_VERSION_KEY)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Начальное значение по времени, чтобы после очистки кэша версии не повторялись;
+            # add не перезаписывает версию, поставленную параллельным изменением
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return ':'.join(str(versions[key]) for key in keys)
+
+
+def bump_data_version(team_ids=(), project_ids=(), user_ids=()):
+    """Меняет версии участников команд team_ids и команд проектов project_ids, user_ids и преподавателей"""
+    user_ids = set(user_ids)
+    if team_ids or project_ids:
+        members = TeamMember.objects.filter(Q(team_id__in=team_ids) | Q(team__projects__in=project_ids))
+        user_ids.update(members.values_list('user_id', flat=True))
+    version = time.time_ns()
+    versions = {USER_VERSION_KEY.format(user_id): version for user_id in user_ids}
+    versions[TEACHERS_VERSION_KEY] = version
+    cache.set_many(versions, timeout=None)
+
+
+def invalidate_data_version(team_ids=(), project_ids=(), user_ids=()):
+    """bump_data_version после фиксации транзакции (откаченные изменения кэш не сбрасывают)"""
+    team_ids, project_ids, user_ids = set(team_ids), set(project_ids), set(user_ids)
+    transaction.on_commit(lambda: bump_data_version(team_ids, project_ids, user_ids))
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Версии данных в кэше одного процесса расходятся между воркерами gunicorn"""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Error(
+        f'Кэш {backend} не общий для процессов: версии данных bootstrap и ETag будут расходиться',
+        hint='Укажите CACHE_BACKEND с общим хранилищем: DatabaseCache (по умолчанию) или RedisCache',
+        id='projects.E001',
+    )]
@@ -0,0 +1,48 @@
+"""
+Отметки преподавателя на проектах и карточках (ProjectCheck, KanbanCardCheck).
+
+Отметка пишется одним INSERT ... ON CONFLICT (проект/карточка, преподаватель)
+DO UPDATE: без предварительного чтения отметки, а двойной клик и параллельные
+запросы не создают дубликатов. Пакетная отметка - тот же запрос на много строк.
+
+Родители проверяются заранее одним запросом (find_missing_parents): внешний
+ключ проверяется только при фиксации транзакции, а внутри пакета /api/batch/
+с atomic это фиксация всего пакета - ошибка стала бы 500 вместо 404.
+"""
+from django.db import transaction
+
+from .models import KanbanCardCheck, ProjectCheck
+
+# Поле связи отметки с проектом или карточкой
+CHECK_LINKS = {
+    ProjectCheck: 'project',
+    KanbanCardCheck: 'card',
+}
+CHECK_FIELDS = ('is_checked', 'comment')
+
+
+def find_missing_parents(model, parent_ids):
+    """id проектов или карточек из parent_ids, которых нет в базе"""
+    parent_model = model._meta.get_field(CHECK_LINKS[model]).related_model
+    existing = set(parent_model.objects.filter(pk__in=parent_ids).values_list('pk', flat=True))
+    return [parent_id for parent_id in parent_ids if parent_id not in existing]
+
+
+def upsert_checks(model, teacher, parent_ids, values):
+    """
+    Ставит отметки teacher на parent_ids одним запросом.
+
+    values - {'is_checked': ..., 'comment': ...}: у существующих отметок
+    меняются только переданные поля. Родители должны существовать
+    (find_missing_parents).
+    """
+    link = CHECK_LINKS[model]
+    rows = [model(**{f'{link}_id': parent_id}, teacher=teacher, **values) for parent_id in parent_ids]
+    with transaction.atomic():
+        model.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=[link, 'teacher'],
+            update_fields=[*values, 'updated_at'],
+        )
+    return len(rows)
@@ -0,0 +1,74 @@
+"""
+Денормализованные счетчики дочерних объектов (comments_count, files_count, tasks_count)
+и сводки выполнения проекта (stages_*, tasks_*).
+
+Сигналы (signals.py) меняют счетчик родителя одним UPDATE с F(): значение
+считается в базе, поэтому параллельные вставки не теряют приращений.
+recount_counters пересчитывает все счетчики одним UPDATE на счетчик.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import (
+    Project, ProjectComment, ProjectFile,
+    Stage, StageComment, Task,
+    KanbanCard, KanbanCardComment, KanbanCardFile,
+)
+
+# Дочерняя модель, поле связи с родителем, родительская модель, поле счетчика
+COUNTERS = [
+    (ProjectComment, 'project', Project, 'comments_count'),
+    (ProjectFile, 'project', Project, 'files_count'),
+    (Task, 'stage', Stage, 'tasks_count'),
+    (StageComment, 'stage', Stage, 'comments_count'),
+    (KanbanCardComment, 'card', KanbanCard, 'comments_count'),
+    (KanbanCardFile, 'card', KanbanCard, 'files_count'),
+]
+
+# Сводка выполнения проекта (projects/progress.py): дочерняя модель, путь к проекту, условие
+PROGRESS_COUNTERS = {
+    'stages_total': (Stage, 'project', Q()),
+    'stages_approved': (Stage, 'project', Q(status='approved')),
+    'tasks_total': (Task, 'stage__project', Q()),
+    'tasks_completed': (Task, 'stage__project', Q(status='completed')),
+    'tasks_overdue': (Task, 'stage__project', Q(is_overdue=True)),
+}
+
+
+def change_counter(parent_model, counter, parent_id, delta):
+    """Атомарно прибавляет delta к счетчику родителя"""
+    if parent_id is not None:
+        parent_model.objects.filter(pk=parent_id).update(**{counter: F(counter) + delta})
+
+
+def actual_count(child_model, link, condition=Q()):
+    """Подзапрос с фактическим числом дочерних объектов для OuterRef('pk')"""
+    counts = (
+        child_model.objects.filter(condition, **{link: OuterRef('pk')})
+        .order_by().values(link).annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def iter_counters():
+    """Все счетчики: родительская модель, поле счетчика, подзапрос с фактическим значением"""
+    for child_model, link, parent_model, counter in COUNTERS:
+        yield parent_model, counter, actual_count(child_model, link)
+    for counter, (child_model, link, condition) in PROGRESS_COUNTERS.items():
+        yield Project, counter, actual_count(child_model, link, condition)
+
+
+def find_mismatches(parent_model, counter, actual):
+    """Число родителей, у которых счетчик расходится с фактическим"""
+    return parent_model.objects.annotate(actual=actual).exclude(**{counter: F('actual')}).count()
+
+
+def recount(parent_model, counter, actual):
+    """Пересчитывает счетчик у всех родителей одним запросом, возвращает число строк"""
+    return parent_model.objects.update(**{counter: actual})
+
+
+def recount_all():
+    """Пересчитывает все счетчики (после bulk_create и правок в обход сигналов)"""
+    for parent_model, counter, actual in iter_counters():
+        recount(parent_model, counter, actual)
@@ -0,0 +1,308 @@
+"""
+Потоковые выгрузки: проект целиком в ZIP и сводка по всем проектам в CSV/JSONL.
+
+Архив пишется zipfile прямо в ответ: записи сжимаются по мере чтения
+файлов из хранилища, готовые байты сразу отдаются клиенту. Ни архив, ни
+файлы целиком не держатся ни в памяти, ни на диске, поэтому размер
+вложений не ограничен (большие файлы пишутся в формате ZIP64).
+
+Сводка по проектам читается из базы частями (.iterator(chunk_size=...)),
+строки отдаются по мере формирования, так что память не зависит от числа
+проектов.
+"""
+import csv
+import json
+import posixpath
+import re
+import zipfile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import (
+    Project, ProjectCheck, ProjectComment, Stage, StageComment, Task, TeamMember,
+    KanbanCard, KanbanCardComment, KanbanCardCheck,
+)
+
+READ_BLOCK_SIZE = 256 * 1024
+
+# Уже сжатые форматы сохраняются в архив без повторного сжатия
+STORED_EXTENSIONS = {
+    '.zip', '.rar', '.7z', '.gz', '.bz2', '.xz',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp',
+    '.mp3', '.mp4', '.mov', '.avi', '.mkv', '.webm',
+    '.pdf', '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp',
+}
+
+unsafe_chars_re = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+class StreamBuffer:
+    """Файлоподобный объект без seek: копит записанные zipfile байты до выдачи"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def safe_name(name, default='file'):
+    name = unsafe_chars_re.sub('_', name or '').strip(' .')
+    return name[:150] or default
+
+
+class ArchiveNames:
+    """Уникальные имена записей в архиве"""
+
+    def __init__(self):
+        self.used = set()
+
+    def get(self, directory, name):
+        path = posixpath.join(directory, name)
+        root, ext = posixpath.splitext(path)
+        counter = 1
+        while path in self.used:
+            counter += 1
+            path = f'{root} ({counter}){ext}'
+        self.used.add(path)
+        return path
+
+
+def build_project_dump(project):
+    """JSON-описание проекта: этапы, задачи, карточки и комментарии"""
+    stages = list(Stage.objects.filter(project=project).values(
+        'id', 'name', 'description', 'criteria', 'artifact_description', 'deadline', 'status', 'order',
+        'submitted_at', 'reviewed_by__email', 'reviewed_at', 'created_at', 'updated_at',
+    ))
+    tasks = Task.objects.filter(stage__project=project).values(
+        'id', 'stage_id', 'name', 'description', 'assigned_to__email', 'assigned_by__email', 'deadline',
+        'status', 'blocker', 'completed_at', 'created_at', 'updated_at',
+    )
+    stage_comments = StageComment.objects.filter(stage__project=project).values(
+        'id', 'stage_id', 'author__email', 'text', 'created_at',
+    )
+    cards = list(KanbanCard.objects.filter(project=project).values(
+        'id', 'title', 'description', 'column', 'order', 'created_by__email', 'created_at', 'updated_at',
+    ))
+    card_comments = KanbanCardComment.objects.filter(card__project=project).values(
+        'id', 'card_id', 'author__email', 'text', 'created_at',
+    )
+    card_checks = KanbanCardCheck.objects.filter(card__project=project).values(
+        'card_id', 'teacher__email', 'is_checked', 'comment', 'updated_at',
+    )
+
+    stages_by_id = {stage['id']: dict(stage, tasks=[], comments=[]) for stage in stages}
+    for item in tasks:
+        stages_by_id[item.pop('stage_id')]['tasks'].append(item)
+    for item in stage_comments:
+        stages_by_id[item.pop('stage_id')]['comments'].append(item)
+
+    cards_by_id = {card['id']: dict(card, comments=[], checks=[]) for card in cards}
+    for item in card_comments:
+        cards_by_id[item.pop('card_id')]['comments'].append(item)
+    for item in card_checks:
+        cards_by_id[item.pop('card_id')]['checks'].append(item)
+
+    return {
+        'exported_at': timezone.now(),
+        'project': {
+            'id': project.id,
+            'name': project.name,
+            'description': project.description,
+            'passport_text': project.passport_text,
+            'status': project.status,
+            'team': project.team.name,
+            'members': list(project.team.team_members.filter(is_confirmed=True).values(
+                'user__email', 'user__first_name', 'user__last_name', 'role',
+            )),
+            'created_by': project.created_by.email,
+            'created_at': project.created_at,
+            'submitted_at': project.submitted_at,
+            'reviewed_at': project.reviewed_at,
+        },
+        'comments': list(ProjectComment.objects.filter(project=project).values(
+            'id', 'author__email', 'text', 'created_at',
+        )),
+        'stages': list(stages_by_id.values()),
+        'kanban_cards': list(cards_by_id.values()),
+    }
+
+
+def collect_project_files(project):
+    """Список (имя в архиве, файл) всех вложений проекта"""
+    names = ArchiveNames()
+    files = []
+    if project.passport:
+        files.append((names.get('passport', safe_name(posixpath.basename(project.passport.name))), project.passport))
+    for project_file in project.files.all():
+        name = project_file.name or posixpath.basename(project_file.file.name)
+        files.append((names.get('files', safe_name(name)), project_file.file))
+    for stage in Stage.objects.filter(project=project).exclude(artifact='').exclude(artifact__isnull=True):
+        directory = posixpath.join('stages', safe_name(f'{stage.order:02d} {stage.name}', f'stage-{stage.id}'))
+        files.append((names.get(directory, safe_name(posixpath.basename(stage.artifact.name))), stage.artifact))
+    cards = KanbanCard.objects.filter(project=project).prefetch_related('files')
+    for card in cards:
+        directory = posixpath.join('cards', safe_name(f'{card.id} {card.title}', f'card-{card.id}'))
+        for card_file in card.files.all():
+            name = card_file.name or posixpath.basename(card_file.file.name)
+            files.append((names.get(directory, safe_name(name)), card_file.file))
+    return files
+
+
+def get_compress_type(name):
+    if posixpath.splitext(name)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def stream_project_zip(project):
+    """
+    Итератор байт ZIP-архива проекта.
+
+    Запросы к базе выполняются сразу, до начала ответа, а файлы читаются
+    из хранилища по мере отдачи архива.
+    """
+    dump = json.dumps(build_project_dump(project), cls=DjangoJSONEncoder, ensure_ascii=False, indent=2)
+    files = collect_project_files(project)
+    return (chunk for chunk in generate_zip(dump, files) if chunk)
+
+
+def generate_zip(dump, files):
+    date_time = timezone.localtime().timetuple()[:6]
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('project.json', dump)
+        yield buffer.pop()
+
+        for name, field_file in files:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = get_compress_type(name)
+            try:
+                # По заранее известному размеру zipfile сам решит, нужен ли ZIP64
+                info.file_size = field_file.size
+            except OSError:
+                # Файла нет в хранилище: отмечаем это в архиве и продолжаем
+                archive.writestr(f'{name}.missing.txt', 'Файл не найден в хранилище')
+                yield buffer.pop()
+                continue
+            with field_file.open('rb') as source, archive.open(info, mode='w') as entry:
+                for block in iter(lambda: source.read(READ_BLOCK_SIZE), b''):
+                    entry.write(block)
+                    yield buffer.pop()
+            yield buffer.pop()
+    # Центральный каталог архива
+    yield buffer.pop()
+
+
+def format_datetime(value):
+    return timezone.localtime(value).isoformat(timespec='seconds') if value else None
+
+
+def get_team_leader(project):
+    for member in project.team.team_members.all():
+        if member.role == 'team_leader':
+            return member.user.email
+    return None
+
+
+# Колонки сводки по проектам: имя -> (заголовок CSV, значение)
+PROJECT_EXPORT_COLUMNS = {
+    'id': ('ID', lambda project: project.id),
+    'name': ('Проект', lambda project: project.name),
+    'status': ('Статус', lambda project: project.get_status_display()),
+    'team': ('Команда', lambda project: project.team.name),
+    'team_leader': ('Лидер команды', get_team_leader),
+    'members': ('Участники', lambda project: [
+        member.user.email for member in project.team.team_members.all()
+    ]),
+    'stages': ('Этапы', lambda project: [
+        f'{stage.name}: {stage.get_status_display()}' for stage in project.stages.all()
+    ]),
+    'stages_approved': ('Принято этапов', lambda project: project.stages_approved),
+    'stages_total': ('Всего этапов', lambda project: project.stages_total),
+    'tasks_completed': ('Выполнено задач', lambda project: project.tasks_completed),
+    'tasks_total': ('Всего задач', lambda project: project.tasks_total),
+    'tasks_overdue': ('Просрочено задач', lambda project: project.tasks_overdue),
+    'created_at': ('Создан', lambda project: format_datetime(project.created_at)),
+    'submitted_at': ('Отправлен на проверку', lambda project: format_datetime(project.submitted_at)),
+    'reviewed_at': ('Проверен', lambda project: format_datetime(project.reviewed_at)),
+    'reviewed_by': ('Проверил', lambda project: project.reviewed_by.email if project.reviewed_by else None),
+    'last_stage_reviewed_at': ('Последняя проверка этапа', lambda project: format_datetime(max(
+        (stage.reviewed_at for stage in project.stages.all() if stage.reviewed_at), default=None
+    ))),
+    'checks': ('Отметки преподавателей', lambda project: [
+        f'{check.teacher.email}: {"да" if check.is_checked else "нет"}' for check in project.teacher_checks.all()
+    ]),
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Сколько строк склеивать в одну часть ответа
+ROWS_PER_CHUNK = 100
+
+
+def get_projects_for_export(filters=None):
+    """Проекты со всем нужным для колонок, без N+1 запросов"""
+    return (
+        Project.objects.filter(**(filters or {}))
+        .select_related('team', 'reviewed_by')
+        .prefetch_related(
+            Prefetch(
+                'team__team_members',
+                queryset=TeamMember.objects.filter(is_confirmed=True).select_related('user').order_by('id'),
+            ),
+            Prefetch('stages', queryset=Stage.objects.order_by('order', 'id')),
+            Prefetch('teacher_checks', queryset=ProjectCheck.objects.select_related('teacher').order_by('id')),
+        )
+        .order_by('id')
+    )
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def stream_projects_export(queryset, columns, export_format):
+    """Генератор строк CSV или JSONL по проектам"""
+    rows = queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    getters = [PROJECT_EXPORT_COLUMNS[column][1] for column in columns]
+
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        # BOM, чтобы Excel открыл файл в UTF-8
+        yield '\ufeff' + writer.writerow([PROJECT_EXPORT_COLUMNS[column][0] for column in columns])
+
+        def render(project):
+            values = (getter(project) for getter in getters)
+            return writer.writerow(['; '.join(value) if isinstance(value, list) else value for value in values])
+    else:
+        def render(project):
+            row = {column: getter(project) for column, getter in zip(columns, getters)}
+            return json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+    lines = []
+    for project in rows:
+        lines.append(render(project))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
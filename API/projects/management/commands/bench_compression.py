@@ -0,0 +1,66 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from config.middleware import GzipCompressor, BrotliCompressor, brotli
+from projects.models import Project
+from projects.serializers import ProjectSerializer, ProjectDetailSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Замер сжатия ответов API: сэкономленные байты и затраты CPU"""
+    help = 'Сравнивает gzip/brotli на детальных и списочных ответах по проектам из базы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=20, help='Сколько проектов взять для замера')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов сжатия для замера времени')
+
+    def handle(self, *args, **options):
+        teacher = User.objects.filter(is_staff=True).first()
+        if teacher is None:
+            raise CommandError('Нужен хотя бы один преподаватель (is_staff), например из seed_demo')
+
+        request = RequestFactory().get('/api/projects/projects/')
+        request.user = teacher
+        context = {'request': request}
+
+        projects = list(Project.objects.all()[:options['projects']])
+        if not projects:
+            raise CommandError('В базе нет проектов, запустите seed_demo')
+
+        renderer = JSONRenderer()
+        payloads = {
+            'project detail': [
+                renderer.render(ProjectDetailSerializer(project, context=context).data)
+                for project in projects
+            ],
+            'project list': [renderer.render(ProjectSerializer(projects, many=True, context=context).data)],
+        }
+
+        compressors = [GzipCompressor(level) for level in (1, 6, 9)]
+        if brotli is not None:
+            compressors += [BrotliCompressor(quality) for quality in (1, 4, 11)]
+        else:
+            self.stdout.write(self.style.WARNING('Пакет brotli не установлен, замеряется только gzip'))
+
+        for name, bodies in payloads.items():
+            raw_size = sum(len(body) for body in bodies)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {len(bodies)} ответ(ов), {raw_size} байт без сжатия'
+            ))
+            for compressor in compressors:
+                level = getattr(compressor, 'level', getattr(compressor, 'quality', None))
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    compressed_size = sum(len(compressor.compress(body)) for body in bodies)
+                elapsed_ms = (time.perf_counter() - started) * 1000 / options['repeat'] / len(bodies)
+                saved = 100 * (1 - compressed_size / raw_size)
+                self.stdout.write(
+                    f'  {compressor.encoding:>4} {level:>2}: {compressed_size:>9} байт, '
+                    f'экономия {saved:5.1f}%, {elapsed_ms:7.3f} мс на ответ'
+                )
@@ -0,0 +1,123 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+User = get_user_model()
+
+DEFAULT_PATHS = [
+    '/api/auth/users/me/',
+    '/api/auth/users/bootstrap/',
+    '/api/projects/projects/',
+    '/api/projects/knowledge-base/',
+    '/api/projects/teacher-dashboard/pending_stages/',
+]
+
+
+class Command(BaseCommand):
+    """Нагрузочный замер запущенного сервера: запросы в секунду и задержки"""
+    help = 'Замеряет запросы/с к API на данных seed_demo; сервер (runserver или gunicorn) должен быть запущен'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Адрес сервера')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Замеряемый путь (можно несколько раз), по умолчанию основные списки')
+        parser.add_argument('--concurrency', type=int, default=16, help='Одновременных клиентов')
+        parser.add_argument('--duration', type=float, default=10, help='Длительность замера на путь, секунд')
+        parser.add_argument('--email', help='Пользователь, от имени которого идут запросы (по умолчанию преподаватель)')
+
+    def handle(self, *args, **options):
+        if options['email']:
+            user = User.objects.filter(email=options['email']).first()
+        else:
+            user = User.objects.filter(is_staff=True).order_by('id').first()
+        if user is None:
+            raise CommandError('Пользователь не найден, запустите seed_demo')
+        token, _ = Token.objects.get_or_create(user=user)
+
+        url = urlsplit(options['url'])
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise CommandError('--url должен быть вида http://host:port')
+        headers = {
+            'Authorization': f'Token {token.key}',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'identity',
+        }
+        concurrency = max(options['concurrency'], 1)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{options["url"]}: {concurrency} клиентов, {options["duration"]:g} с на путь, пользователь {user.email}'
+        ))
+        for path in options['paths'] or DEFAULT_PATHS:
+            results = self.run_path(url, path, headers, concurrency, options['duration'])
+            self.report(path, results)
+
+    def run_path(self, url, path, headers, concurrency, duration):
+        deadline = time.monotonic() + duration
+        lock = threading.Lock()
+        results = {'latencies': [], 'errors': 0, 'statuses': {}, 'connections': 0}
+        started_at = time.monotonic()
+
+        def client():
+            connection = None
+            latencies = []
+            while time.monotonic() < deadline:
+                if connection is None:
+                    connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+                    connection = connection_class(url.hostname, url.port, timeout=30)
+                    with lock:
+                        results['connections'] += 1
+                started = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = None
+                    with lock:
+                        results['errors'] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                with lock:
+                    results['statuses'][response.status] = results['statuses'].get(response.status, 0) + 1
+                # Сервер без keep-alive закрывает соединение после ответа
+                if response.will_close:
+                    connection.close()
+                    connection = None
+            if connection is not None:
+                connection.close()
+            with lock:
+                results['latencies'].extend(latencies)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(client)
+        # Последние запросы могут закончиться позже срока: делим на фактическое время
+        results['elapsed'] = time.monotonic() - started_at
+        return results
+
+    def report(self, path, results):
+        latencies = sorted(results['latencies'])
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f'  {path}: нет ответов ({results["errors"]} ошибок соединения)'))
+            return
+        ok = sum(count for status, count in results['statuses'].items() if status < 400)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        line = (
+            f'  {path}: {len(latencies) / results["elapsed"]:8.1f} запр/с, '
+            f'p50 {statistics.median(latencies) * 1000:7.1f} мс, p95 {p95 * 1000:7.1f} мс, '
+            f'успешных {ok}/{len(latencies)}, соединений {results["connections"]}'
+        )
+        if results['errors']:
+            line += f', ошибок соединения {results["errors"]}'
+        self.stdout.write(line)
+        failed = {status: count for status, count in results['statuses'].items() if status >= 400}
+        if failed:
+            self.stdout.write(self.style.WARNING(f'    ответы с ошибкой: {failed}'))
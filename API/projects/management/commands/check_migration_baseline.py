@@ -0,0 +1,154 @@
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+
+# Базовые миграции и последние миграции цепочек, которые они заменяют
+BASELINES = {
+    'projects': '0001_squashed_0012_deploystate',
+    'users': '0001_squashed_0003_user_thumbnails',
+}
+
+# Старые модели: 0004 удаляет их таблицы SQL-командой, но не из состояния миграций
+DROPPED_BY_SQL = {
+    ('projects', 'projectchatmessage'),
+    ('projects', 'projectmember'),
+    ('projects', 'developmentstage'),
+    ('projects', 'stagehint'),
+}
+
+
+def describe_model(model_state):
+    """Сравнимое описание модели из состояния миграций"""
+    fields = {}
+    for name, field in model_state.fields.items():
+        _, path, args, kwargs = field.deconstruct()
+        fields[name] = (path, args, kwargs)
+    return {
+        'fields': fields,
+        # Пустые indexes/constraints/unique_together равнозначны отсутствующим
+        'options': {
+            key: value for key, value in model_state.options.items()
+            if not (isinstance(value, (list, tuple, set, dict)) and not value)
+        },
+        'bases': model_state.bases,
+    }
+
+
+def compare_models(old, new):
+    """Список расхождений между двумя описаниями модели"""
+    differences = []
+    for name in sorted(set(old['fields']) | set(new['fields'])):
+        if name not in new['fields']:
+            differences.append(f'поле {name} есть только в цепочке')
+        elif name not in old['fields']:
+            differences.append(f'поле {name} есть только в базовой миграции')
+        elif old['fields'][name] != new['fields'][name]:
+            differences.append(f'поле {name}: {old["fields"][name]} != {new["fields"][name]}')
+    for key in sorted(set(old['options']) | set(new['options'])):
+        if old['options'].get(key) != new['options'].get(key):
+            differences.append(f'опция {key}: {old["options"].get(key)!r} != {new["options"].get(key)!r}')
+    if old['bases'] != new['bases']:
+        differences.append(f'базовые классы: {old["bases"]} != {new["bases"]}')
+    return differences
+
+
+class Command(BaseCommand):
+    """Проверка базовых (squashed) миграций на соответствие исходной цепочке"""
+    help = (
+        'Сравнивает состояние после базовых миграций с состоянием после всей цепочки, '
+        'а с --database - еще и таблицы подключенной базы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', nargs='?', const=DEFAULT_DB_ALIAS,
+                            help='Сверить таблицы и колонки базы (по умолчанию default) '
+                                 'с состоянием последних примененных в ней миграций')
+
+    def handle(self, *args, **options):
+        chain_loader = MigrationLoader(None, ignore_no_migrations=True, replace_migrations=False)
+        baseline_loader = MigrationLoader(None, ignore_no_migrations=True, replace_migrations=True)
+
+        chain_nodes = []
+        for app_label, name in BASELINES.items():
+            migration = baseline_loader.disk_migrations[app_label, name]
+            chain_nodes.append(migration.replaces[-1])
+        chain_state = chain_loader.project_state(chain_nodes)
+        baseline_state = baseline_loader.project_state([(app, name) for app, name in BASELINES.items()])
+
+        problems = []
+        chain_models = {
+            key: model for key, model in chain_state.models.items()
+            if key[0] in BASELINES and key not in DROPPED_BY_SQL
+        }
+        baseline_models = {key: model for key, model in baseline_state.models.items() if key[0] in BASELINES}
+        for key in sorted(set(chain_models) | set(baseline_models)):
+            label = '.'.join(key)
+            if key not in baseline_models:
+                problems.append(f'{label}: модели нет в базовой миграции')
+            elif key not in chain_models:
+                problems.append(f'{label}: модели нет в цепочке')
+            else:
+                problems += [
+                    f'{label}: {difference}'
+                    for difference in compare_models(describe_model(chain_models[key]), describe_model(baseline_models[key]))
+                ]
+        self.stdout.write(f'Моделей в базовых миграциях: {len(baseline_models)}, в цепочке: {len(chain_models)}')
+
+        if options['database']:
+            connection = connections[options['database']]
+            problems += self.check_database(connection, self.applied_state(connection))
+
+        if problems:
+            for problem in problems:
+                self.stderr.write(f'  {problem}')
+            raise CommandError(f'Найдено расхождений: {len(problems)}')
+        self.stdout.write(self.style.SUCCESS('Базовые миграции соответствуют цепочке'))
+
+    def applied_state(self, connection):
+        """Состояние после последних примененных в базе миграций приложений BASELINES"""
+        loader = MigrationLoader(connection, ignore_no_migrations=True)
+        applied = {key for key in loader.applied_migrations if key in loader.graph.nodes}
+        # Последняя примененная миграция - та, у которой нет примененных потомков
+        leaves = [
+            key for key in applied
+            if key[0] in BASELINES and not any(child in applied for child in loader.graph.node_map[key].children)
+        ]
+        for app_label in BASELINES:
+            if not any(app == app_label for app, _ in leaves):
+                raise CommandError(f'В базе {connection.alias} нет примененных миграций {app_label}')
+        self.stdout.write('Примененные миграции: ' + ', '.join(f'{app}.{name}' for app, name in sorted(leaves)))
+        return loader.project_state(leaves)
+
+    def check_database(self, connection, state):
+        """Таблицы и колонки базы против состояния примененных миграций"""
+        problems = []
+        state_apps = state.apps
+        with connection.cursor() as cursor:
+            tables = set(connection.introspection.table_names(cursor))
+            expected_tables = set()
+            for app_label in BASELINES:
+                for model in state_apps.get_app_config(app_label).get_models(include_auto_created=True):
+                    if (app_label, model._meta.model_name) in DROPPED_BY_SQL:
+                        continue
+                    table = model._meta.db_table
+                    expected_tables.add(table)
+                    if table not in tables:
+                        problems.append(f'{table}: таблицы нет в базе')
+                        continue
+                    columns = {
+                        column.name: column.null_ok
+                        for column in connection.introspection.get_table_description(cursor, table)
+                    }
+                    for field in model._meta.local_fields:
+                        if field.column not in columns:
+                            problems.append(f'{table}.{field.column}: колонки нет в базе')
+                        elif columns[field.column] != field.null:
+                            problems.append(f'{table}.{field.column}: null в базе {columns[field.column]}, в миграциях {field.null}')
+                    for column in sorted(set(columns) - {field.column for field in model._meta.local_fields}):
+                        problems.append(f'{table}.{column}: лишняя колонка в базе')
+            for table in sorted(tables - expected_tables):
+                if table.split('_', 1)[0] in BASELINES:
+                    problems.append(f'{table}: лишняя таблица в базе')
+        self.stdout.write(f'Проверено таблиц в базе {connection.alias}: {len(expected_tables)}')
+        return problems
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from projects.models import UploadSession
+from projects.uploads import discard_session
+
+
+class Command(BaseCommand):
+    """Удаляет незавершенные сессии загрузки и их временные файлы"""
+    help = 'Удаляет сессии загрузки без активности дольше UPLOAD_SESSION_TTL_HOURS'
+
+    def handle(self, *args, **options):
+        deadline = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        removed = 0
+        for session in UploadSession.objects.filter(updated_at__lt=deadline).iterator():
+            discard_session(session)
+            removed += 1
+        self.stdout.write(f'Удалено сессий загрузки: {removed}')
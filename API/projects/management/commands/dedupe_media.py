@@ -0,0 +1,82 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from projects.storage import BLOBS_DIRNAME, DeduplicatedFileSystemStorage, hash_file
+
+
+class Command(BaseCommand):
+    """Переводит существующие медиафайлы на хранение по содержимому"""
+    help = (
+        'Находит одинаковые файлы в MEDIA_ROOT и заменяет их жесткими ссылками '
+        'на общий блоб в .blobs; с --gc удаляет блобы, на которые никто не ссылается'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, сколько места освободится')
+        parser.add_argument('--gc', action='store_true', help='Удалить блобы без ссылок')
+
+    def handle(self, *args, **options):
+        storage = DeduplicatedFileSystemStorage(location=settings.MEDIA_ROOT)
+        dry_run = options['dry_run']
+        seen = {}
+        files = linked = saved = 0
+
+        for root, dirs, filenames in os.walk(storage.location):
+            # Служебные каталоги (.blobs, .uploads) не трогаем
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                if os.path.islink(path) or not os.path.isfile(path):
+                    continue
+                stat = os.stat(path)
+                files += 1
+                digest = hash_file(path)
+                blob_path = storage.blob_path(digest)
+
+                if dry_run:
+                    known_inode = os.stat(blob_path).st_ino if os.path.exists(blob_path) else seen.get(digest)
+                    if known_inode is None:
+                        seen[digest] = stat.st_ino
+                    elif known_inode != stat.st_ino:
+                        saved += stat.st_size
+                        linked += 1
+                    continue
+
+                if not os.path.exists(blob_path):
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    os.link(path, blob_path)
+                    continue
+
+                if os.stat(blob_path).st_ino == stat.st_ino:
+                    continue
+
+                # Такое содержимое уже есть: атомарно заменяем файл ссылкой на блоб
+                tmp_path = f'{path}.dedupe-tmp'
+                os.link(blob_path, tmp_path)
+                os.replace(tmp_path, path)
+                saved += stat.st_size
+                linked += 1
+
+        action = 'Можно освободить' if dry_run else 'Освобождено'
+        self.stdout.write(f'Файлов: {files}, дубликатов: {linked}. {action}: {saved} байт')
+
+        if options['gc']:
+            self.collect_garbage(storage, dry_run)
+
+    def collect_garbage(self, storage, dry_run):
+        removed = freed = 0
+        blobs_root = os.path.join(storage.location, BLOBS_DIRNAME)
+        for root, dirs, filenames in os.walk(blobs_root):
+            dirs[:] = [name for name in dirs if name != 'tmp']
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                stat = os.stat(path)
+                if stat.st_nlink > 1:
+                    continue
+                removed += 1
+                freed += stat.st_size
+                if not dry_run:
+                    os.remove(path)
+        self.stdout.write(f'Блобов без ссылок: {removed}, {freed} байт')
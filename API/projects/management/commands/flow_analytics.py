@@ -0,0 +1,54 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from projects.analytics import DEFAULT_WEEKS, MAX_WEEKS, flow_analytics
+
+
+def format_hours(value):
+    return '-' if value is None else f'{value} ч'
+
+
+class Command(BaseCommand):
+    """Аналитика потока по журналу смены статусов"""
+    help = (
+        'Считает время карточек в колонках, ожидание проверки этапов и выполненные задачи '
+        'по неделям; печатает сводку и время расчета, с --json - полный отчет'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=DEFAULT_WEEKS,
+                            help=f'Число недель пропускной способности (по умолчанию {DEFAULT_WEEKS})')
+        parser.add_argument('--json', action='store_true', help='Вывести отчет целиком в JSON')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['weeks'] <= MAX_WEEKS:
+            raise CommandError(f'--weeks: от 1 до {MAX_WEEKS}')
+        started = time.perf_counter()
+        report = flow_analytics(options['weeks'])
+        elapsed = time.perf_counter() - started
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2))
+            return
+
+        for column, stats in report['card_column_time']['cohort'].items():
+            self.stdout.write(
+                f'  Колонка {column}: переходов {stats["count"]}, '
+                f'медиана {format_hours(stats["median"])}, p90 {format_hours(stats["p90"])}'
+            )
+        wait = report['stage_review_wait']
+        self.stdout.write(
+            f'  Ожидание проверки: {wait["cohort"]["count"]}, медиана {format_hours(wait["cohort"]["median"])}, '
+            f'p90 {format_hours(wait["cohort"]["p90"])}; ждут сейчас {wait["pending"]["count"]}'
+        )
+        flow = report['throughput']
+        self.stdout.write(
+            f'  Выполнено задач по неделям с {flow["weeks"][0]}: {flow["cohort"]}; '
+            f'на команду в неделю медиана {flow["per_team_week"]["median"]}, p90 {flow["per_team_week"]["p90"]}'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Команд {len(flow["teams"])}, расчет занял {elapsed * 1000:.0f} мс'
+        ))
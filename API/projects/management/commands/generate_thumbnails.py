@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from projects.thumbnails import THUMBNAIL_SOURCES, generate_thumbnails, needs_thumbnails
+
+
+class Command(BaseCommand):
+    """Создает уменьшенные копии для уже загруженных аватаров и картинок"""
+    help = 'Создает недостающие уменьшенные копии аватаров и файлов карточек'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Пересоздать копии для всех файлов')
+
+    def handle(self, *args, **options):
+        for kind, (model, field_name) in THUMBNAIL_SOURCES.items():
+            processed = 0
+            queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in queryset.only('pk', field_name, 'thumbnails').iterator():
+                if options['force']:
+                    # Сбрасываем имя исходного файла, чтобы копии создались заново
+                    model.objects.filter(pk=instance.pk).update(thumbnails={
+                        'source': '', 'sizes': (instance.thumbnails or {}).get('sizes', {})
+                    })
+                elif not needs_thumbnails(instance, field_name):
+                    continue
+                generate_thumbnails(kind, instance.pk)
+                processed += 1
+            self.stdout.write(f'{model._meta.verbose_name_plural}: обработано {processed}')
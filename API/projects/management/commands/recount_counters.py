@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.counters import find_mismatches, iter_counters, recount
+from projects.progress import refresh_overdue_tasks
+
+
+class Command(BaseCommand):
+    """Пересчет денормализованных счетчиков и сводки выполнения проектов"""
+    help = (
+        'Пересчитывает comments_count, files_count, tasks_count и сводку stages_*/tasks_* '
+        'одним UPDATE на счетчик; с --dry-run только показывает, сколько строк расходится'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Не менять данные, код выхода 1 при расхождениях')
+
+    def handle(self, *args, **options):
+        # Сначала просрочка задач: от нее зависит tasks_overdue
+        stale = refresh_overdue_tasks(dry_run=options['dry_run'])
+        self.stdout.write(f'  projects.Task.is_overdue: {"расходится" if options["dry_run"] else "исправлено"} {stale}')
+        total = stale
+        for parent_model, counter, actual in iter_counters():
+            label = f'{parent_model._meta.label}.{counter}'
+            mismatches = find_mismatches(parent_model, counter, actual)
+            total += mismatches
+            if options['dry_run'] or not mismatches:
+                self.stdout.write(f'  {label}: расходится {mismatches}')
+                continue
+            updated = recount(parent_model, counter, actual)
+            self.stdout.write(f'  {label}: расходилось {mismatches}, пересчитано строк {updated}')
+
+        if options['dry_run']:
+            if total:
+                raise CommandError(f'Счетчиков с расхождениями: {total}')
+            self.stdout.write(self.style.SUCCESS('Счетчики актуальны'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Исправлено счетчиков: {total}'))
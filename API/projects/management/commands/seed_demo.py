@@ -0,0 +1,214 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from projects.counters import recount_all
+from projects.progress import refresh_overdue_tasks
+from projects.models import (
+    Team, TeamMember, Project, ProjectComment, ProjectCheck,
+    Stage, StageComment, Task, KanbanCard, KanbanCardComment, StatusTransition
+)
+
+User = get_user_model()
+
+SEED_EMAIL_PREFIX = 'seed-'
+SEED_PASSWORD = 'seed-password-123'
+# За сколько дней создается история смены статусов
+HISTORY_DAYS = 56
+
+
+class Command(BaseCommand):
+    """Заполняет базу демонстрационными данными для замеров производительности"""
+    help = 'Создает демонстрационные команды, проекты, этапы, задачи и карточки'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=20, help='Количество команд')
+        parser.add_argument('--members', type=int, default=5, help='Участников в команде')
+        parser.add_argument('--stages', type=int, default=5, help='Этапов в проекте')
+        parser.add_argument('--tasks', type=int, default=4, help='Задач в этапе')
+        parser.add_argument('--cards', type=int, default=10, help='Карточек в проекте')
+        parser.add_argument('--comments', type=int, default=5, help='Комментариев к объекту')
+        parser.add_argument('--clear', action='store_true', help='Удалить ранее созданные демо-данные')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора случайных чисел')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        seed_users = User.objects.filter(email__startswith=SEED_EMAIL_PREFIX)
+
+        if options['clear']:
+            Team.objects.filter(created_by__in=seed_users).delete()
+            deleted, _ = seed_users.delete()
+            self.stdout.write(f'Удалено объектов: {deleted}')
+
+        if seed_users.exists():
+            self.stdout.write(self.style.WARNING('Демо-данные уже есть, используйте --clear'))
+            return
+
+        now = timezone.now()
+        password = make_password(SEED_PASSWORD)
+        long_text = 'Цель проекта, проблема, целевая аудитория, ожидаемые результаты. ' * 40
+
+        teacher = User.objects.create(
+            username=f'{SEED_EMAIL_PREFIX}teacher@dvfu.ru', email=f'{SEED_EMAIL_PREFIX}teacher@dvfu.ru',
+            first_name='Преподаватель', last_name='Демо', password=password, is_staff=True,
+        )
+
+        users = User.objects.bulk_create([
+            User(
+                username=f'{SEED_EMAIL_PREFIX}{team_no}-{member_no}@dvfu.ru',
+                email=f'{SEED_EMAIL_PREFIX}{team_no}-{member_no}@dvfu.ru',
+                first_name=f'Студент {member_no}', last_name=f'Команда {team_no}',
+                password=password,
+            )
+            for team_no in range(options['teams'])
+            for member_no in range(options['members'])
+        ])
+        team_users = [
+            users[i:i + options['members']] for i in range(0, len(users), options['members'])
+        ]
+
+        teams = Team.objects.bulk_create([
+            Team(name=f'Демо-команда {team_no}', created_by=members[0])
+            for team_no, members in enumerate(team_users)
+        ])
+        TeamMember.objects.bulk_create([
+            TeamMember(
+                team=team, user=user, role='team_leader' if index == 0 else 'member',
+                is_confirmed=True, invited_by=members[0], joined_at=now,
+            )
+            for team, members in zip(teams, team_users)
+            for index, user in enumerate(members)
+        ])
+
+        projects = Project.objects.bulk_create([
+            Project(
+                name=f'Демо-проект {team_no}', team=team, created_by=members[0],
+                passport_text=long_text, description=long_text[:500],
+                status=rng.choice(['draft', 'submitted', 'approved', 'revision']),
+                submitted_at=now - timedelta(days=rng.randint(0, 30)),
+            )
+            for team_no, (team, members) in enumerate(zip(teams, team_users))
+        ])
+        project_members = dict(zip((p.pk for p in projects), team_users))
+
+        ProjectComment.objects.bulk_create([
+            ProjectComment(project=project, author=rng.choice(project_members[project.pk] + [teacher]),
+                           text=f'Комментарий {n} к проекту')
+            for project in projects
+            for n in range(options['comments'])
+        ])
+        ProjectCheck.objects.bulk_create([
+            ProjectCheck(project=project, teacher=teacher, is_checked=rng.random() < 0.5)
+            for project in projects
+        ])
+
+        stages = Stage.objects.bulk_create([
+            Stage(
+                project=project, name=f'Этап {n}', description='Описание этапа',
+                criteria='Критерии приемки этапа', order=n,
+                status=rng.choice(['in_progress', 'submitted', 'approved', 'revision']),
+                deadline=now + timedelta(days=rng.randint(-10, 30)),
+            )
+            for project in projects
+            for n in range(options['stages'])
+        ])
+        StageComment.objects.bulk_create([
+            StageComment(stage=stage, author=rng.choice(project_members[stage.project_id] + [teacher]),
+                         text=f'Комментарий {n} к этапу')
+            for stage in stages
+            for n in range(options['comments'])
+        ])
+        tasks = Task.objects.bulk_create([
+            Task(
+                stage=stage, name=f'Задача {n}', description='Описание задачи',
+                assigned_to=rng.choice(project_members[stage.project_id]),
+                assigned_by=project_members[stage.project_id][0],
+                status=rng.choice(['new', 'in_progress', 'completed', 'returned']),
+                deadline=now + timedelta(days=rng.randint(-10, 30)),
+            )
+            for stage in stages
+            for n in range(options['tasks'])
+        ])
+
+        cards = KanbanCard.objects.bulk_create([
+            KanbanCard(
+                project=project, title=f'Карточка {n}', description='Описание карточки',
+                column=rng.choice(['column1', 'column2', 'column3']), order=n,
+                created_by=rng.choice(project_members[project.pk]),
+            )
+            for project in projects
+            for n in range(options['cards'])
+        ])
+        KanbanCardComment.objects.bulk_create([
+            KanbanCardComment(card=card, author=rng.choice(project_members[card.project_id] + [teacher]),
+                              text=f'Комментарий {n} к карточке')
+            for card in cards
+            for n in range(options['comments'])
+        ])
+        self.create_history(rng, now, teacher, project_members, stages, tasks, cards)
+
+        # bulk_create не отправляет сигналы: просрочку и счетчики считаем сами
+        refresh_overdue_tasks()
+        recount_all()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: команд {len(teams)}, пользователей {len(users) + 1}, проектов {len(projects)}, '
+            f'этапов {len(stages)}, карточек {len(cards)}. Пароль: {SEED_PASSWORD}'
+        ))
+
+    def create_history(self, rng, now, teacher, project_members, stages, tasks, cards):
+        """Журнал смены статусов за HISTORY_DAYS дней, согласованный с текущими статусами"""
+        start = now - timedelta(days=HISTORY_DAYS)
+        window = (now - start).total_seconds()
+        # Карточки создаются в начале периода, чтобы считалось время в первой колонке
+        KanbanCard.objects.filter(pk__in=[card.pk for card in cards]).update(created_at=start)
+
+        transitions = []
+        for card in cards:
+            path = {'column1': [], 'column2': ['column2'], 'column3': ['column2', 'column3']}[card.column]
+            moments = sorted(rng.uniform(0, window) for _ in path)
+            previous = 'column1'
+            for column, moment in zip(path, moments):
+                transitions.append(StatusTransition(
+                    project_id=card.project_id, entity='card', entity_id=card.pk, title=card.title,
+                    field='column', from_value=previous, to_value=column,
+                    actor=rng.choice(project_members[card.project_id]),
+                    created_at=start + timedelta(seconds=moment),
+                ))
+                previous = column
+
+        for stage in stages:
+            if stage.status == 'in_progress':
+                continue
+            submitted_at = now - timedelta(days=rng.uniform(1, HISTORY_DAYS - 1))
+            transitions.append(StatusTransition(
+                project_id=stage.project_id, entity='stage', entity_id=stage.pk, title=stage.name,
+                field='status', from_value='in_progress', to_value='submitted',
+                actor=project_members[stage.project_id][0], created_at=submitted_at,
+            ))
+            if stage.status != 'submitted':
+                # Ожидание проверки: в среднем двое суток, но не позже текущего момента
+                reviewed_at = min(submitted_at + timedelta(hours=rng.expovariate(1 / 48)), now)
+                transitions.append(StatusTransition(
+                    project_id=stage.project_id, entity='stage', entity_id=stage.pk, title=stage.name,
+                    field='status', from_value='submitted', to_value=stage.status,
+                    actor=teacher, created_at=reviewed_at,
+                ))
+
+        stage_projects = {stage.pk: stage.project_id for stage in stages}
+        for task in tasks:
+            if task.status != 'completed':
+                continue
+            transitions.append(StatusTransition(
+                project_id=stage_projects[task.stage_id], entity='task', entity_id=task.pk, title=task.name,
+                field='status', from_value='in_progress', to_value='completed',
+                actor=task.assigned_to, created_at=start + timedelta(seconds=rng.uniform(0, window)),
+            ))
+
+        StatusTransition.objects.bulk_create(transitions, batch_size=1000)
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from projects.models import DeployState
+
+# Файл с отпечатком статики в STATIC_ROOT
+STATIC_FINGERPRINT_FILE = '.startup-fingerprint'
+
+
+def get_schema_fingerprint():
+    """SHA-256 от миграций и моделей приложений проекта, зависимостей и версии Django"""
+    digest = hashlib.sha256(django.get_version().encode())
+    requirements = Path(settings.BASE_DIR) / 'requirements.txt'
+    if requirements.exists():
+        digest.update(requirements.read_bytes())
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for app_config in sorted(apps.get_app_configs(), key=lambda app: app.label):
+        app_path = Path(app_config.path).resolve()
+        if base_dir not in app_path.parents:
+            continue
+        # Миграции сторонних приложений меняются только вместе с requirements.txt
+        files = sorted(app_path.glob('migrations/*.py'))
+        if (app_path / 'models.py').exists():
+            files.append(app_path / 'models.py')
+        for path in files:
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def get_static_fingerprint():
+    """SHA-256 от списка исходных статических файлов (путь и размер)"""
+    digest = hashlib.sha256()
+    entries = []
+    for finder in finders.get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            prefix = getattr(storage, 'prefix', None) or ''
+            entries.append((os.path.join(prefix, path), storage.size(path)))
+    for path, size in sorted(entries):
+        digest.update(f'{path}:{size}\n'.encode())
+    return digest.hexdigest()
+
+
+def get_static_fingerprint_path():
+    return os.path.join(settings.STATIC_ROOT, STATIC_FINGERPRINT_FILE)
+
+
+def get_stored_schema_fingerprint():
+    try:
+        return DeployState.objects.filter(name='schema').values_list('fingerprint', flat=True).first()
+    except DatabaseError:
+        # Таблицы еще нет: миграции не применялись
+        return None
+
+
+def get_stored_static_fingerprint():
+    try:
+        with open(get_static_fingerprint_path()) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    """Отпечаток схемы базы и статики для быстрого старта контейнера"""
+    help = (
+        'Проверяет (--check), ждет (--wait) или сохраняет (--save) отпечаток миграций и статики; '
+        'entrypoint.sh пропускает migrate и collectstatic, если отпечаток совпадает'
+    )
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--check', action='store_true',
+                           help='Код выхода 0, если миграции и статика актуальны, иначе 1')
+        group.add_argument('--wait', type=float, metavar='SECONDS',
+                           help='Ждать, пока подготовку выполнит другой контейнер (STARTUP_MODE=release)')
+        group.add_argument('--save', action='store_true',
+                           help='Сохранить отпечаток после migrate и collectstatic')
+
+    def handle(self, *args, **options):
+        schema = get_schema_fingerprint()
+        static = get_static_fingerprint()
+
+        if options['save']:
+            DeployState.objects.update_or_create(name='schema', defaults={'fingerprint': schema})
+            os.makedirs(settings.STATIC_ROOT, exist_ok=True)
+            with open(get_static_fingerprint_path(), 'w') as file:
+                file.write(static)
+            self.stdout.write(f'Отпечаток сохранен: схема {schema[:12]}, статика {static[:12]}')
+            return
+
+        if options['wait'] is not None:
+            deadline = time.monotonic() + options['wait']
+            while not self.is_current(schema, static):
+                if time.monotonic() > deadline:
+                    raise CommandError('Миграции или статика не подготовлены, запустите STARTUP_MODE=release')
+                # Соединение могло упасть, пока база недоступна
+                connection.close()
+                time.sleep(2)
+            self.stdout.write('Миграции и статика актуальны')
+            return
+
+        current = self.is_current(schema, static, verbose=True)
+        if options['check'] and not current:
+            raise CommandError('Отпечаток не совпадает, нужна подготовка')
+
+    def is_current(self, schema, static, verbose=False):
+        stored_schema = get_stored_schema_fingerprint()
+        stored_static = get_stored_static_fingerprint()
+        if verbose:
+            self.stdout.write(f'Схема: {schema[:12]} (сохранен {(stored_schema or "-")[:12]})')
+            self.stdout.write(f'Статика: {static[:12]} (сохранен {(stored_static or "-")[:12]})')
+        return stored_schema == schema and stored_static == static
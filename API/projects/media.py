@@ -0,0 +1,136 @@
+"""
+Защищенная раздача файлов проектов, карточек и этапов.
+
+Ссылки на скачивание подписываются (TimestampSigner), поэтому работают как
+обычные ссылки в браузере без заголовка Authorization. Сам файл отдает nginx
+по X-Accel-Redirect; без nginx используется FileResponse (sendfile через
+wsgi.file_wrapper) с поддержкой Range и условных запросов. С объектным
+хранилищем - редирект на подписанную ссылку хранилища.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+from . import object_storage
+
+SIGNING_SALT = 'projects.media.download'
+RANGE_BLOCK_SIZE = 64 * 1024
+range_re = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def sign_download(user, url_name, pk):
+    return signing.dumps({'user': user.pk, 'url': url_name, 'pk': pk}, salt=SIGNING_SALT, compress=True)
+
+
+def get_signed_user_id(signature, url_name, pk):
+    """Возвращает id пользователя из подписи ссылки или None, если подпись неверна"""
+    try:
+        payload = signing.loads(signature, salt=SIGNING_SALT, max_age=settings.MEDIA_DOWNLOAD_URL_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if payload.get('url') != url_name or str(payload.get('pk')) != str(pk):
+        return None
+    return payload.get('user')
+
+
+def build_download_url(request, url_name, pk):
+    """Подписанная ссылка на скачивание для текущего пользователя"""
+    if request is None or not request.user.is_authenticated:
+        return None
+    url = reverse(url_name, args=[pk])
+    return request.build_absolute_uri(f'{url}?signature={sign_download(request.user, url_name, pk)}')
+
+
+def file_response(request, field_file, filename):
+    """Ответ с файлом: X-Accel-Redirect для nginx или FileResponse"""
+    content_type, encoding = mimetypes.guess_type(filename or field_file.name)
+    content_type = content_type or 'application/octet-stream'
+
+    if object_storage.is_enabled():
+        # Файл отдает само хранилище по подписанной ссылке
+        response = HttpResponseRedirect(
+            object_storage.presign_download(field_file.name, filename or os.path.basename(field_file.name))
+        )
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+    if settings.MEDIA_ACCEL_REDIRECT_LOCATION:
+        # nginx сам обработает Range, If-Modified-Since и отдаст файл через sendfile
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_LOCATION + quote(field_file.name)
+    else:
+        response = local_file_response(request, field_file.path, content_type)
+
+    response['Content-Disposition'] = content_disposition_header(False, filename or os.path.basename(field_file.name))
+    response['Cache-Control'] = f'private, max-age={settings.MEDIA_DOWNLOAD_CACHE_MAX_AGE}'
+    return response
+
+
+def local_file_response(request, path, content_type):
+    """Отдача файла с диска с поддержкой ETag/Last-Modified и одного диапазона Range"""
+    stat = os.stat(path)
+    etag = quote_etag(f'{stat.st_size:x}-{int(stat.st_mtime * 1000):x}')
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = parse_range(request, etag, last_modified, stat.st_size)
+        if byte_range == 'unsatisfiable':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        elif byte_range is not None:
+            start, end = byte_range
+            source = open(path, 'rb')
+            source.seek(start)
+            response = StreamingHttpResponse(read_range(source, end - start + 1), status=206, content_type=content_type)
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def parse_range(request, etag, last_modified, size):
+    """Разбирает заголовок Range (только один диапазон), учитывая If-Range"""
+    header = request.META.get('HTTP_RANGE', '').strip()
+    match = range_re.match(header)
+    if not match or not any(match.groups()):
+        return None
+
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range and if_range not in (etag, http_date(last_modified)):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N - последние N байт
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return 'unsatisfiable'
+    return start, end
+
+
+def read_range(source, length):
+    with source:
+        while length > 0:
+            block = source.read(min(RANGE_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
@@ -0,0 +1,341 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:57
+# Базовая миграция вместо цепочки 0001-0012: сразу создает текущие таблицы.
+# В цепочке старые модели (ProjectChatMessage, ProjectMember, DevelopmentStage,
+# StageHint) удаляются SQL-командой в 0004, но остаются в состоянии миграций;
+# здесь их нет. Соответствие цепочке проверяет manage.py check_migration_baseline.
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('projects', '0001_initial'),
+        ('projects', '0002_initial'),
+        ('projects', '0003_alter_projectchatmessage_options'),
+        ('projects', '0004_remove_old_models_create_new'),
+        ('projects', '0005_remove_projectchatmessage_author_and_more'),
+        ('projects', '0006_projectcheck_projectfile_and_more'),
+        ('projects', '0007_kanbancard_kanbancardcheck_kanbancardcomment_and_more'),
+        ('projects', '0008_remove_projectchatmessage_author_and_more'),
+        ('projects', '0009_uploadsession'),
+        ('projects', '0010_uploadsession_mode_object_name'),
+        ('projects', '0011_kanbancardfile_thumbnails'),
+        ('projects', '0012_deploystate'),
+    ]
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeployState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Название')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Отпечаток')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Состояние развертывания',
+                'verbose_name_plural': 'Состояния развертывания',
+            },
+        ),
+        migrations.CreateModel(
+            name='KanbanCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Название карточки')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('column', models.CharField(choices=[('column1', 'Колонка 1'), ('column2', 'Колонка 2'), ('column3', 'Колонка 3')], default='column1', max_length=20, verbose_name='Колонка')),
+                ('order', models.IntegerField(default=0, verbose_name='Порядок в колонке')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_kanban_cards', to=settings.AUTH_USER_MODEL, verbose_name='Создатель')),
+            ],
+            options={
+                'verbose_name': 'Карточка канбан-доски',
+                'verbose_name_plural': 'Карточки канбан-доски',
+                'ordering': ['column', 'order', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='KnowledgeBase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(choices=[('team', 'Команда'), ('project_passport', 'Паспорт проекта'), ('stage', 'Этап'), ('task', 'Задача')], max_length=50, verbose_name='Раздел')),
+                ('title', models.CharField(max_length=200, verbose_name='Заголовок')),
+                ('content', models.TextField(verbose_name='Содержание')),
+                ('order', models.IntegerField(default=0, verbose_name='Порядок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'База знаний',
+                'verbose_name_plural': 'База знаний',
+                'ordering': ['section', 'order', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, validators=[django.core.validators.MinLengthValidator(3)], verbose_name='Название проекта')),
+                ('passport', models.FileField(blank=True, null=True, upload_to='project_passports/', verbose_name='Паспорт проекта (файл)')),
+                ('passport_text', models.TextField(blank=True, verbose_name='Текст паспорта проекта (опционально)')),
+                ('description', models.TextField(blank=True, verbose_name='Описание проекта')),
+                ('status', models.CharField(choices=[('draft', 'Черновик'), ('submitted', 'Отправлен на проверку'), ('approved', 'Принято'), ('revision', 'На доработке'), ('rejected', 'Отклонено')], default='draft', max_length=20, verbose_name='Статус')),
+                ('kanban_column', models.CharField(choices=[('column1', 'Колонка 1'), ('column2', 'Колонка 2'), ('column3', 'Колонка 3')], default='column1', max_length=20, verbose_name='Колонка канбан-доски')),
+                ('order', models.IntegerField(default=0, verbose_name='Порядок в колонке')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('submitted_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки на проверку')),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата проверки')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_projects', to=settings.AUTH_USER_MODEL, verbose_name='Создатель')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_projects', to=settings.AUTH_USER_MODEL, verbose_name='Проверил')),
+            ],
+            options={
+                'verbose_name': 'Проект',
+                'verbose_name_plural': 'Проекты',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Stage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Название этапа')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('criteria', models.TextField(blank=True, verbose_name='Критерии приемки')),
+                ('artifact', models.FileField(blank=True, null=True, upload_to='artifacts/', verbose_name='Артефакт')),
+                ('artifact_description', models.TextField(blank=True, verbose_name='Описание артефакта')),
+                ('deadline', models.DateTimeField(blank=True, null=True, verbose_name='Дедлайн')),
+                ('status', models.CharField(choices=[('in_progress', 'В работе'), ('submitted', 'На проверке'), ('approved', 'Принято'), ('revision', 'На доработке')], default='in_progress', max_length=20, verbose_name='Статус')),
+                ('order', models.IntegerField(default=0, verbose_name='Порядок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('submitted_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки на проверку')),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата проверки')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stages', to='projects.project', verbose_name='Проект')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_stages', to=settings.AUTH_USER_MODEL, verbose_name='Проверил')),
+            ],
+            options={
+                'verbose_name': 'Этап',
+                'verbose_name_plural': 'Этапы',
+                'ordering': ['order', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, validators=[django.core.validators.MinLengthValidator(3)], verbose_name='Название команды')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активна')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_teams', to=settings.AUTH_USER_MODEL, verbose_name='Создатель')),
+            ],
+            options={
+                'verbose_name': 'Команда',
+                'verbose_name_plural': 'Команды',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('mode', models.CharField(choices=[('chunked', 'По частям через API'), ('direct', 'Напрямую в хранилище')], default='chunked', max_length=10, verbose_name='Способ загрузки')),
+                ('target', models.CharField(choices=[('project_file', 'Файл проекта'), ('card_file', 'Файл карточки'), ('stage_artifact', 'Артефакт этапа'), ('project_passport', 'Паспорт проекта')], max_length=20, verbose_name='Куда прикрепить')),
+                ('target_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('filename', models.CharField(max_length=200, verbose_name='Имя файла')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер файла')),
+                ('checksum', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Получено байт')),
+                ('object_name', models.CharField(blank=True, max_length=300, verbose_name='Имя объекта в хранилище')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Загружает')),
+            ],
+            options={
+                'verbose_name': 'Сессия загрузки',
+                'verbose_name_plural': 'Сессии загрузки',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Название задачи')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('deadline', models.DateTimeField(blank=True, null=True, verbose_name='Дедлайн')),
+                ('status', models.CharField(choices=[('new', 'Новая'), ('in_progress', 'В работе'), ('completed', 'Выполнена'), ('returned', 'Возвращена')], default='new', max_length=20, verbose_name='Статус')),
+                ('blocker', models.TextField(blank=True, verbose_name='Блокер')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата выполнения')),
+                ('assigned_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_tasks', to=settings.AUTH_USER_MODEL, verbose_name='Назначил')),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_tasks', to=settings.AUTH_USER_MODEL, verbose_name='Назначена')),
+                ('stage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='projects.stage', verbose_name='Этап')),
+            ],
+            options={
+                'verbose_name': 'Задача',
+                'verbose_name_plural': 'Задачи',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StageComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='Текст комментария')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('stage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='projects.stage', verbose_name='Этап')),
+            ],
+            options={
+                'verbose_name': 'Комментарий к этапу',
+                'verbose_name_plural': 'Комментарии к этапам',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='project_files/', verbose_name='Файл')),
+                ('name', models.CharField(blank=True, max_length=200, verbose_name='Название файла')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата загрузки')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='projects.project', verbose_name='Проект')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploaded_project_files', to=settings.AUTH_USER_MODEL, verbose_name='Загрузил')),
+            ],
+            options={
+                'verbose_name': 'Файл проекта',
+                'verbose_name_plural': 'Файлы проектов',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='Текст комментария')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='projects.project', verbose_name='Проект')),
+            ],
+            options={
+                'verbose_name': 'Комментарий к проекту',
+                'verbose_name_plural': 'Комментарии к проектам',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='projects.team', verbose_name='Команда'),
+        ),
+        migrations.CreateModel(
+            name='KanbanCardFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='kanban_files/', verbose_name='Файл')),
+                ('thumbnails', models.JSONField(blank=True, default=dict, editable=False, verbose_name='Уменьшенные копии')),
+                ('name', models.CharField(blank=True, max_length=200, verbose_name='Название файла')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата загрузки')),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='projects.kanbancard', verbose_name='Карточка')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploaded_kanban_files', to=settings.AUTH_USER_MODEL, verbose_name='Загрузил')),
+            ],
+            options={
+                'verbose_name': 'Файл карточки',
+                'verbose_name_plural': 'Файлы карточек',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='KanbanCardComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='Текст комментария')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kanban_card_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='projects.kanbancard', verbose_name='Карточка')),
+            ],
+            options={
+                'verbose_name': 'Комментарий к карточке',
+                'verbose_name_plural': 'Комментарии к карточкам',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='kanbancard',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kanban_cards', to='projects.project', verbose_name='Проект'),
+        ),
+        migrations.CreateModel(
+            name='TeamMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('team_leader', 'Тимлид'), ('member', 'Участник')], default='member', max_length=20, verbose_name='Роль')),
+                ('is_confirmed', models.BooleanField(default=False, verbose_name='Подтверждено участие')),
+                ('joined_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата присоединения')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('invited_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invited_members', to=settings.AUTH_USER_MODEL, verbose_name='Приглашен')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_members', to='projects.team', verbose_name='Команда')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_memberships', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Участник команды',
+                'verbose_name_plural': 'Участники команд',
+                'ordering': ['-created_at'],
+                'unique_together': {('team', 'user')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectCheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_checked', models.BooleanField(default=False, verbose_name='Отмечено')),
+                ('comment', models.TextField(blank=True, verbose_name='Комментарий преподавателя')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher_checks', to='projects.project', verbose_name='Проект')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_checks', to=settings.AUTH_USER_MODEL, verbose_name='Преподаватель')),
+            ],
+            options={
+                'verbose_name': 'Отметка преподавателя',
+                'verbose_name_plural': 'Отметки преподавателей',
+                'ordering': ['-updated_at'],
+                'unique_together': {('project', 'teacher')},
+            },
+        ),
+        migrations.CreateModel(
+            name='KanbanCardCheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_checked', models.BooleanField(default=False, verbose_name='Отмечено')),
+                ('comment', models.TextField(blank=True, verbose_name='Комментарий преподавателя')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher_checks', to='projects.kanbancard', verbose_name='Карточка')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kanban_card_checks', to=settings.AUTH_USER_MODEL, verbose_name='Преподаватель')),
+            ],
+            options={
+                'verbose_name': 'Отметка преподавателя на карточке',
+                'verbose_name_plural': 'Отметки преподавателей на карточках',
+                'ordering': ['-updated_at'],
+                'unique_together': {('card', 'teacher')},
+            },
+        ),
+    ]
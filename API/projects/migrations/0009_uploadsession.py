@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0008_remove_projectchatmessage_author_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('project_file', 'Файл проекта'), ('card_file', 'Файл карточки'), ('stage_artifact', 'Артефакт этапа'), ('project_passport', 'Паспорт проекта')], max_length=20, verbose_name='Куда прикрепить')),
+                ('target_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('filename', models.CharField(max_length=200, verbose_name='Имя файла')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер файла')),
+                ('checksum', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Получено байт')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Загружает')),
+            ],
+            options={
+                'verbose_name': 'Сессия загрузки',
+                'verbose_name_plural': 'Сессии загрузки',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
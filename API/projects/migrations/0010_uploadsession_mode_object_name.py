@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='mode',
+            field=models.CharField(choices=[('chunked', 'По частям через API'), ('direct', 'Напрямую в хранилище')], default='chunked', max_length=10, verbose_name='Способ загрузки'),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='object_name',
+            field=models.CharField(blank=True, max_length=300, verbose_name='Имя объекта в хранилище'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_kanbancardfile_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeployState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Название')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Отпечаток')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Состояние развертывания',
+                'verbose_name_plural': 'Состояния развертывания',
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:01
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Родительская модель, поле счетчика, дочерняя модель, поле связи
+COUNTERS = [
+    ('project', 'comments_count', 'projectcomment', 'project'),
+    ('project', 'files_count', 'projectfile', 'project'),
+    ('stage', 'tasks_count', 'task', 'stage'),
+    ('stage', 'comments_count', 'stagecomment', 'stage'),
+    ('kanbancard', 'comments_count', 'kanbancardcomment', 'card'),
+    ('kanbancard', 'files_count', 'kanbancardfile', 'card'),
+]
+
+
+def fill_counters(apps, schema_editor):
+    """Заполняем счетчики по существующим данным: один UPDATE на счетчик"""
+    for parent_name, counter, child_name, link in COUNTERS:
+        parent_model = apps.get_model('projects', parent_name)
+        child_model = apps.get_model('projects', child_name)
+        counts = (
+            child_model.objects.filter(**{link: OuterRef('pk')})
+            .order_by().values(link).annotate(total=Count('pk')).values('total')
+        )
+        parent_model.objects.update(**{
+            counter: Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_squashed_0012_deploystate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kanbancard',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='kanbancard',
+            name='files_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Файлов'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='files_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Файлов'),
+        ),
+        migrations.AddField(
+            model_name='stage',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='stage',
+            name='tasks_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Задач'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Поле сводки, дочерняя модель, путь к проекту, условие
+PROGRESS = [
+    ('stages_total', 'stage', 'project', Q()),
+    ('stages_approved', 'stage', 'project', Q(status='approved')),
+    ('tasks_total', 'task', 'stage__project', Q()),
+    ('tasks_completed', 'task', 'stage__project', Q(status='completed')),
+    ('tasks_overdue', 'task', 'stage__project', Q(is_overdue=True)),
+]
+
+
+def fill_progress(apps, schema_editor):
+    """Отмечаем просроченные задачи и заполняем сводку: один UPDATE на поле"""
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    Task.objects.filter(deadline__lte=timezone.now()).exclude(status='completed').update(is_overdue=True)
+    for field, child_name, link, condition in PROGRESS:
+        child_model = apps.get_model('projects', child_name)
+        counts = (
+            child_model.objects.filter(condition, **{link: OuterRef('pk')})
+            .order_by().values(link).annotate(total=Count('pk')).values('total')
+        )
+        Project.objects.update(**{field: Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0013_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='stages_approved',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Принято этапов'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='stages_total',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Всего этапов'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_completed',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Выполнено задач'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_overdue',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Просрочено задач'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_total',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Всего задач'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='is_overdue',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Просрочена'),
+        ),
+        migrations.RunPython(fill_progress, migrations.RunPython.noop),
+    ]
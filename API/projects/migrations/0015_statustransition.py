@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0014_project_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('project', 'Проект'), ('stage', 'Этап'), ('task', 'Задача'), ('card', 'Карточка')], max_length=20, verbose_name='Объект')),
+                ('entity_id', models.BigIntegerField(verbose_name='ID объекта')),
+                ('title', models.CharField(max_length=200, verbose_name='Название')),
+                ('field', models.CharField(max_length=20, verbose_name='Поле')),
+                ('from_value', models.CharField(blank=True, max_length=20, verbose_name='Было')),
+                ('to_value', models.CharField(max_length=20, verbose_name='Стало')),
+                ('comment', models.TextField(blank=True, verbose_name='Комментарий')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_transitions', to=settings.AUTH_USER_MODEL, verbose_name='Кто изменил')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='projects.project', verbose_name='Проект')),
+            ],
+            options={
+                'verbose_name': 'Смена статуса',
+                'verbose_name_plural': 'Журнал смены статусов',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['project', '-created_at', '-id'], name='projects_transition_feed_idx'), models.Index(fields=['entity', 'entity_id', '-created_at'], name='projects_transition_entity_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import projects.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0015_statustransition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_projects', to=settings.AUTH_USER_MODEL, verbose_name='Взял на проверку'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взят на проверку до'),
+        ),
+        migrations.AddField(
+            model_name='stage',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_stages', to=settings.AUTH_USER_MODEL, verbose_name='Взял на проверку'),
+        ),
+        migrations.AddField(
+            model_name='stage',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взят на проверку до'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=projects.models.NullsFirstIndex(models.OrderBy(models.F('submitted_at'), nulls_first=True), models.F('id'), condition=models.Q(('status', 'submitted')), name='projects_project_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stage',
+            index=projects.models.NullsFirstIndex(models.OrderBy(models.F('submitted_at'), nulls_first=True), models.F('id'), condition=models.Q(('status', 'submitted')), name='projects_stage_queue_idx'),
+        ),
+    ]
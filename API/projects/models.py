@@ -1,10 +1,45 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinLengthValidator
+from django.utils import timezone
 
 User = get_user_model()
 
 
+class CounterFieldsMixin:
+    """Модель со счетчиками дочерних объектов (см. projects/counters.py)"""
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        # Счетчики меняет только UPDATE с F(): сохранение загруженного объекта их
+        # не перезаписывает, иначе приращения от параллельных запросов теряются
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class NullsFirstIndex(models.Index):
+    """
+    Индекс по выражениям с NULLS FIRST (F('поле').asc(nulls_first=True)).
+
+    SQLite не допускает NULLS FIRST в CREATE INDEX, но и без него ставит NULL
+    первыми при ASC: там индекс строится по тем же колонкам без уточнения.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'sqlite':
+            fields = [getattr(expression, 'expression', expression).name for expression in self.expressions]
+            index = models.Index(fields=fields, condition=self.condition, name=self.name)
+            return index.create_sql(model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+
 class Team(models.Model):
     """Модель команды"""
     name = models.CharField(max_length=200, validators=[MinLengthValidator(3)], verbose_name='Название команды')
@@ -52,7 +87,7 @@ class TeamMember(models.Model):
         return f"{self.user.email} - {self.team.name}"
 
 
-class Project(models.Model):
+class Project(CounterFieldsMixin, models.Model):
     """Модель проекта (паспорт/инициатива)"""
     PROJECT_STATUS_CHOICES = [
         ('draft', 'Черновик'),
@@ -82,11 +117,34 @@ class Project(models.Model):
     submitted_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата отправки на проверку')
     reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_projects', verbose_name='Проверил')
     reviewed_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата проверки')
+    # Очередь проверки (projects/review_queue.py): кто взял работу и до какого времени
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_projects', verbose_name='Взял на проверку')
+    claimed_until = models.DateTimeField(null=True, blank=True, verbose_name='Взят на проверку до')
+    # Счетчики поддерживаются сигналами (projects/counters.py), пересчет - recount_counters
+    comments_count = models.IntegerField(default=0, editable=False, verbose_name='Комментариев')
+    files_count = models.IntegerField(default=0, editable=False, verbose_name='Файлов')
+    # Сводка выполнения: поддерживается сигналами этапов и задач (projects/progress.py)
+    stages_total = models.IntegerField(default=0, editable=False, verbose_name='Всего этапов')
+    stages_approved = models.IntegerField(default=0, editable=False, verbose_name='Принято этапов')
+    tasks_total = models.IntegerField(default=0, editable=False, verbose_name='Всего задач')
+    tasks_completed = models.IntegerField(default=0, editable=False, verbose_name='Выполнено задач')
+    tasks_overdue = models.IntegerField(default=0, editable=False, verbose_name='Просрочено задач')
+    counter_fields = (
+        'comments_count', 'files_count',
+        'stages_total', 'stages_approved', 'tasks_total', 'tasks_completed', 'tasks_overdue',
+    )
 
     class Meta:
         verbose_name = 'Проект'
         verbose_name_plural = 'Проекты'
         ordering = ['-created_at']
+        indexes = [
+            # Очередь проверки: самые ранние работы на проверке, без даты отправки - первыми
+            NullsFirstIndex(
+                models.F('submitted_at').asc(nulls_first=True), models.F('id'),
+                condition=models.Q(status='submitted'), name='projects_project_queue_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -109,7 +167,7 @@ class ProjectComment(models.Model):
         return f"{self.author.email} - {self.project.name}"
 
 
-class Stage(models.Model):
+class Stage(CounterFieldsMixin, models.Model):
     """Модель этапа проекта"""
     STAGE_STATUS_CHOICES = [
         ('in_progress', 'В работе'),
@@ -132,11 +190,22 @@ class Stage(models.Model):
     submitted_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата отправки на проверку')
     reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_stages', verbose_name='Проверил')
     reviewed_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата проверки')
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_stages', verbose_name='Взял на проверку')
+    claimed_until = models.DateTimeField(null=True, blank=True, verbose_name='Взят на проверку до')
+    tasks_count = models.IntegerField(default=0, editable=False, verbose_name='Задач')
+    comments_count = models.IntegerField(default=0, editable=False, verbose_name='Комментариев')
+    counter_fields = ('tasks_count', 'comments_count')
 
     class Meta:
         verbose_name = 'Этап'
         verbose_name_plural = 'Этапы'
         ordering = ['order', 'created_at']
+        indexes = [
+            NullsFirstIndex(
+                models.F('submitted_at').asc(nulls_first=True), models.F('id'),
+                condition=models.Q(status='submitted'), name='projects_stage_queue_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.project.name} - {self.name}"
@@ -179,6 +248,7 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата выполнения')
+    is_overdue = models.BooleanField(default=False, editable=False, verbose_name='Просрочена')
 
     class Meta:
         verbose_name = 'Задача'
@@ -188,6 +258,21 @@ class Task(models.Model):
     def __str__(self):
         return f"{self.stage.name} - {self.name}"
 
+    def check_overdue(self, now=None):
+        """Дедлайн прошел, а задача не выполнена"""
+        if self.deadline is None or self.status == 'completed':
+            return False
+        return self.deadline <= (now or timezone.now())
+
+    def save(self, *args, **kwargs):
+        # is_overdue хранится, чтобы сводка проекта считалась без обхода задач;
+        # после дедлайна его обновляет задача projects.mark_task_overdue
+        self.is_overdue = self.check_overdue()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_overdue'}
+        super().save(*args, **kwargs)
+
 
 class KnowledgeBase(models.Model):
     """Модель базы знаний (материалы для студентов)"""
@@ -250,7 +335,7 @@ class ProjectCheck(models.Model):
         return f"{self.teacher.email} - {self.project.name}"
 
 
-class KanbanCard(models.Model):
+class KanbanCard(CounterFieldsMixin, models.Model):
     """Модель карточки канбан-доски проекта"""
     COLUMN_CHOICES = [
         ('column1', 'Колонка 1'),
@@ -266,6 +351,9 @@ class KanbanCard(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_kanban_cards', verbose_name='Создатель')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+    files_count = models.IntegerField(default=0, editable=False, verbose_name='Файлов')
+    comments_count = models.IntegerField(default=0, editable=False, verbose_name='Комментариев')
+    counter_fields = ('files_count', 'comments_count')
 
     class Meta:
         verbose_name = 'Карточка канбан-доски'
@@ -280,6 +368,7 @@ class KanbanCardFile(models.Model):
     """Модель файла, прикрепленного к карточке канбан-доски"""
     card = models.ForeignKey(KanbanCard, on_delete=models.CASCADE, related_name='files', verbose_name='Карточка')
     file = models.FileField(upload_to='kanban_files/', verbose_name='Файл')
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Уменьшенные копии')
     name = models.CharField(max_length=200, blank=True, verbose_name='Название файла')
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploaded_kanban_files', verbose_name='Загрузил')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата загрузки')
@@ -329,4 +418,94 @@ class KanbanCardCheck(models.Model):
         return f"{self.teacher.email} - {self.card.title}"
 
 
+class UploadSession(models.Model):
+    """Модель сессии загрузки файла: по частям через API или напрямую в хранилище"""
+    TARGET_CHOICES = [
+        ('project_file', 'Файл проекта'),
+        ('card_file', 'Файл карточки'),
+        ('stage_artifact', 'Артефакт этапа'),
+        ('project_passport', 'Паспорт проекта'),
+    ]
+
+    MODE_CHOICES = [
+        ('chunked', 'По частям через API'),
+        ('direct', 'Напрямую в хранилище'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='chunked', verbose_name='Способ загрузки')
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES, verbose_name='Куда прикрепить')
+    target_id = models.PositiveBigIntegerField(verbose_name='ID объекта')
+    filename = models.CharField(max_length=200, verbose_name='Имя файла')
+    size = models.PositiveBigIntegerField(verbose_name='Размер файла')
+    checksum = models.CharField(max_length=64, verbose_name='SHA-256')
+    received = models.PositiveBigIntegerField(default=0, verbose_name='Получено байт')
+    object_name = models.CharField(max_length=300, blank=True, verbose_name='Имя объекта в хранилище')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions', verbose_name='Загружает')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+
+    class Meta:
+        verbose_name = 'Сессия загрузки'
+        verbose_name_plural = 'Сессии загрузки'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.created_by.email} - {self.filename}"
+
+
+class DeployState(models.Model):
+    """Отпечаток примененных миграций: при совпадении контейнер стартует без подготовки базы"""
+    name = models.CharField(max_length=50, unique=True, verbose_name='Название')
+    fingerprint = models.CharField(max_length=64, verbose_name='Отпечаток')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+
+    class Meta:
+        verbose_name = 'Состояние развертывания'
+        verbose_name_plural = 'Состояния развертывания'
+
+    def __str__(self):
+        return f"{self.name}: {self.fingerprint[:12]}"
+
+
+class StatusTransition(models.Model):
+    """Журнал смены статусов и колонок (записи только добавляются)"""
+    ENTITY_CHOICES = [
+        ('project', 'Проект'),
+        ('stage', 'Этап'),
+        ('task', 'Задача'),
+        ('card', 'Карточка'),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='transitions', verbose_name='Проект')
+    entity = models.CharField(max_length=20, choices=ENTITY_CHOICES, verbose_name='Объект')
+    entity_id = models.BigIntegerField(verbose_name='ID объекта')
+    # Название объекта на момент перехода: лента не читает таблицы объектов
+    title = models.CharField(max_length=200, verbose_name='Название')
+    field = models.CharField(max_length=20, verbose_name='Поле')
+    from_value = models.CharField(max_length=20, blank=True, verbose_name='Было')
+    to_value = models.CharField(max_length=20, verbose_name='Стало')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='status_transitions', verbose_name='Кто изменил')
+    comment = models.TextField(blank=True, verbose_name='Комментарий')
+    # Не auto_now_add: seed_demo и импорт истории записывают прошлые даты
+    created_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Дата')
+
+    class Meta:
+        verbose_name = 'Смена статуса'
+        verbose_name_plural = 'Журнал смены статусов'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['project', '-created_at', '-id'], name='projects_transition_feed_idx'),
+            models.Index(fields=['entity', 'entity_id', '-created_at'], name='projects_transition_entity_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entity_display()} {self.title}: {self.from_value} -> {self.to_value}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Записи журнала смены статусов не изменяются')
+        super().save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        raise ValueError('Записи журнала смены статусов не удаляются')
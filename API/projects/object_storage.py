@@ -0,0 +1,131 @@
+"""
+Прямая загрузка и скачивание файлов через S3-совместимое хранилище.
+
+Включается MEDIA_STORAGE=s3. API выдает клиенту короткоживущую
+подписанную ссылку на PUT, клиент загружает файл прямо в хранилище, а при
+завершении сессии API проверяет объект (HEAD) и только записывает его ключ
+в FileField. Скачивание - редирект на подписанную ссылку GET.
+
+При завершении сверяются размер и SHA-256 объекта. Хранилище проверяет
+SHA-256 при загрузке по подписанному заголовку x-amz-checksum-sha256 и
+отдает его в HEAD; если контрольной суммы в ответе нет (хранилище ее не
+поддерживает или объект записан без нее), API считает ее по содержимому.
+
+Ссылки подписываются клиентом с публичным адресом хранилища
+(S3_PUBLIC_ENDPOINT_URL): внутри docker API обращается к minio:9000, а
+браузер - к адресу, проброшенному наружу.
+"""
+import base64
+import binascii
+import hashlib
+import posixpath
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.http import content_disposition_header
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def is_enabled():
+    return settings.MEDIA_STORAGE == 's3'
+
+
+def get_client(public=False):
+    """Клиент boto3; public=True - для подписи ссылок, которые откроет браузер"""
+    import boto3
+    from botocore.config import Config
+
+    endpoint_url = settings.S3_ENDPOINT_URL or None
+    if public and settings.S3_PUBLIC_ENDPOINT_URL:
+        endpoint_url = settings.S3_PUBLIC_ENDPOINT_URL
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+        region_name=settings.S3_REGION_NAME or None,
+        config=Config(signature_version='s3v4', s3={'addressing_style': 'path'}),
+    )
+
+
+def get_object_key(name):
+    """Ключ объекта в бакете для имени файла из FileField"""
+    location = getattr(default_storage, 'location', '')
+    return posixpath.join(location, name) if location else name
+
+
+def build_direct_upload_name(field_file, instance, filename, session):
+    """Имя файла для прямой загрузки: upload_to поля + каталог сессии"""
+    name = field_file.field.generate_filename(instance, filename)
+    directory, basename = posixpath.split(name)
+    name = posixpath.join(directory, session.pk.hex, basename)
+    excess = len(name) - field_file.field.max_length
+    if excess > 0:
+        # Имя не помещается в FileField: укорачиваем его, сохраняя расширение
+        root, ext = posixpath.splitext(basename)
+        name = posixpath.join(directory, session.pk.hex, root[:-excess] + ext)
+    return name
+
+
+def presign_upload(name, checksum):
+    """Подписанная ссылка на PUT и заголовки, которые клиент должен отправить"""
+    # Хранилище само сверит SHA-256 при загрузке и отклонит поврежденный файл
+    checksum_b64 = base64.b64encode(bytes.fromhex(checksum)).decode()
+    url = get_client(public=True).generate_presigned_url(
+        'put_object',
+        Params={
+            'Bucket': settings.S3_BUCKET_NAME,
+            'Key': get_object_key(name),
+            'ChecksumSHA256': checksum_b64,
+        },
+        ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRES,
+    )
+    return url, {'x-amz-checksum-sha256': checksum_b64}
+
+
+def head_object(name):
+    """(размер, SHA-256 в hex или None) загруженного объекта или None, если объекта нет"""
+    from botocore.exceptions import ClientError
+
+    try:
+        head = get_client().head_object(
+            Bucket=settings.S3_BUCKET_NAME, Key=get_object_key(name), ChecksumMode='ENABLED'
+        )
+    except ClientError as error:
+        if error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+    checksum = head.get('ChecksumSHA256')
+    try:
+        # Составная сумма multipart-загрузки ("...-N") с SHA-256 файла не сравнима
+        checksum = base64.b64decode(checksum, validate=True).hex() if checksum else None
+    except binascii.Error:
+        checksum = None
+    return head['ContentLength'], checksum
+
+
+def get_object_checksum(name):
+    """SHA-256 объекта в hex по его содержимому (потоком, без загрузки в память)"""
+    body = get_client().get_object(Bucket=settings.S3_BUCKET_NAME, Key=get_object_key(name))['Body']
+    checksum = hashlib.sha256()
+    for chunk in body.iter_chunks(READ_BLOCK_SIZE):
+        checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def delete_object(name):
+    get_client().delete_object(Bucket=settings.S3_BUCKET_NAME, Key=get_object_key(name))
+
+
+def presign_download(name, filename):
+    """Подписанная ссылка на скачивание с исходным именем файла"""
+    return get_client(public=True).generate_presigned_url(
+        'get_object',
+        Params={
+            'Bucket': settings.S3_BUCKET_NAME,
+            'Key': get_object_key(name),
+            'ResponseContentDisposition': content_disposition_header(False, filename),
+        },
+        ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRES,
+    )
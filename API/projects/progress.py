@@ -0,0 +1,102 @@
+"""
+Сводка выполнения проекта: этапы всего/принято, задачи всего/выполнено/просрочено.
+
+Колонки Project.stages_*/tasks_* меняются приращениями: сигналы (signals.py)
+сравнивают вклад этапа или задачи до и после сохранения и применяют разницу
+одним UPDATE с F(). Просрочка зависит от времени, поэтому у задачи с
+дедлайном в очереди лежит projects.mark_task_overdue на момент дедлайна.
+recount_counters пересчитывает сводку целиком.
+"""
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from jobs.queue import enqueue
+
+from .cache import invalidate_data_version
+from .counters import PROGRESS_COUNTERS
+from .models import Project, Stage, Task
+
+PROGRESS_FIELDS = list(PROGRESS_COUNTERS)
+
+
+def stage_progress(stage):
+    """Вклад этапа в сводку проекта"""
+    return {'stages_total': 1, 'stages_approved': int(stage.status == 'approved')}
+
+
+def task_progress(task):
+    """Вклад задачи в сводку проекта (по сохраненному is_overdue)"""
+    return {
+        'tasks_total': 1,
+        'tasks_completed': int(task.status == 'completed'),
+        'tasks_overdue': int(task.is_overdue),
+    }
+
+
+def get_stage_project_id(stage_id):
+    return Stage.objects.filter(pk=stage_id).values_list('project_id', flat=True).first()
+
+
+def apply_progress(project_id, before, after, project=None):
+    """Прибавляет к сводке проекта разницу вкладов after - before"""
+    delta = {
+        field: after.get(field, 0) - before.get(field, 0)
+        for field in set(before) | set(after)
+    }
+    delta = {field: value for field, value in delta.items() if value}
+    if not delta or project_id is None:
+        return
+    Project.objects.filter(pk=project_id).update(**{field: F(field) + value for field, value in delta.items()})
+    # Загруженный в запросе проект сериализуется в ответе с новыми значениями
+    if project is not None and project.pk == project_id:
+        for field, value in delta.items():
+            if field in project.__dict__:
+                project.__dict__[field] += value
+    # Сводка входит в кэшированный bootstrap
+    invalidate_data_version(project_ids=[project_id])
+
+
+def apply_progress_many(deltas):
+    """Приращения сводки нескольких проектов одним UPDATE: {id проекта: {поле: приращение}}"""
+    deltas = {
+        project_id: {field: value for field, value in delta.items() if value}
+        for project_id, delta in deltas.items() if project_id is not None
+    }
+    deltas = {project_id: delta for project_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    fields = {field for delta in deltas.values() for field in delta}
+    Project.objects.filter(pk__in=deltas).update(**{
+        field: F(field) + Case(
+            *[When(pk=project_id, then=Value(delta.get(field, 0))) for project_id, delta in deltas.items()],
+            default=Value(0),
+        )
+        for field in fields
+    })
+    invalidate_data_version(project_ids=deltas)
+
+
+def schedule_overdue_check(task):
+    """Ставит пересчет просрочки задачи на момент ее дедлайна"""
+    if task.deadline is not None and task.status != 'completed' and task.deadline > timezone.now():
+        enqueue('projects.mark_task_overdue', {'pk': task.pk}, run_at=task.deadline, key=f'task:{task.pk}')
+
+
+def mark_task_overdue(pk):
+    """Обновляет is_overdue задачи; сигналы переносят изменение в сводку проекта"""
+    task = Task.objects.filter(pk=pk).first()
+    if task is not None and task.check_overdue() != task.is_overdue:
+        task.save(update_fields=['is_overdue'])
+
+
+def refresh_overdue_tasks(dry_run=False):
+    """Исправляет is_overdue задач, пропущенных очередью; возвращает их число"""
+    now = timezone.now()
+    overdue = Q(deadline__lte=now) & ~Q(status='completed')
+    stale = [
+        (Task.objects.filter(overdue, is_overdue=False), True),
+        (Task.objects.filter(~overdue, is_overdue=True), False),
+    ]
+    if dry_run:
+        return sum(queryset.count() for queryset, _ in stale)
+    return sum(queryset.update(is_overdue=value) for queryset, value in stale)
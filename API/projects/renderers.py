@@ -0,0 +1,11 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class NormalizedJSONRenderer(JSONRenderer):
+    """
+    JSON в нормализованном формате: {"data": ..., "included": {...}}.
+
+    Выбирается параметром ?format=normalized. Сама нормализация выполняется
+    сериализаторами (SideloadMixin), рендерер отвечает только за выбор формата.
+    """
+    format = 'normalized'
@@ -0,0 +1,100 @@
+"""
+Очередь проверки: преподаватель берет следующую работу с арендой на время проверки.
+
+Проект или этап на проверке свободен, если его никто не взял или аренда
+(claimed_until) истекла. claim_next выбирает самую раннюю свободную работу
+через SELECT ... FOR UPDATE SKIP LOCKED: строку, которую в этот момент берет
+другой преподаватель, запрос пропускает, а не ждет. Кто взял работу, хранится
+в той же строке, поэтому после снятия блокировки PostgreSQL перепроверяет
+условие и одну работу не получат двое.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Project, Stage
+
+QUEUE_MODELS = {'project': Project, 'stage': Stage}
+# Порядок очереди; совпадает с частичными индексами *_queue_idx и queue_key
+QUEUE_ORDER = (F('submitted_at').asc(nulls_first=True), 'id')
+
+
+def get_lease_end(now):
+    return now + timedelta(minutes=settings.REVIEW_CLAIM_MINUTES)
+
+
+def unclaimed(model, now):
+    """Работы на проверке, которые никто не проверяет"""
+    return model.objects.filter(
+        Q(claimed_by__isnull=True) | Q(claimed_until__lte=now), status='submitted'
+    )
+
+
+def held_by(model, user, now):
+    """Работы на проверке, которые сейчас проверяет user"""
+    return model.objects.filter(status='submitted', claimed_by=user, claimed_until__gt=now)
+
+
+def queue_key(item):
+    # Работы без даты отправки (созданные до ее появления) - в начале очереди, как в QUEUE_ORDER
+    return (item.submitted_at is not None, item.submitted_at or timezone.now(), item.pk)
+
+
+def claim_next(user, kinds=tuple(QUEUE_MODELS)):
+    """
+    Берет работу на проверку для user и возвращает (вид, объект) или None.
+
+    Если у преподавателя уже есть взятая работа, аренда продлевается и
+    возвращается она же: повторный запрос не собирает работы впрок.
+    """
+    now = timezone.now()
+    lease_end = get_lease_end(now)
+    with transaction.atomic():
+        candidates = []
+        for kind in kinds:
+            model = QUEUE_MODELS[kind]
+            item = held_by(model, user, now).order_by(*QUEUE_ORDER).first()
+            if item is None:
+                item = (
+                    unclaimed(model, now).order_by(*QUEUE_ORDER)
+                    .select_for_update(skip_locked=True).first()
+                )
+            if item is not None:
+                candidates.append((kind, item))
+        if not candidates:
+            return None
+        held = [candidate for candidate in candidates if candidate[1].claimed_by_id == user.pk]
+        kind, item = min(held or candidates, key=lambda candidate: queue_key(candidate[1]))
+        # QuerySet.update: аренда не меняет updated_at и не вызывает сигналы сводки
+        type(item).objects.filter(pk=item.pk).update(claimed_by=user, claimed_until=lease_end)
+        item.claimed_by, item.claimed_until = user, lease_end
+    return kind, item
+
+
+def release(user, kind, pk):
+    """Возвращает работу в очередь; False, если user ее не проверяет"""
+    released = held_by(QUEUE_MODELS[kind], user, timezone.now()).filter(pk=pk).update(
+        claimed_by=None, claimed_until=None
+    )
+    return bool(released)
+
+
+def is_claimed_by_other(item, user, now=None):
+    """Работу сейчас проверяет не user, а другой преподаватель"""
+    if item.claimed_by_id in (None, user.pk) or item.claimed_until is None:
+        return False
+    return item.claimed_until > (now or timezone.now())
+
+
+def get_other_reviewer(item, user):
+    """Преподаватель, который сейчас проверяет работу вместо user, или None"""
+    return item.claimed_by if is_claimed_by_other(item, user) else None
+
+
+def finish_review(item):
+    """Снимает аренду с проверенной работы (перед сохранением нового статуса)"""
+    item.claimed_by = None
+    item.claimed_until = None
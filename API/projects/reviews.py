@@ -0,0 +1,123 @@
+"""
+Пакетная проверка проектов и этапов (bulk_review).
+
+Состояние всех работ пакета читается одним запросом с блокировкой строк,
+новые статусы пишутся одним bulk_update, комментарии и записи журнала смены
+статусов - bulk_create. Сигналы при этом не срабатывают, поэтому счетчики
+комментариев, сводка выполнения проектов и версия данных bootstrap
+обновляются здесь же - несколькими UPDATE на весь пакет.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import progress, review_queue
+from .cache import invalidate_data_version
+from .models import Project, ProjectComment, Stage, StageComment, StatusTransition
+from .transitions import build_transition
+
+# Решение преподавателя и статус, который оно ставит
+DECISIONS = {
+    Project: {'approve': 'approved', 'request_revision': 'revision', 'reject': 'rejected'},
+    Stage: {'approve': 'approved', 'request_revision': 'revision'},
+}
+# Модель комментария и поле связи с работой
+COMMENTS = {
+    Project: (ProjectComment, 'project'),
+    Stage: (StageComment, 'stage'),
+}
+# Поля, которые читаются для проверки и пишутся bulk_update
+LOADED_FIELDS = {
+    Project: ['id', 'name', 'status', 'claimed_by', 'claimed_until'],
+    Stage: ['id', 'name', 'status', 'claimed_by', 'claimed_until', 'project'],
+}
+UPDATED_FIELDS = ['status', 'reviewed_by', 'reviewed_at', 'claimed_by', 'claimed_until', 'updated_at']
+
+
+def parse_item(raw, decisions):
+    """(id, решение, комментарий) из элемента запроса или None, если он неверный"""
+    if not isinstance(raw, dict):
+        return None
+    pk, decision, comment = raw.get('id'), raw.get('decision'), raw.get('comment') or ''
+    if not isinstance(pk, int) or isinstance(pk, bool) or decision not in decisions or not isinstance(comment, str):
+        return None
+    return pk, decision, comment.strip()
+
+
+def bulk_review(model, raw_items, user):
+    """
+    Применяет решения [{"id", "decision", "comment"}] к проектам или этапам.
+
+    Возвращает результат по каждому элементу в порядке запроса:
+    {"id", "status"} или {"id", "error"} с кодом invalid, duplicate,
+    not_found, not_submitted или claimed (работу проверяет другой преподаватель).
+    """
+    decisions = DECISIONS[model]
+    comment_model, comment_link = COMMENTS[model]
+    parsed = [parse_item(raw, decisions) for raw in raw_items]
+    requested = defaultdict(int)
+    for item in parsed:
+        if item is not None:
+            requested[item[0]] += 1
+
+    now = timezone.now()
+    results = []
+    reviewed = []
+    comments = []
+    transitions = []
+    progress_deltas = defaultdict(lambda: defaultdict(int))
+    with transaction.atomic():
+        # Строки блокируются по порядку id: параллельные пакеты не взаимоблокируются
+        objects = model.objects.filter(pk__in=list(requested)).only(*LOADED_FIELDS[model])
+        objects = {obj.pk: obj for obj in objects.order_by('pk').select_for_update(of=('self',))}
+
+        for raw, item in zip(raw_items, parsed):
+            if item is None:
+                results.append({'id': raw.get('id') if isinstance(raw, dict) else None, 'error': 'invalid'})
+                continue
+            pk, decision, comment = item
+            obj = objects.get(pk)
+            if requested[pk] > 1:
+                error = 'duplicate'
+            elif obj is None:
+                error = 'not_found'
+            elif obj.status != 'submitted':
+                error = 'not_submitted'
+            elif review_queue.is_claimed_by_other(obj, user, now):
+                error = 'claimed'
+            else:
+                error = None
+            if error is not None:
+                results.append({'id': pk, 'error': error})
+                continue
+
+            previous = obj.status
+            if model is Stage:
+                before = progress.stage_progress(obj)
+            obj.status = decisions[decision]
+            obj.reviewed_by = user
+            obj.reviewed_at = now
+            obj.updated_at = now
+            review_queue.finish_review(obj)
+            if model is Stage:
+                for field, value in progress.stage_progress(obj).items():
+                    progress_deltas[obj.project_id][field] += value - before[field]
+            reviewed.append(obj)
+            transitions.append(build_transition(obj, 'status', previous, user, comment))
+            if comment:
+                comments.append(comment_model(**{comment_link: obj, 'author': user, 'text': comment}))
+            results.append({'id': pk, 'status': obj.status})
+
+        if reviewed:
+            model.objects.bulk_update(reviewed, UPDATED_FIELDS)
+            StatusTransition.objects.bulk_create(transitions)
+            if comments:
+                comment_model.objects.bulk_create(comments)
+                model.objects.filter(pk__in=[getattr(comment, f'{comment_link}_id') for comment in comments]).update(
+                    comments_count=F('comments_count') + 1
+                )
+            progress.apply_progress_many(progress_deltas)
+            invalidate_data_version(project_ids=[obj.pk if model is Project else obj.project_id for obj in reviewed])
+    return results
@@ -0,0 +1,180 @@
+"""
+Массовый импорт списка студентов: пользователи, команды и участники.
+
+Список проверяется целиком за один проход; если есть ошибки, ничего не
+создается. Иначе пользователи, команды и участники создаются через
+bulk_create в одной транзакции - несколько запросов на весь список.
+
+Импортированные пользователи создаются без пароля с отметкой
+pending_claim; письма с кодом приглашения, по которому студент задает
+пароль, отправляет фоновая задача (users/claims.py). Повторный импорт
+отправляет новые коды тем, кто еще не активировал аккаунт.
+"""
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from jobs.queue import enqueue
+
+from .cache import invalidate_data_version
+from .models import Team, TeamMember
+
+User = get_user_model()
+
+ROSTER_FIELDS = ['email', 'first_name', 'last_name', 'team', 'role']
+ROLES = dict(TeamMember.ROLE_CHOICES)
+
+
+def parse_roster(data, uploaded_file=None):
+    """Строки списка из JSON ({"rows": [...]} или список) или CSV-файла"""
+    if uploaded_file is not None:
+        text = uploaded_file.read().decode('utf-8-sig')
+        dialect = csv.Sniffer().sniff(text[:2048], delimiters=',;\t') if text.strip() else csv.excel
+        return list(csv.DictReader(io.StringIO(text), dialect=dialect))
+    if isinstance(data, dict):
+        data = data.get('rows')
+    if not isinstance(data, list):
+        raise ValueError('Ожидается список строк или CSV-файл в поле file')
+    return data
+
+
+def clean_row(raw):
+    """Нормализует строку списка, возвращает (строка, ошибки)"""
+    if not isinstance(raw, dict):
+        return None, {'row': 'Строка должна быть объектом'}
+    row = {field: str(raw.get(field) or '').strip() for field in ROSTER_FIELDS}
+    row['email'] = row['email'].lower()
+    row['role'] = row['role'] or 'member'
+
+    errors = {}
+    if not row['email']:
+        errors['email'] = 'Email обязателен'
+    elif not row['email'].endswith('@dvfu.ru') or row['email'].count('@') != 1:
+        errors['email'] = 'Email должен быть в формате @dvfu.ru'
+    if row['team'] and not 3 <= len(row['team']) <= 200:
+        errors['team'] = 'Название команды от 3 до 200 символов'
+    if row['role'] not in ROLES:
+        errors['role'] = f'Роль: {", ".join(ROLES)}'
+    if row['role'] == 'team_leader' and not row['team']:
+        errors['role'] = 'Тимлиду нужна команда'
+    return row, errors
+
+
+def validate_roster(raw_rows):
+    """Проверяет весь список; возвращает (строки, ошибки по номерам строк)"""
+    rows = []
+    errors = []
+    seen_members = set()
+    for number, raw in enumerate(raw_rows, start=1):
+        row, row_errors = clean_row(raw)
+        if row is not None and not row_errors:
+            member_key = (row['email'], row['team'])
+            if row['team'] and member_key in seen_members:
+                row_errors['email'] = 'Пользователь уже указан в этой команде'
+            seen_members.add(member_key)
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+        rows.append(row)
+
+    # Существующие команды с одинаковым названием нельзя сопоставить однозначно
+    team_names = {row['team'] for row in rows if row and row['team']}
+    duplicates = set(
+        Team.objects.filter(name__in=team_names, is_active=True)
+        .values('name').annotate(count=Count('id')).filter(count__gt=1)
+        .values_list('name', flat=True)
+    )
+    for number, row in enumerate(rows, start=1):
+        if row and row['team'] in duplicates:
+            errors.append({'row': number, 'errors': {'team': 'Несколько активных команд с таким названием'}})
+    errors.sort(key=lambda item: item['row'])
+    return rows, errors
+
+
+@transaction.atomic
+def import_roster(rows, imported_by):
+    """Создает недостающих пользователей, команды и участников; возвращает результаты по строкам"""
+    now = timezone.now()
+    emails = {row['email'] for row in rows}
+    # Email в базе может отличаться регистром
+    users = {
+        user.email.lower(): user
+        for user in User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails)
+    }
+
+    new_users = {}
+    for row in rows:
+        if row['email'] not in users and row['email'] not in new_users:
+            new_users[row['email']] = User(
+                username=row['email'],
+                email=row['email'],
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                password=make_password(None),
+                pending_claim=True,
+            )
+    User.objects.bulk_create(new_users.values())
+    users.update(new_users)
+
+    team_names = {row['team'] for row in rows if row['team']}
+    teams = {team.name: team for team in Team.objects.filter(name__in=team_names, is_active=True)}
+    leaders = {}
+    for row in rows:
+        if row['role'] == 'team_leader':
+            leaders.setdefault(row['team'], users[row['email']])
+    new_teams = {
+        name: Team(name=name, created_by=leaders.get(name, imported_by))
+        for name in team_names if name not in teams
+    }
+    Team.objects.bulk_create(new_teams.values())
+    teams.update(new_teams)
+
+    existing_members = set(TeamMember.objects.filter(
+        team__in=teams.values(), user__in=[users[email] for email in emails]
+    ).values_list('team_id', 'user_id'))
+    new_members = []
+    results = []
+    for number, row in enumerate(rows, start=1):
+        user = users[row['email']]
+        result = {
+            'row': number,
+            'email': row['email'],
+            'user': 'created' if row['email'] in new_users else 'existing',
+        }
+        if row['team']:
+            team = teams[row['team']]
+            result['team'] = row['team']
+            if (team.id, user.id) in existing_members:
+                result['membership'] = 'existing'
+            else:
+                existing_members.add((team.id, user.id))
+                new_members.append(TeamMember(
+                    team=team,
+                    user=user,
+                    role=row['role'],
+                    is_confirmed=True,
+                    invited_by=imported_by,
+                    joined_at=now,
+                ))
+                result['membership'] = 'created'
+        results.append(result)
+    TeamMember.objects.bulk_create(new_members)
+
+    # bulk_create не отправляет сигналы, поэтому кэш сбрасываем сами
+    invalidate_data_version(team_ids=[member.team_id for member in new_members])
+    pending = sorted(user.email for user in users.values() if user.pending_claim)
+    if pending:
+        enqueue('users.send_claim_invites', {'emails': pending})
+    return {
+        'users_created': len(new_users),
+        'teams_created': len(new_teams),
+        'members_created': len(new_members),
+        'invites_sent': len(pending),
+        'results': results,
+    }
+
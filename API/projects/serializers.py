@@ -1,19 +1,71 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from . import object_storage
+from .media import build_download_url
 from .models import (
     Team, TeamMember, Project, ProjectComment, ProjectFile, ProjectCheck,
     Stage, StageComment, Task, KnowledgeBase,
-    KanbanCard, KanbanCardFile, KanbanCardComment, KanbanCardCheck
+    KanbanCard, KanbanCardFile, KanbanCardComment, KanbanCardCheck, UploadSession, StatusTransition
 )
 
 User = get_user_model()
 
 
-class UserShortSerializer(serializers.ModelSerializer):
+class SideloadMixin:
+    """
+    Вынос вложенного объекта в таблицу included (нормализованный формат ответа).
+
+    Если в контексте сериализатора есть словарь included, вложенный объект
+    сериализуется один раз и кладется в included[included_key], а на его месте
+    в ответе остается только id. Корневые объекты ответа не выносятся.
+    """
+    included_key = None
+
+    def _is_nested(self):
+        node = self
+        if isinstance(node.parent, serializers.ListSerializer):
+            node = node.parent
+        return node.parent is not None
+
+    def to_representation(self, instance):
+        included = self.context.get('included')
+        if included is None or not self._is_nested():
+            return super().to_representation(instance)
+        table = included.setdefault(self.included_key, {})
+        if instance.pk not in table:
+            table[instance.pk] = super().to_representation(instance)
+        return instance.pk
+
+
+class AvatarThumbnailsField(serializers.Field):
+    """Ссылки на уменьшенные копии аватара: {"small": url, "medium": url}"""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        sizes = (user.thumbnails or {}).get('sizes', {})
+        if not sizes:
+            return {}
+        storage = user.avatar.storage
+        request = self.context.get('request')
+        urls = {size_name: storage.url(name) for size_name, name in sizes.items()}
+        if request:
+            urls = {size_name: request.build_absolute_uri(url) for size_name, url in urls.items()}
+        return urls
+
+
+class UserShortSerializer(SideloadMixin, serializers.ModelSerializer):
     """Краткий сериализатор пользователя"""
+    included_key = 'users'
+    avatar_thumbnails = AvatarThumbnailsField()
+
     class Meta:
         model = User
-        fields = ['id', 'email', 'first_name', 'last_name', 'avatar']
+        fields = ['id', 'email', 'first_name', 'last_name', 'avatar', 'avatar_thumbnails']
 
 
 class TeamMemberSerializer(serializers.ModelSerializer):
@@ -56,8 +108,9 @@ class TeamSerializer(serializers.ModelSerializer):
         return False
 
 
-class ProjectCommentSerializer(serializers.ModelSerializer):
+class ProjectCommentSerializer(SideloadMixin, serializers.ModelSerializer):
     """Сериализатор комментария к проекту"""
+    included_key = 'project_comments'
     author = UserShortSerializer(read_only=True)
     
     class Meta:
@@ -66,8 +119,9 @@ class ProjectCommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'author', 'created_at', 'updated_at']
 
 
-class ProjectFileSerializer(serializers.ModelSerializer):
+class ProjectFileSerializer(SideloadMixin, serializers.ModelSerializer):
     """Сериализатор файла проекта"""
+    included_key = 'project_files'
     uploaded_by = UserShortSerializer(read_only=True)
     file_url = serializers.SerializerMethodField()
     
@@ -80,7 +134,7 @@ class ProjectFileSerializer(serializers.ModelSerializer):
         if obj.file:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.file.url)
+                return build_download_url(request, 'project-file-download', obj.pk)
         return None
 
 
@@ -100,10 +154,9 @@ class ProjectSerializer(serializers.ModelSerializer):
     team_name = serializers.CharField(source='team.name', read_only=True)
     created_by = UserShortSerializer(read_only=True)
     reviewed_by = UserShortSerializer(read_only=True)
+    claimed_by = UserShortSerializer(read_only=True)
     comments = ProjectCommentSerializer(many=True, read_only=True)
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True)
     files = ProjectFileSerializer(many=True, read_only=True)
-    files_count = serializers.IntegerField(source='files.count', read_only=True)
     teacher_checks = ProjectCheckSerializer(many=True, read_only=True)
     can_edit = serializers.SerializerMethodField()
     can_submit = serializers.SerializerMethodField()
@@ -114,16 +167,17 @@ class ProjectSerializer(serializers.ModelSerializer):
         model = Project
         fields = ['id', 'name', 'team', 'team_name', 'passport', 'passport_url', 'passport_text', 'description', 'status',
                   'kanban_column', 'order', 'created_by', 'created_at', 'updated_at', 
-                  'submitted_at', 'reviewed_by', 'reviewed_at', 'comments', 'comments_count',
-                  'files', 'files_count', 'teacher_checks', 'can_edit', 'can_submit']
+                  'submitted_at', 'reviewed_by', 'reviewed_at', 'claimed_by', 'claimed_until',
+                  'comments', 'comments_count', 'files', 'files_count', 'stages_total', 'stages_approved', 'tasks_total',
+                  'tasks_completed', 'tasks_overdue', 'teacher_checks', 'can_edit', 'can_submit']
         read_only_fields = ['id', 'created_by', 'created_at', 'updated_at',
-                           'submitted_at', 'reviewed_by', 'reviewed_at']
+                           'submitted_at', 'reviewed_by', 'reviewed_at', 'claimed_until']
     
     def get_passport_url(self, obj):
         if obj.passport:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.passport.url)
+                return build_download_url(request, 'project-download-passport', obj.pk)
         return None
     
     def get_can_edit(self, obj):
@@ -143,8 +197,9 @@ class ProjectSerializer(serializers.ModelSerializer):
         return False
 
 
-class StageCommentSerializer(serializers.ModelSerializer):
+class StageCommentSerializer(SideloadMixin, serializers.ModelSerializer):
     """Сериализатор комментария к этапу"""
+    included_key = 'stage_comments'
     author = UserShortSerializer(read_only=True)
     
     class Meta:
@@ -164,7 +219,7 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ['id', 'stage', 'name', 'description', 'assigned_to', 'assigned_to_id',
-                  'assigned_by', 'deadline', 'status', 'blocker', 'created_at',
+                  'assigned_by', 'deadline', 'is_overdue', 'status', 'blocker', 'created_at',
                   'updated_at', 'completed_at']
         read_only_fields = ['id', 'assigned_by', 'created_at', 'updated_at', 'completed_at']
 
@@ -173,8 +228,8 @@ class StageSerializer(serializers.ModelSerializer):
     """Сериализатор этапа"""
     tasks = TaskSerializer(many=True, read_only=True)
     comments = StageCommentSerializer(many=True, read_only=True)
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True)
     reviewed_by = UserShortSerializer(read_only=True)
+    claimed_by = UserShortSerializer(read_only=True)
     can_submit = serializers.SerializerMethodField()
     artifact_url = serializers.SerializerMethodField()
     
@@ -183,16 +238,16 @@ class StageSerializer(serializers.ModelSerializer):
         fields = ['id', 'project', 'name', 'description', 'criteria', 'artifact',
                   'artifact_url', 'artifact_description', 'deadline', 'status',
                   'order', 'created_at', 'updated_at', 'submitted_at',
-                  'reviewed_by', 'reviewed_at', 'tasks', 'comments', 'comments_count',
+                  'reviewed_by', 'reviewed_at', 'claimed_by', 'claimed_until', 'tasks', 'tasks_count', 'comments', 'comments_count',
                   'can_submit']
         read_only_fields = ['id', 'created_at', 'updated_at', 'submitted_at',
-                           'reviewed_by', 'reviewed_at']
+                           'reviewed_by', 'reviewed_at', 'claimed_until']
     
     def get_artifact_url(self, obj):
         if obj.artifact:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.artifact.url)
+                return build_download_url(request, 'stage-download-artifact', obj.pk)
         return None
     
     def get_can_submit(self, obj):
@@ -204,26 +259,37 @@ class StageSerializer(serializers.ModelSerializer):
         return False
 
 
-class KanbanCardFileSerializer(serializers.ModelSerializer):
+class KanbanCardFileSerializer(SideloadMixin, serializers.ModelSerializer):
     """Сериализатор файла карточки"""
+    included_key = 'card_files'
     uploaded_by = UserShortSerializer(read_only=True)
     file_url = serializers.SerializerMethodField()
+    thumbnail_urls = serializers.SerializerMethodField()
     
     class Meta:
         model = KanbanCardFile
-        fields = ['id', 'card', 'file', 'file_url', 'name', 'uploaded_by', 'created_at']
+        fields = ['id', 'card', 'file', 'file_url', 'thumbnail_urls', 'name', 'uploaded_by', 'created_at']
         read_only_fields = ['id', 'uploaded_by', 'created_at']
     
     def get_file_url(self, obj):
         if obj.file:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.file.url)
+                return build_download_url(request, 'kanban-card-file-download', obj.pk)
         return None
 
+    def get_thumbnail_urls(self, obj):
+        """Ссылки на уменьшенные копии картинки: {"preview": url}"""
+        url = self.get_file_url(obj)
+        if not url:
+            return {}
+        sizes = (obj.thumbnails or {}).get('sizes', {})
+        return {size_name: f'{url}&rendition={size_name}' for size_name in sizes}
 
-class KanbanCardCommentSerializer(serializers.ModelSerializer):
+
+class KanbanCardCommentSerializer(SideloadMixin, serializers.ModelSerializer):
     """Сериализатор комментария к карточке"""
+    included_key = 'card_comments'
     author = UserShortSerializer(read_only=True)
     
     class Meta:
@@ -246,9 +312,7 @@ class KanbanCardSerializer(serializers.ModelSerializer):
     """Сериализатор карточки канбан-доски"""
     created_by = UserShortSerializer(read_only=True)
     files = KanbanCardFileSerializer(many=True, read_only=True)
-    files_count = serializers.IntegerField(source='files.count', read_only=True)
     comments = KanbanCardCommentSerializer(many=True, read_only=True)
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True)
     teacher_checks = KanbanCardCheckSerializer(many=True, read_only=True)
     can_edit = serializers.SerializerMethodField()
     can_move = serializers.SerializerMethodField()
@@ -298,3 +362,41 @@ class KnowledgeBaseSerializer(serializers.ModelSerializer):
         model = KnowledgeBase
         fields = ['id', 'section', 'title', 'content', 'order', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class StatusTransitionSerializer(serializers.ModelSerializer):
+    """Сериализатор записи журнала смены статусов"""
+    actor = UserShortSerializer(read_only=True)
+
+    class Meta:
+        model = StatusTransition
+        fields = ['id', 'project', 'entity', 'entity_id', 'title', 'field', 'from_value', 'to_value',
+                  'actor', 'comment', 'created_at']
+        read_only_fields = fields
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Сериализатор сессии загрузки по частям или напрямую в хранилище"""
+    mode = serializers.ChoiceField(choices=UploadSession.MODE_CHOICES, required=False)
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'mode', 'target', 'target_id', 'filename', 'size', 'checksum', 'received',
+                  'created_at', 'updated_at']
+        read_only_fields = ['id', 'received', 'created_at', 'updated_at']
+
+    def validate_mode(self, value):
+        if value == 'direct' and not object_storage.is_enabled():
+            raise serializers.ValidationError('Прямая загрузка доступна только с объектным хранилищем')
+        return value
+
+    def validate_size(self, value):
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Максимальный размер файла {settings.UPLOAD_MAX_SIZE} байт')
+        return value
+
+    def validate_checksum(self, value):
+        value = value.lower()
+        if len(value) != 64 or any(char not in '0123456789abcdef' for char in value):
+            raise serializers.ValidationError('Ожидается SHA-256 в шестнадцатеричном виде')
+        return value
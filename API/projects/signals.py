@@ -0,0 +1,184 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+
+from . import progress, thumbnails
+from .cache import invalidate_data_version
+from .counters import COUNTERS, change_counter
+from .models import Team, TeamMember, Project, Stage, Task, KanbanCardFile
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Stage)
+@receiver(post_delete, sender=Stage)
+def invalidate_cached_summaries(sender, instance, **kwargs):
+    """Изменение команд, проектов или этапов меняет версии данных bootstrap их участников"""
+    if sender is Team:
+        invalidate_data_version(team_ids=[instance.pk])
+    elif sender is TeamMember:
+        # Удаленный участник уже не найдется среди участников команды
+        invalidate_data_version(team_ids=[instance.team_id], user_ids=[instance.user_id])
+    elif sender is Project:
+        invalidate_data_version(team_ids=[instance.team_id])
+    else:
+        # Этапы в bootstrap видны только преподавателям, сводку проекта обновляет progress
+        invalidate_data_version()
+
+
+@receiver(post_save, sender=User, dispatch_uid='avatar_thumbnails')
+@receiver(post_save, sender=KanbanCardFile, dispatch_uid='card_file_thumbnails')
+def create_thumbnails(sender, instance, **kwargs):
+    """После смены аватара или файла карточки создаем уменьшенные копии"""
+    kind = 'avatar' if sender is User else 'card_file'
+    _, field_name = thumbnails.THUMBNAIL_SOURCES[kind]
+    if thumbnails.needs_thumbnails(instance, field_name):
+        enqueue('projects.generate_thumbnails', {'kind': kind, 'pk': instance.pk},
+                priority=10, key=f'{kind}:{instance.pk}')
+
+
+@receiver(post_delete, sender=User, dispatch_uid='avatar_thumbnails_delete')
+@receiver(post_delete, sender=KanbanCardFile, dispatch_uid='card_file_thumbnails_delete')
+def remove_thumbnails(sender, instance, **kwargs):
+    """Удаляем копии вместе с объектом"""
+    field_name = 'avatar' if sender is User else 'file'
+    storage = getattr(instance, field_name).storage
+    transaction.on_commit(partial(thumbnails.delete_thumbnails, storage, instance.thumbnails))
+
+
+def connect_counters(child_model, link, parent_model, counter):
+    """Поддержка счетчика родителя при создании, переносе и удалении дочернего объекта"""
+    field = child_model._meta.get_field(link)
+    attname = field.attname
+    tracker = f'_counted_{attname}'
+
+    def update_counter(instance, parent_id, delta):
+        change_counter(parent_model, counter, parent_id, delta)
+        # Родитель из create(project=project) часто сериализуется в том же ответе
+        parent = field.get_cached_value(instance, default=None)
+        if parent is not None and parent.pk == parent_id and counter in parent.__dict__:
+            parent.__dict__[counter] += delta
+
+    def remember_parent(sender, instance, **kwargs):
+        # Запоминаем родителя при загрузке, чтобы заметить перенос в другой объект;
+        # при .only()/.defer() без поля связи перенос не отслеживается
+        if attname in instance.__dict__:
+            instance.__dict__[tracker] = instance.__dict__[attname]
+
+    def count_saved(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        parent_id = getattr(instance, attname)
+        previous_id = instance.__dict__.get(tracker, parent_id)
+        if created:
+            update_counter(instance, parent_id, 1)
+        elif previous_id != parent_id:
+            change_counter(parent_model, counter, previous_id, -1)
+            update_counter(instance, parent_id, 1)
+        instance.__dict__[tracker] = parent_id
+
+    def count_deleted(sender, instance, origin=None, **kwargs):
+        parent_id = getattr(instance, attname)
+        # Родитель удаляется вместе с дочерними: его счетчик уже не нужен
+        if isinstance(origin, parent_model) and origin.pk == parent_id:
+            return
+        update_counter(instance, parent_id, -1)
+
+    uid = f'counter_{child_model._meta.label_lower}_{counter}'
+    post_init.connect(remember_parent, sender=child_model, weak=False, dispatch_uid=f'{uid}_init')
+    post_save.connect(count_saved, sender=child_model, weak=False, dispatch_uid=f'{uid}_save')
+    post_delete.connect(count_deleted, sender=child_model, weak=False, dispatch_uid=f'{uid}_delete')
+
+
+for counter_spec in COUNTERS:
+    connect_counters(*counter_spec)
+
+
+@receiver(post_init, sender=Stage, dispatch_uid='stage_progress_init')
+def remember_stage_progress(sender, instance, **kwargs):
+    """Вклад этапа в сводку проекта на момент загрузки"""
+    if {'project_id', 'status'} <= instance.__dict__.keys():
+        instance._progress = (instance.project_id, progress.stage_progress(instance))
+
+
+@receiver(post_save, sender=Stage, dispatch_uid='stage_progress_save')
+def update_stage_progress(sender, instance, created, raw=False, **kwargs):
+    """Создание, смена статуса или перенос этапа меняют сводку проекта"""
+    if raw:
+        return
+    after = (instance.project_id, progress.stage_progress(instance))
+    before = None if created else getattr(instance, '_progress', after)
+    project = Stage.project.field.get_cached_value(instance, default=None)
+    if before is None:
+        progress.apply_progress(instance.project_id, {}, after[1], project)
+    elif before[0] != after[0]:
+        progress.apply_progress(before[0], before[1], {})
+        progress.apply_progress(after[0], {}, after[1], project)
+    else:
+        progress.apply_progress(instance.project_id, before[1], after[1], project)
+    instance._progress = after
+
+
+@receiver(post_delete, sender=Stage, dispatch_uid='stage_progress_delete')
+def remove_stage_progress(sender, instance, origin=None, **kwargs):
+    # Проект удаляется вместе с этапами: его сводка уже не нужна
+    if isinstance(origin, Project):
+        return
+    progress.apply_progress(instance.project_id, progress.stage_progress(instance), {})
+
+
+@receiver(post_init, sender=Task, dispatch_uid='task_progress_init')
+def remember_task_progress(sender, instance, **kwargs):
+    """Вклад задачи в сводку проекта и дедлайн на момент загрузки"""
+    if {'stage_id', 'status', 'is_overdue', 'deadline'} <= instance.__dict__.keys():
+        instance._progress = (instance.stage_id, progress.task_progress(instance), instance.deadline)
+
+
+def get_task_project_id(task, stage_id):
+    stage = Task.stage.field.get_cached_value(task, default=None)
+    if stage is not None and stage.pk == stage_id:
+        return stage.project_id
+    return progress.get_stage_project_id(stage_id)
+
+
+@receiver(post_save, sender=Task, dispatch_uid='task_progress_save')
+def update_task_progress(sender, instance, created, raw=False, **kwargs):
+    """Создание, смена статуса, просрочка или перенос задачи меняют сводку проекта"""
+    if raw:
+        return
+    after = (instance.stage_id, progress.task_progress(instance), instance.deadline)
+    before = None if created else getattr(instance, '_progress', after)
+    if before is None:
+        progress.apply_progress(get_task_project_id(instance, instance.stage_id), {}, after[1])
+    elif before[0] != after[0]:
+        progress.apply_progress(progress.get_stage_project_id(before[0]), before[1], {})
+        progress.apply_progress(get_task_project_id(instance, after[0]), {}, after[1])
+    elif before[1] != after[1]:
+        progress.apply_progress(get_task_project_id(instance, instance.stage_id), before[1], after[1])
+    if before != after:
+        # Новый дедлайн или возврат выполненной задачи в работу
+        progress.schedule_overdue_check(instance)
+    instance._progress = after
+
+
+@receiver(post_delete, sender=Task, dispatch_uid='task_progress_delete')
+def remove_task_progress(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Project):
+        return
+    if isinstance(origin, Stage) and origin.pk == instance.stage_id:
+        # Этап удаляется вместе с задачами: проект известен без запроса
+        project_id = origin.project_id
+    else:
+        project_id = get_task_project_id(instance, instance.stage_id)
+    progress.apply_progress(project_id, progress.task_progress(instance), {})
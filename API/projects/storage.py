@@ -0,0 +1,145 @@
+"""
+Хранилище медиафайлов с дедупликацией по содержимому.
+
+Каждое уникальное содержимое хранится один раз в MEDIA_ROOT/.blobs/ab/<sha256>.
+Файл по обычному пути (project_files/..., kanban_files/..., artifacts/...) -
+жесткая ссылка на этот блоб, поэтому имена в FileField, URL и раздача через
+nginx не меняются. Счетчик ссылок на блоб - число жестких ссылок на него
+(st_nlink - 1); блобы без ссылок удаляет dedupe_media --gc. Новое содержимое
+сначала пишется во временный файл .blobs/tmp/ и становится блобом целиком;
+если блоб удалили между проверкой и ссылкой, он сохраняется заново.
+
+Файлы по ссылкам нельзя изменять на месте: Django так и не делает, при
+сохранении всегда создается новое имя.
+"""
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+BLOBS_DIRNAME = '.blobs'
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+def hash_file(path):
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def link_or_copy(source, destination):
+    """Жесткая ссылка, а если файловая система их не поддерживает - копия"""
+    try:
+        os.link(source, destination)
+    except OSError as error:
+        if error.errno == errno.EEXIST:
+            raise
+        shutil.copyfile(source, destination)
+
+
+class DeduplicatedFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage, который хранит одинаковое содержимое один раз"""
+
+    @property
+    def blobs_location(self):
+        return os.path.join(self.location, BLOBS_DIRNAME)
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_location, digest[:2], digest)
+
+    def blob_references(self, digest):
+        """Сколько файлов ссылается на блоб"""
+        try:
+            return os.stat(self.blob_path(digest)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def _temporary_path(self):
+        """Новый пустой временный файл рядом с блобами (на том же диске)"""
+        tmp_dir = os.path.join(self.blobs_location, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        os.close(fd)
+        return tmp_path
+
+    def _write_temporary(self, content):
+        """Пишет содержимое во временный файл рядом с блобами, считая SHA-256 на лету"""
+        tmp_path = self._temporary_path()
+        checksum = hashlib.sha256()
+        try:
+            with open(tmp_path, 'wb') as tmp:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    checksum.update(chunk)
+                    tmp.write(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path, checksum.hexdigest()
+
+    def stage_content(self, content):
+        """Временный файл с содержимым рядом с блобами и его SHA-256"""
+        if not hasattr(content, 'temporary_file_path'):
+            return self._write_temporary(content)
+        # Файл уже лежит на диске: считаем хеш и переносим без копирования
+        source = content.temporary_file_path()
+        digest = hash_file(source)
+        tmp_path = self._temporary_path()
+        file_move_safe(source, tmp_path, allow_overwrite=True)
+        return tmp_path, digest
+
+    def publish_blob(self, tmp_path, blob_path):
+        """
+        Делает временный файл блобом, не перезаписывая уже сохраненный.
+
+        Блоб появляется целиком (жесткой ссылкой или os.replace), поэтому
+        параллельное сохранение того же содержимого не видит недописанный файл.
+        """
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        try:
+            os.link(tmp_path, blob_path)
+        except FileExistsError:
+            # Такое же содержимое только что сохранил параллельный запрос
+            pass
+        except OSError:
+            # Файловая система без жестких ссылок
+            copy_path = self._temporary_path()
+            shutil.copyfile(tmp_path, copy_path)
+            os.replace(copy_path, blob_path)
+
+    def _save(self, name, content):
+        tmp_path, digest = self.stage_content(content)
+        try:
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            blob_path = self.blob_path(digest)
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            while True:
+                try:
+                    link_or_copy(blob_path, full_path)
+                    break
+                except FileExistsError:
+                    # Имя успели занять параллельно - подбираем другое, как FileSystemStorage
+                    name = self.get_available_name(name)
+                    full_path = self.path(name)
+                except FileNotFoundError:
+                    # Блоба еще нет или его только что удалил dedupe_media --gc:
+                    # сохраняем его из временного файла и повторяем
+                    self.publish_blob(tmp_path, blob_path)
+        finally:
+            os.remove(tmp_path)
+        return str(name).replace('\\', '/')
+
+    def listdir(self, path):
+        directories, files = super().listdir(path)
+        if not path:
+            directories = [name for name in directories if name != BLOBS_DIRNAME]
+        return directories, files
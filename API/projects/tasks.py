@@ -0,0 +1,16 @@
+"""
+Фоновые задачи приложения projects (выполняются manage.py run_worker).
+"""
+from jobs.queue import task
+
+from . import progress, thumbnails
+
+
+@task('projects.generate_thumbnails')
+def generate_thumbnails(kind, pk):
+    thumbnails.generate_thumbnails(kind, pk)
+
+
+@task('projects.mark_task_overdue')
+def mark_task_overdue(pk):
+    progress.mark_task_overdue(pk)
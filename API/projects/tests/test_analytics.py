@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from projects.analytics import HISTOGRAM_EDGES_HOURS
+from projects.models import KanbanCard, StatusTransition
+
+from .utils import make_project, make_team, make_user
+
+
+class FlowAnalyticsTests(APITestCase):
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+        self.client.force_authenticate(self.teacher)
+        self.now = timezone.now()
+        self.project = make_project(make_team())
+        self.idle_team = make_team()
+        make_project(self.idle_team)
+
+    def hours_ago(self, hours):
+        return self.now - timedelta(hours=hours)
+
+    def transition(self, entity, entity_id, field, from_value, to_value, hours_ago):
+        return StatusTransition.objects.create(
+            project=self.project, entity=entity, entity_id=entity_id, title='Объект', field=field,
+            from_value=from_value, to_value=to_value, created_at=self.hours_ago(hours_ago),
+        )
+
+    def get_analytics(self, **params):
+        response = self.client.get('/api/projects/teacher-dashboard/analytics/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def team_row(self, rows, team):
+        return next(row for row in rows if row['team_id'] == team.pk)
+
+    def test_card_column_time(self):
+        card = KanbanCard.objects.create(project=self.project, title='Карточка', created_by=self.teacher)
+        KanbanCard.objects.filter(pk=card.pk).update(created_at=self.hours_ago(10))
+        # column1: 10 - 8 = 2 часа от создания, column2: 8 - 2 = 6 часов
+        self.transition('card', card.pk, 'column', 'column1', 'column2', 8)
+        self.transition('card', card.pk, 'column', 'column2', 'column3', 2)
+
+        columns = self.get_analytics()['card_column_time']
+        self.assertEqual(columns['cohort']['column1']['median'], 2.0)
+        self.assertEqual(columns['cohort']['column2']['median'], 6.0)
+        self.assertEqual(columns['cohort']['column3']['count'], 0)
+        histogram = columns['cohort']['column2']['histogram']
+        self.assertEqual(len(histogram), len(HISTOGRAM_EDGES_HOURS))
+        # 6 часов попадают в корзину 4-12
+        self.assertEqual(histogram[HISTOGRAM_EDGES_HOURS.index(4)], 1)
+
+        team_columns = self.team_row(columns['teams'], self.project.team)['columns']
+        self.assertEqual(team_columns['column2']['count'], 1)
+        self.assertEqual(self.team_row(columns['teams'], self.idle_team)['columns']['column2']['count'], 0)
+
+    def test_stage_review_wait(self):
+        self.transition('stage', 1, 'status', 'in_progress', 'submitted', 30)
+        self.transition('stage', 1, 'status', 'submitted', 'approved', 6)
+        self.transition('stage', 2, 'status', 'in_progress', 'submitted', 3)
+
+        wait = self.get_analytics()['stage_review_wait']
+        self.assertEqual((wait['cohort']['count'], wait['cohort']['median']), (1, 24.0))
+        self.assertEqual(wait['pending']['count'], 1)
+        self.assertAlmostEqual(wait['pending']['median'], 3.0, delta=0.1)
+        self.assertEqual(self.team_row(wait['teams'], self.project.team)['count'], 1)
+
+    def test_throughput(self):
+        self.transition('task', 1, 'status', 'in_progress', 'completed', 0)
+        self.transition('task', 2, 'status', 'in_progress', 'completed', 0)
+        self.transition('task', 3, 'status', 'in_progress', 'completed', 24 * 7 * 10)
+
+        throughput = self.get_analytics(weeks=4)['throughput']
+        self.assertEqual(len(throughput['weeks']), 4)
+        # Задача десятинедельной давности за окно не попадает
+        self.assertEqual(throughput['cohort'], [0, 0, 0, 2])
+        self.assertEqual(self.team_row(throughput['teams'], self.project.team)['counts'], [0, 0, 0, 2])
+        self.assertEqual(self.team_row(throughput['teams'], self.idle_team)['counts'], [0, 0, 0, 0])
+
+    def test_empty_journal(self):
+        data = self.get_analytics()
+        self.assertEqual(data['stage_review_wait']['cohort'], {
+            'count': 0, 'median': None, 'p90': None, 'histogram': [0] * len(HISTOGRAM_EDGES_HOURS),
+        })
+        self.assertEqual(data['throughput']['cohort'], [0] * 8)
+
+    def test_weeks_validated(self):
+        for weeks in ('0', '53', 'abc'):
+            with self.subTest(weeks=weeks):
+                response = self.client.get('/api/projects/teacher-dashboard/analytics/', {'weeks': weeks})
+                self.assertEqual(response.status_code, 400)
+
+    def test_teachers_only(self):
+        self.client.force_authenticate(make_user())
+        self.assertEqual(self.client.get('/api/projects/teacher-dashboard/analytics/').status_code, 403)
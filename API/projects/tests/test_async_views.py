@@ -0,0 +1,109 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.test import AsyncClient, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from projects.models import (
+    KanbanCard, KanbanCardCheck, KanbanCardComment, KanbanCardFile, KnowledgeBase, ProjectCheck, ProjectComment,
+    ProjectFile, StageComment, Task,
+)
+
+from .utils import make_project, make_stage, make_team, make_user
+
+
+# Подпись ссылок содержит время: фиксируем его, чтобы ссылки обоих вариантов совпадали
+@mock.patch.object(signing.TimestampSigner, 'timestamp', return_value='1')
+class AsyncParityTests(APITestCase):
+    """Асинхронные эндпоинты отдают тот же JSON, что и их синхронные варианты на DRF"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.teacher = make_user(is_staff=True, first_name='Анна', last_name='Иванова')
+        self.leader = make_user()
+        self.member = make_user()
+        self.project = make_project(
+            make_team(self.leader, members=[self.member]), status='submitted', submitted_at=timezone.now(),
+            claimed_by=self.teacher, claimed_until=timezone.now(),
+        )
+        self.project.passport.save('passport.pdf', ContentFile(b'passport'))
+        ProjectComment.objects.create(project=self.project, author=self.teacher, text='Комментарий')
+        ProjectCheck.objects.create(project=self.project, teacher=self.teacher, is_checked=True, comment='Ок')
+        project_file = ProjectFile(project=self.project, name='Отчет.txt', uploaded_by=self.member)
+        project_file.file.save('report.txt', ContentFile(b'report'))
+
+        stage = make_stage(self.project, status='submitted', submitted_at=timezone.now(), deadline=timezone.now())
+        stage.artifact.save('artifact.txt', ContentFile(b'artifact'))
+        Task.objects.create(stage=stage, name='Задача', assigned_to=self.member, assigned_by=self.leader)
+        StageComment.objects.create(stage=stage, author=self.teacher, text='Доработать')
+
+        card = KanbanCard.objects.create(project=self.project, title='Карточка', created_by=self.leader)
+        KanbanCard.objects.create(project=make_project(), title='Чужая карточка', created_by=self.teacher)
+        card_file = KanbanCardFile(card=card, name='Схема.png', uploaded_by=self.member)
+        card_file.file.save('scheme.png', ContentFile(b'png'))
+        KanbanCardComment.objects.create(card=card, author=self.member, text='Готово')
+        KanbanCardCheck.objects.create(card=card, teacher=self.teacher, comment='Проверено')
+
+        KnowledgeBase.objects.create(section='stage', title='Первый', content='Текст', order=1)
+        KnowledgeBase.objects.create(section='team', title='Второй', content='Текст', order=2)
+
+    def assert_same_json(self, user, sync_url, async_url, params=None):
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        expected = self.client.get(sync_url, params)
+
+        async def get_async():
+            return await AsyncClient().get(async_url, params, headers={'Authorization': f'Token {token.key}'})
+
+        response = async_to_sync(get_async)()
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        return response.json()
+
+    def test_current_user(self, timestamp):
+        self.assert_same_json(self.teacher, '/api/auth/users/me/', '/api/auth/async/users/me/')
+
+    def test_knowledge_base(self, timestamp):
+        data = self.assert_same_json(self.member, '/api/projects/knowledge-base/', '/api/projects/async/knowledge-base/')
+        self.assertEqual(data['count'], 2)
+        self.assert_same_json(
+            self.member, '/api/projects/knowledge-base/', '/api/projects/async/knowledge-base/', {'section': 'stage'}
+        )
+
+    def test_kanban_cards(self, timestamp):
+        for user in (self.leader, self.member, self.teacher):
+            with self.subTest(user=user.username):
+                self.assert_same_json(user, '/api/projects/kanban-cards/', '/api/projects/async/kanban-cards/')
+        data = self.assert_same_json(
+            self.member, '/api/projects/kanban-cards/', '/api/projects/async/kanban-cards/',
+            {'project': self.project.pk},
+        )
+        card = data['results'][0]
+        self.assertEqual((len(card['files']), len(card['comments']), len(card['teacher_checks'])), (1, 1, 1))
+
+    def test_pending_projects(self, timestamp):
+        data = self.assert_same_json(
+            self.teacher, '/api/projects/teacher-dashboard/pending_projects/',
+            '/api/projects/async/teacher-dashboard/pending_projects/',
+        )
+        self.assertEqual([project['id'] for project in data], [self.project.pk])
+        self.assertTrue(data[0]['passport_url'])
+
+    def test_pending_stages(self, timestamp):
+        data = self.assert_same_json(
+            self.teacher, '/api/projects/teacher-dashboard/pending_stages/',
+            '/api/projects/async/teacher-dashboard/pending_stages/',
+        )
+        self.assertEqual(len(data[0]['tasks']), 1)
@@ -0,0 +1,57 @@
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from projects.models import KnowledgeBase
+
+from .utils import make_project, make_user
+
+
+class BatchViewTests(APITestCase):
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+        KnowledgeBase.objects.create(section='team', title='Статья', content='Текст')
+
+    def post_batch(self, requests, **data):
+        return self.client.post('/api/batch/', {'requests': requests, **data}, format='json')
+
+    def test_async_view_with_token(self):
+        token = Token.objects.create(user=self.teacher)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.post_batch([
+            {'method': 'GET', 'path': '/api/projects/async/knowledge-base/'},
+            {'method': 'GET', 'path': '/api/auth/async/users/me/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [200, 200])
+        self.assertEqual(results[1]['body']['id'], self.teacher.pk)
+
+    def test_async_view_with_session(self):
+        self.client.force_login(self.teacher)
+        response = self.post_batch([{'method': 'GET', 'path': '/api/auth/async/users/me/'}])
+        self.assertEqual(response.data['results'][0]['status'], 200)
+
+    def test_atomic_rollback(self):
+        project = make_project()
+        self.client.force_authenticate(self.teacher)
+        response = self.post_batch([
+            {'method': 'PATCH', 'path': f'/api/projects/projects/{project.pk}/', 'body': {'description': 'Новое'}},
+            {'method': 'GET', 'path': '/api/projects/projects/999999/'},
+        ], atomic=True)
+        self.assertFalse(response.data['committed'])
+        self.assertEqual(response.data['results'][1]['status'], 404)
+        project.refresh_from_db()
+        self.assertEqual(project.description, '')
+
+    def test_atomic_must_be_boolean(self):
+        project = make_project()
+        self.client.force_authenticate(self.teacher)
+        for atomic in ('false', '0', 1, None):
+            with self.subTest(atomic=atomic):
+                response = self.post_batch(
+                    [{'method': 'PATCH', 'path': f'/api/projects/projects/{project.pk}/', 'body': {'description': 'Новое'}}],
+                    atomic=atomic,
+                )
+                self.assertEqual(response.status_code, 400)
+        project.refresh_from_db()
+        self.assertEqual(project.description, '')
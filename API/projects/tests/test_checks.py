@@ -0,0 +1,61 @@
+from rest_framework.test import APITestCase
+
+from projects.models import ProjectCheck
+
+from .utils import make_project, make_user
+
+
+class ProjectCheckUpsertTests(APITestCase):
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+        self.client.force_authenticate(self.teacher)
+        self.project = make_project()
+
+    def upsert(self, data):
+        return self.client.post('/api/projects/project-checks/upsert/', data, format='json')
+
+    def test_upsert_creates_and_updates_given_fields(self):
+        response = self.upsert({'project': self.project.pk, 'is_checked': True, 'comment': 'Хорошо'})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.upsert({'project': self.project.pk, 'is_checked': False})
+        self.assertEqual(response.status_code, 200)
+        check = ProjectCheck.objects.get(project=self.project, teacher=self.teacher)
+        self.assertEqual((check.is_checked, check.comment), (False, 'Хорошо'))
+
+    def test_project_must_be_integer(self):
+        for project in (True, 2.7, str(self.project.pk), None):
+            with self.subTest(project=project):
+                response = self.upsert({'project': project, 'is_checked': True})
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(ProjectCheck.objects.exists())
+
+    def test_missing_project(self):
+        response = self.upsert({'project': 999999, 'is_checked': True})
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_project_in_atomic_batch(self):
+        # Внутри пакета внешний ключ проверяется только при фиксации всего пакета
+        response = self.client.post('/api/batch/', {'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/api/projects/project-checks/upsert/',
+             'body': {'project': 999999, 'is_checked': True}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['status'], 404)
+        self.assertFalse(ProjectCheck.objects.exists())
+
+    def test_batch_reports_missing_projects(self):
+        response = self.client.post(
+            '/api/projects/project-checks/batch/',
+            {'projects': [self.project.pk, 999999], 'is_checked': True},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['projects'], [999999])
+        self.assertFalse(ProjectCheck.objects.exists())
+
+        response = self.client.post(
+            '/api/projects/project-checks/batch/', {'projects': [self.project.pk], 'is_checked': True}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(ProjectCheck.objects.get(project=self.project).is_checked)
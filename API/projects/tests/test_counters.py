@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from projects.models import Project, ProjectComment, Stage, StageComment, Task
+
+from .utils import make_project, make_stage, make_user
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.project = make_project()
+        self.stage = make_stage(self.project)
+
+    def test_comments_count_follows_create_and_delete(self):
+        first = ProjectComment.objects.create(project=self.project, author=self.user, text='Первый')
+        ProjectComment.objects.create(project=self.project, author=self.user, text='Второй')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.comments_count, 2)
+
+        first.delete()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.comments_count, 1)
+
+    def test_stale_parent_save_keeps_counter(self):
+        # Загруженный до комментария объект не перезаписывает счетчик при сохранении
+        stale = Stage.objects.get(pk=self.stage.pk)
+        StageComment.objects.create(stage=self.stage, author=self.user, text='Комментарий')
+        stale.name = 'Новое название'
+        stale.save()
+
+        self.stage.refresh_from_db()
+        self.assertEqual(self.stage.name, 'Новое название')
+        self.assertEqual(self.stage.comments_count, 1)
+
+    def test_task_reparent_moves_counters(self):
+        other_stage = make_stage()
+        task = Task.objects.create(stage=self.stage, name='Задача')
+
+        task.stage = other_stage
+        task.save()
+
+        self.stage.refresh_from_db()
+        other_stage.refresh_from_db()
+        self.assertEqual((self.stage.tasks_count, other_stage.tasks_count), (0, 1))
+
+
+class RecountCountersTests(TestCase):
+    def test_dry_run_reports_and_recount_repairs(self):
+        project = make_project()
+        stage = make_stage(project)
+        Task.objects.create(stage=stage, name='Задача')
+        ProjectComment.objects.create(project=project, author=make_user(), text='Комментарий')
+        # Правки в обход сигналов
+        Project.objects.filter(pk=project.pk).update(comments_count=5)
+        Stage.objects.filter(pk=stage.pk).update(tasks_count=0)
+
+        with self.assertRaisesMessage(CommandError, 'Счетчиков с расхождениями: 2'):
+            call_command('recount_counters', dry_run=True, stdout=StringIO())
+
+        call_command('recount_counters', stdout=StringIO())
+        project.refresh_from_db()
+        stage.refresh_from_db()
+        self.assertEqual((project.comments_count, stage.tasks_count), (1, 1))
+        call_command('recount_counters', dry_run=True, stdout=StringIO())
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.test import AsyncClient, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from projects.models import ProjectFile
+
+from .utils import make_project, make_team, make_user
+
+
+class ProjectExportTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = make_user()
+        self.project = make_project(make_team(self.user))
+        self.client.force_authenticate(self.user)
+
+    def get_archive(self):
+        response = self.client.get(f'/api/projects/projects/{self.project.pk}/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_archive_contains_files(self):
+        project_file = ProjectFile(project=self.project, name='report.txt', uploaded_by=self.user)
+        project_file.file.save('report.txt', ContentFile(b'content' * 1000))
+        ProjectFile.objects.create(
+            project=self.project, name='lost.txt', file='project_files/lost.txt', uploaded_by=self.user
+        )
+
+        with self.get_archive() as archive:
+            self.assertIsNone(archive.testzip())
+            names = archive.namelist()
+            self.assertIn('project.json', names)
+            self.assertEqual(archive.read('files/report.txt'), b'content' * 1000)
+            self.assertIn('files/lost.txt.missing.txt', names)
+
+    async def test_asgi_streams_archive(self):
+        # Под ASGI архив отдается асинхронным итератором, а не собирается целиком в памяти
+        token = await Token.objects.acreate(user=self.user)
+        response = await AsyncClient().get(
+            f'/api/projects/projects/{self.project.pk}/export/', headers={'Authorization': f'Token {token.key}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIn('project.json', archive.namelist())
+
+
+class ProjectsExportTests(APITestCase):
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+        self.leader = make_user()
+        self.member = make_user()
+        team = make_team(self.leader, members=[self.member])
+        self.submitted = make_project(team, name='Отправлен', status='submitted')
+        self.draft = make_project(team, name='Черновик')
+        self.client.force_authenticate(self.teacher)
+
+    def export(self, **params):
+        return self.client.get('/api/projects/teacher-dashboard/export/', params)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_columns_and_lists(self):
+        response = self.export(columns='id,name,members,team_leader', status='submitted')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = self.read(response)
+
+        self.assertTrue(content.startswith('\ufeff'))
+        rows = list(csv.reader(io.StringIO(content[1:])))
+        self.assertEqual(rows, [
+            ['ID', 'Проект', 'Участники', 'Лидер команды'],
+            [str(self.submitted.pk), 'Отправлен', f'{self.leader.email}; {self.member.email}', self.leader.email],
+        ])
+
+    def test_jsonl(self):
+        content = self.read(self.export(export_format='jsonl', columns='id,members,stages_total'))
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.submitted.pk, self.draft.pk])
+        self.assertEqual(rows[0], {
+            'id': self.submitted.pk, 'members': [self.leader.email, self.member.email], 'stages_total': 0,
+        })
+
+    def test_invalid_parameters(self):
+        response = self.export(columns='id,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.data['available_columns'])
+        self.assertEqual(self.export(export_format='xlsx').status_code, 400)
+
+    def test_students_are_forbidden(self):
+        self.client.force_authenticate(self.leader)
+        self.assertEqual(self.export().status_code, 403)
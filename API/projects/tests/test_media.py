@@ -0,0 +1,110 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.utils.http import content_disposition_header
+from rest_framework.test import APIClient, APITestCase
+
+from projects.media import sign_download
+from projects.models import ProjectFile
+
+from .utils import make_project, make_team, make_user
+
+CONTENT = b'0123456789' * 10
+
+
+class ProtectedDownloadTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_ACCEL_REDIRECT_LOCATION='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.member = make_user()
+        self.project = make_project(make_team(self.member))
+        self.project_file = ProjectFile(project=self.project, name='Отчет.txt', uploaded_by=self.member)
+        self.project_file.file.save('report.txt', ContentFile(CONTENT))
+        self.anonymous = APIClient()
+
+    def signed_url(self, user=None):
+        self.client.force_authenticate(user or self.member)
+        response = self.client.get(f'/api/projects/project-files/{self.project_file.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['file_url']
+
+    def download(self, url, **headers):
+        response = self.anonymous.get(url, **headers)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, content
+
+    def test_signed_url_works_without_authorization(self):
+        response, content = self.download(self.signed_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], content_disposition_header(False, 'Отчет.txt'))
+        self.assertTrue(response['Cache-Control'].startswith('private'))
+
+    def test_bad_or_foreign_signature_rejected(self):
+        url = self.signed_url()
+        response, _ = self.download(url[:-2] + 'xx')
+        self.assertEqual(response.status_code, 401)
+        response, _ = self.download(f'/api/projects/project-files/{self.project_file.pk}/download/')
+        self.assertEqual(response.status_code, 401)
+
+        # Подпись привязана к ссылке: с другим id она не действует
+        other = ProjectFile(project=self.project, name='other.txt', uploaded_by=self.member)
+        other.file.save('other.txt', ContentFile(b'other'))
+        signature = url.split('signature=')[1]
+        response, _ = self.download(f'/api/projects/project-files/{other.pk}/download/?signature={signature}')
+        self.assertEqual(response.status_code, 401)
+
+    def test_expired_signature_rejected(self):
+        url = self.signed_url()
+        with self.settings(MEDIA_DOWNLOAD_URL_MAX_AGE=-1):
+            response, _ = self.download(url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_signature_of_outsider_forbidden(self):
+        # Ссылку подписал пользователь, который не состоит в команде проекта
+        signature = sign_download(make_user(), 'project-file-download', self.project_file.pk)
+        response, _ = self.download(f'/api/projects/project-files/{self.project_file.pk}/download/?signature={signature}')
+        self.assertEqual(response.status_code, 403)
+
+    def test_accel_redirect(self):
+        url = self.signed_url()
+        with self.settings(MEDIA_ACCEL_REDIRECT_LOCATION='/protected-media/'):
+            response, content = self.download(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.project_file.file.name)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(content, b'')
+
+    def test_range(self):
+        url = self.signed_url()
+        response, content = self.download(url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(content, CONTENT[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+        response, content = self.download(url, HTTP_RANGE='bytes=-5')
+        self.assertEqual((response.status_code, content), (206, CONTENT[-5:]))
+
+        response, _ = self.download(url, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_range_ignored_when_file_changed(self):
+        url = self.signed_url()
+        # If-Range с устаревшим ETag - отдается весь файл
+        response, content = self.download(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((response.status_code, content), (200, CONTENT))
+
+    def test_conditional_request(self):
+        url = self.signed_url()
+        response, _ = self.download(url)
+        response, content = self.download(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual((response.status_code, content), (304, b''))
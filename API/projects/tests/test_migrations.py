@@ -0,0 +1,13 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class MigrationBaselineTests(TestCase):
+    def test_database_matches_applied_migrations(self):
+        # Тестовая база создана всеми миграциями: колонки поздних миграций не считаются лишними
+        out = StringIO()
+        call_command('check_migration_baseline', database='default', stdout=out, stderr=StringIO())
+        self.assertIn('Примененные миграции: projects.', out.getvalue())
+        self.assertIn('Базовые миграции соответствуют цепочке', out.getvalue())
@@ -0,0 +1,49 @@
+from rest_framework.test import APITestCase
+
+from projects.models import ProjectComment
+
+from .utils import make_project, make_team, make_user
+
+
+class NormalizedFormatTests(APITestCase):
+    def setUp(self):
+        self.leader = make_user()
+        self.project = make_project(make_team(self.leader))
+        self.teacher = make_user(is_staff=True)
+        ProjectComment.objects.create(project=self.project, author=self.teacher, text='Первый')
+        ProjectComment.objects.create(project=self.project, author=self.teacher, text='Второй')
+
+    def test_project_detail(self):
+        self.client.force_authenticate(self.leader)
+        url = f'/api/projects/projects/{self.project.pk}/'
+        nested = self.client.get(url).data
+        response = self.client.get(url, {'format': 'normalized'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'data', 'included'})
+        data, included = response.data['data'], response.data['included']
+        # Вложенные объекты заменены на id, каждый объект в included один раз
+        self.assertEqual(data['created_by'], self.leader.pk)
+        self.assertCountEqual(data['comments'], [comment['id'] for comment in nested['comments']])
+        self.assertEqual({user['id'] for user in included['users']}, {self.leader.pk, self.teacher.pk})
+        comments = {comment['id']: comment for comment in included['project_comments']}
+        self.assertEqual([comments[pk]['author'] for pk in data['comments']], [self.teacher.pk, self.teacher.pk])
+        self.assertEqual(data['name'], nested['name'])
+
+    def test_default_format_unchanged(self):
+        self.client.force_authenticate(self.leader)
+        response = self.client.get(f'/api/projects/projects/{self.project.pk}/')
+        self.assertNotIn('included', response.data)
+        self.assertEqual(response.data['created_by']['id'], self.leader.pk)
+
+    def test_teacher_dashboard_list(self):
+        self.project.status = 'submitted'
+        self.project.save()
+        self.client.force_authenticate(self.teacher)
+
+        response = self.client.get('/api/projects/teacher-dashboard/pending_projects/', {'format': 'normalized'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([project['id'] for project in response.data['data']], [self.project.pk])
+        self.assertEqual(response.data['data'][0]['created_by'], self.leader.pk)
+        self.assertIn(self.leader.pk, {user['id'] for user in response.data['included']['users']})
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from jobs.models import Job
+from projects.models import Project, Task
+from projects.progress import mark_task_overdue
+
+from .utils import make_project, make_stage
+
+
+class ProgressTests(TestCase):
+    def setUp(self):
+        self.project = make_project()
+        self.stage = make_stage(self.project)
+
+    def assertProgress(self, **expected):
+        self.project.refresh_from_db()
+        self.assertEqual({field: getattr(self.project, field) for field in expected}, expected)
+
+    def test_stage_status_and_delete(self):
+        self.assertProgress(stages_total=1, stages_approved=0)
+
+        self.stage.status = 'approved'
+        self.stage.save()
+        self.assertProgress(stages_total=1, stages_approved=1)
+
+        self.stage.delete()
+        self.assertProgress(stages_total=0, stages_approved=0)
+
+    def test_task_status_and_delete(self):
+        task = Task.objects.create(stage=self.stage, name='Задача')
+        self.assertProgress(tasks_total=1, tasks_completed=0)
+
+        task.status = 'completed'
+        task.save(update_fields=['status'])
+        self.assertProgress(tasks_total=1, tasks_completed=1)
+
+        task.delete()
+        self.assertProgress(tasks_total=0, tasks_completed=0)
+
+    def test_overdue_task(self):
+        overdue = Task.objects.create(stage=self.stage, name='Просрочена', deadline=timezone.now() - timedelta(days=1))
+        self.assertTrue(overdue.is_overdue)
+        self.assertProgress(tasks_overdue=1)
+
+        # Выполненная задача перестает быть просроченной
+        overdue.status = 'completed'
+        overdue.save()
+        self.assertProgress(tasks_overdue=0)
+
+    def test_future_deadline_queues_overdue_check(self):
+        deadline = timezone.now() + timedelta(days=1)
+        task = Task.objects.create(stage=self.stage, name='Задача', deadline=deadline)
+        job = Job.objects.get(name='projects.mark_task_overdue', key=f'task:{task.pk}')
+        self.assertEqual(job.run_at, deadline)
+
+        # Дедлайн прошел: задача очереди переносит просрочку в сводку
+        Task.objects.filter(pk=task.pk).update(deadline=timezone.now() - timedelta(minutes=1))
+        mark_task_overdue(task.pk)
+        self.assertProgress(tasks_overdue=1)
+
+    def test_task_reparent_moves_progress(self):
+        other_stage = make_stage()
+        task = Task.objects.create(stage=self.stage, name='Задача', status='completed')
+
+        task.stage = other_stage
+        task.save()
+
+        self.assertProgress(tasks_total=0, tasks_completed=0)
+        other_project = Project.objects.get(pk=other_stage.project_id)
+        self.assertEqual((other_project.tasks_total, other_project.tasks_completed), (1, 1))
+
+
+class RecountProgressTests(TestCase):
+    def test_recount_repairs_progress(self):
+        project = make_project()
+        stage = make_stage(project, status='approved')
+        Task.objects.create(stage=stage, name='Задача', deadline=timezone.now() + timedelta(days=1))
+        # Дедлайн прошел, а задача очереди не выполнилась
+        Task.objects.filter(stage=stage).update(deadline=timezone.now() - timedelta(days=1))
+        Project.objects.filter(pk=project.pk).update(tasks_total=5, stages_approved=0)
+
+        call_command('recount_counters', stdout=StringIO())
+        project.refresh_from_db()
+        self.assertEqual(
+            (project.stages_total, project.stages_approved, project.tasks_total, project.tasks_overdue), (1, 1, 1, 1)
+        )
@@ -0,0 +1,128 @@
+import threading
+import unittest
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from projects.models import Project
+from projects.review_queue import claim_next
+
+from .utils import make_project, make_stage, make_user
+
+
+def submitted(minutes_ago=None, **fields):
+    submitted_at = None if minutes_ago is None else timezone.now() - timedelta(minutes=minutes_ago)
+    return make_project(status='submitted', submitted_at=submitted_at, **fields)
+
+
+class ClaimNextTests(TestCase):
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+
+    def test_earliest_submission_first(self):
+        submitted(minutes_ago=5)
+        earliest = submitted(minutes_ago=10)
+        make_project(status='draft')
+
+        self.assertEqual(claim_next(self.teacher, kinds=['project']), ('project', earliest))
+
+    def test_without_submission_date_first(self):
+        # Порядок не зависит от того, куда база ставит NULL по умолчанию
+        submitted(minutes_ago=10)
+        undated = submitted()
+
+        self.assertEqual(claim_next(self.teacher, kinds=['project']), ('project', undated))
+
+    def test_earliest_across_kinds(self):
+        submitted(minutes_ago=5)
+        stage = make_stage(status='submitted', submitted_at=timezone.now() - timedelta(minutes=10))
+
+        self.assertEqual(claim_next(self.teacher), ('stage', stage))
+
+    def test_held_item_is_renewed(self):
+        first = submitted(minutes_ago=10)
+        submitted(minutes_ago=5)
+        _, item = claim_next(self.teacher, kinds=['project'])
+        Project.objects.filter(pk=first.pk).update(claimed_until=timezone.now() + timedelta(minutes=1))
+
+        _, again = claim_next(self.teacher, kinds=['project'])
+        self.assertEqual(again, item)
+        self.assertGreater(again.claimed_until, timezone.now() + timedelta(minutes=1))
+
+    def test_claimed_item_is_skipped_until_lease_expires(self):
+        first = submitted(minutes_ago=10)
+        second = submitted(minutes_ago=5)
+        claim_next(self.teacher, kinds=['project'])
+        other = make_user(is_staff=True)
+
+        self.assertEqual(claim_next(other, kinds=['project']), ('project', second))
+
+        Project.objects.filter(pk=first.pk).update(claimed_until=timezone.now() - timedelta(seconds=1))
+        third = make_user(is_staff=True)
+        self.assertEqual(claim_next(third, kinds=['project']), ('project', first))
+
+    def test_empty_queue(self):
+        self.assertIsNone(claim_next(self.teacher))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Нужен PostgreSQL')
+class ConcurrentClaimTests(TransactionTestCase):
+    def test_locked_row_is_skipped(self):
+        first = submitted(minutes_ago=10)
+        second = submitted(minutes_ago=5)
+        teacher = make_user(is_staff=True)
+        locked = threading.Event()
+        claimed = threading.Event()
+        results = []
+
+        def holder():
+            # Другой преподаватель держит блокировку первой работы, но еще не записал аренду
+            try:
+                with transaction.atomic():
+                    Project.objects.select_for_update().get(pk=first.pk)
+                    locked.set()
+                    claimed.wait(timeout=10)
+            finally:
+                connection.close()
+
+        def claimer():
+            try:
+                locked.wait(timeout=10)
+                results.append(claim_next(teacher, kinds=['project']))
+            finally:
+                claimed.set()
+                connection.close()
+
+        threads = [threading.Thread(target=holder), threading.Thread(target=claimer)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # claim_next не ждал блокировку (иначе ответ пришел бы только после тайм-аута holder)
+        self.assertEqual(results, [('project', second)])
+
+    def test_parallel_claims_get_distinct_items(self):
+        projects = [submitted(minutes_ago=minutes) for minutes in range(8, 0, -1)]
+        teachers = [make_user(is_staff=True) for _ in range(8)]
+        barrier = threading.Barrier(8)
+        results = []
+        errors = []
+
+        def worker(teacher):
+            try:
+                barrier.wait()
+                results.append(claim_next(teacher, kinds=['project']))
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(teacher,)) for teacher in teachers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertCountEqual([item.pk for _, item in results], [project.pk for project in projects])
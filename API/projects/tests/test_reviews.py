@@ -0,0 +1,162 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from projects.models import Project, ProjectComment, Stage, StatusTransition
+from projects.views import ProjectViewSet, StageViewSet
+
+from .utils import make_project, make_stage, make_user
+
+
+class BulkReviewTests(APITestCase):
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+        self.client.force_authenticate(self.teacher)
+
+    def review(self, kind, items):
+        return self.client.post(f'/api/projects/{kind}/bulk_review/', {'items': items}, format='json')
+
+    def test_projects_reviewed_with_per_item_errors(self):
+        approved = make_project(status='submitted')
+        revision = make_project(status='submitted')
+        draft = make_project(status='draft')
+
+        response = self.review('projects', [
+            {'id': approved.pk, 'decision': 'approve'},
+            {'id': revision.pk, 'decision': 'request_revision', 'comment': ' Доработать '},
+            {'id': draft.pk, 'decision': 'approve'},
+            {'id': 999999, 'decision': 'approve'},
+            {'id': True, 'decision': 'approve'},
+            {'id': approved.pk + revision.pk, 'decision': 'unknown'},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['reviewed'], 2)
+        self.assertEqual(response.data['results'], [
+            {'id': approved.pk, 'status': 'approved'},
+            {'id': revision.pk, 'status': 'revision'},
+            {'id': draft.pk, 'error': 'not_submitted'},
+            {'id': 999999, 'error': 'not_found'},
+            {'id': True, 'error': 'invalid'},
+            {'id': approved.pk + revision.pk, 'error': 'invalid'},
+        ])
+        revision.refresh_from_db()
+        self.assertEqual((revision.status, revision.reviewed_by, revision.comments_count), ('revision', self.teacher, 1))
+        self.assertEqual(ProjectComment.objects.get(project=revision).text, 'Доработать')
+        self.assertEqual(
+            set(StatusTransition.objects.values_list('entity_id', 'to_value')),
+            {(approved.pk, 'approved'), (revision.pk, 'revision')},
+        )
+
+    def test_duplicate_and_claimed_items_are_rejected(self):
+        duplicate = make_project(status='submitted')
+        claimed = make_project(
+            status='submitted', claimed_by=make_user(is_staff=True), claimed_until=timezone.now() + timedelta(minutes=5)
+        )
+
+        response = self.review('projects', [
+            {'id': duplicate.pk, 'decision': 'approve'},
+            {'id': duplicate.pk, 'decision': 'reject'},
+            {'id': claimed.pk, 'decision': 'approve'},
+        ])
+
+        self.assertEqual(response.data['reviewed'], 0)
+        self.assertEqual([result['error'] for result in response.data['results']], ['duplicate', 'duplicate', 'claimed'])
+        self.assertEqual(Project.objects.filter(status='submitted').count(), 2)
+
+    def test_stage_review_updates_progress_and_releases_claim(self):
+        project = make_project()
+        stage = make_stage(project, status='submitted', claimed_by=self.teacher, claimed_until=timezone.now() + timedelta(minutes=5))
+
+        response = self.review('stages', [{'id': stage.pk, 'decision': 'approve'}])
+
+        self.assertEqual(response.data['results'], [{'id': stage.pk, 'status': 'approved'}])
+        stage = Stage.objects.get(pk=stage.pk)
+        self.assertIsNone(stage.claimed_by)
+        project.refresh_from_db()
+        self.assertEqual((project.stages_total, project.stages_approved), (1, 1))
+
+    def test_stage_decisions_exclude_reject(self):
+        stage = make_stage(status='submitted')
+
+        response = self.review('stages', [{'id': stage.pk, 'decision': 'reject'}])
+
+        self.assertEqual(response.data['results'], [{'id': stage.pk, 'error': 'invalid'}])
+
+    def test_request_validation(self):
+        self.assertEqual(self.review('projects', []).status_code, 400)
+        with self.settings(REVIEW_BULK_MAX_ITEMS=1):
+            response = self.review('projects', [{'id': 1, 'decision': 'approve'}] * 2)
+        self.assertEqual(response.status_code, 400)
+
+    def test_students_are_forbidden(self):
+        self.client.force_authenticate(make_user())
+        project = make_project(status='submitted')
+
+        response = self.review('projects', [{'id': project.pk, 'decision': 'approve'}])
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ReviewActionTests(APITestCase):
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+        self.other_teacher = make_user(is_staff=True)
+        self.client.force_authenticate(self.teacher)
+
+    def claim(self, item, teacher, minutes=10):
+        type(item).objects.filter(pk=item.pk).update(
+            claimed_by=teacher, claimed_until=timezone.now() + timedelta(minutes=minutes)
+        )
+
+    def test_foreign_claim_conflicts(self):
+        project = make_project(status='submitted')
+        self.claim(project, self.other_teacher)
+
+        response = self.client.post(f'/api/projects/projects/{project.pk}/approve/')
+
+        self.assertEqual(response.status_code, 409)
+        project.refresh_from_db()
+        self.assertEqual((project.status, project.claimed_by), ('submitted', self.other_teacher))
+
+    def test_expired_or_own_claim_allowed(self):
+        expired = make_project(status='submitted')
+        self.claim(expired, self.other_teacher, minutes=-1)
+        own = make_stage(status='submitted')
+        self.claim(own, self.teacher)
+
+        response = self.client.post(f'/api/projects/projects/{expired.pk}/reject/', {'comment': 'Нет'})
+        self.assertEqual((response.status_code, response.data['status']), (200, 'rejected'))
+        response = self.client.post(f'/api/projects/stages/{own.pk}/approve/')
+        self.assertEqual((response.status_code, response.data['status']), (200, 'approved'))
+        own.refresh_from_db()
+        self.assertIsNone(own.claimed_by)
+
+    def test_claim_taken_after_object_was_read(self):
+        # Другой преподаватель взял работу между get_object() и сохранением решения
+        project = make_project(status='submitted')
+        stale = Project.objects.get(pk=project.pk)
+        self.claim(project, self.other_teacher)
+
+        with mock.patch.object(ProjectViewSet, 'get_object', return_value=stale):
+            response = self.client.post(f'/api/projects/projects/{project.pk}/request_revision/', {'comment': 'Нет'})
+
+        self.assertEqual(response.status_code, 409)
+        project.refresh_from_db()
+        self.assertEqual((project.status, project.claimed_by), ('submitted', self.other_teacher))
+        self.assertFalse(ProjectComment.objects.filter(project=project).exists())
+
+    def test_decision_made_after_object_was_read(self):
+        stage = make_stage(status='submitted')
+        stale = Stage.objects.get(pk=stage.pk)
+        Stage.objects.filter(pk=stage.pk).update(status='approved', reviewed_by=self.other_teacher)
+
+        with mock.patch.object(StageViewSet, 'get_object', return_value=stale):
+            response = self.client.post(f'/api/projects/stages/{stage.pk}/request_revision/')
+
+        self.assertEqual(response.status_code, 400)
+        stage.refresh_from_db()
+        self.assertEqual((stage.status, stage.reviewed_by), ('approved', self.other_teacher))
+        self.assertFalse(StatusTransition.objects.filter(entity='stage', entity_id=stage.pk).exists())
@@ -0,0 +1,50 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from projects.management.commands import startup_fingerprint
+from projects.models import DeployState
+
+
+class StartupFingerprintTests(TestCase):
+    def setUp(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        settings_override = override_settings(STATIC_ROOT=static_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_command(self, **options):
+        call_command('startup_fingerprint', stdout=StringIO(), **options)
+
+    def test_check_after_save(self):
+        with self.assertRaises(CommandError):
+            self.run_command(check=True)
+
+        self.run_command(save=True)
+
+        self.assertEqual(
+            DeployState.objects.get(name='schema').fingerprint, startup_fingerprint.get_schema_fingerprint()
+        )
+        self.run_command(check=True)
+        self.run_command(wait=0)
+
+    def test_changed_migrations_or_static(self):
+        self.run_command(save=True)
+        for name in ('get_schema_fingerprint', 'get_static_fingerprint'):
+            with self.subTest(fingerprint=name), mock.patch.object(startup_fingerprint, name, return_value='changed'):
+                with self.assertRaises(CommandError):
+                    self.run_command(check=True)
+
+    def test_schema_ignores_runtime_settings(self):
+        schema = startup_fingerprint.get_schema_fingerprint()
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            self.assertEqual(startup_fingerprint.get_schema_fingerprint(), schema)
+
+    def test_wait_times_out(self):
+        with self.assertRaisesMessage(CommandError, 'STARTUP_MODE=release'):
+            self.run_command(wait=0)
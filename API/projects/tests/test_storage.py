@@ -0,0 +1,49 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from projects import storage as storage_module
+from projects.storage import DeduplicatedFileSystemStorage
+
+
+class DeduplicatedStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = DeduplicatedFileSystemStorage(location=self.location)
+
+    def tmp_files(self):
+        return os.listdir(os.path.join(self.storage.blobs_location, 'tmp'))
+
+    def test_same_content_stored_once(self):
+        first = self.storage.save('project_files/a.txt', ContentFile(b'content'))
+        second = self.storage.save('kanban_files/b.txt', ContentFile(b'content'))
+        self.assertEqual(os.stat(self.storage.path(first)).st_ino, os.stat(self.storage.path(second)).st_ino)
+        digest = hashlib.sha256(b'content').hexdigest()
+        self.assertEqual(self.storage.blob_references(digest), 2)
+        self.assertEqual(self.tmp_files(), [])
+
+    def test_blob_removed_before_link(self):
+        digest = hashlib.sha256(b'content').hexdigest()
+        self.storage.save('project_files/a.txt', ContentFile(b'content'))
+        link_or_copy = storage_module.link_or_copy
+        calls = []
+
+        def remove_blob_first(source, destination):
+            # dedupe_media --gc удаляет блоб между проверкой и созданием ссылки
+            if not calls:
+                os.remove(self.storage.blob_path(digest))
+            calls.append(source)
+            return link_or_copy(source, destination)
+
+        with mock.patch.object(storage_module, 'link_or_copy', remove_blob_first):
+            name = self.storage.save('project_files/b.txt', ContentFile(b'content'))
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b'content')
+        self.assertEqual(self.storage.blob_references(digest), 1)
+        self.assertEqual(self.tmp_files(), [])
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from projects.models import TeamMember
+
+from .utils import make_team, make_user
+
+
+class InviteMembersTests(APITestCase):
+    def setUp(self):
+        self.leader = make_user()
+        self.member = make_user()
+        self.team = make_team(self.leader, members=[self.member])
+        self.client.force_authenticate(self.leader)
+
+    def invite(self, emails):
+        return self.client.post(f'/api/projects/teams/{self.team.pk}/invite_members/', {'emails': emails}, format='json')
+
+    def test_outcomes_per_email(self):
+        newcomer = make_user()
+        response = self.invite([newcomer.email, self.member.email, 'nobody@dvfu.ru', 'x@gmail.com', newcomer.email])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['invited'], 1)
+        self.assertEqual(response.data['results'], [
+            {'email': newcomer.email, 'status': 'invited'},
+            {'email': self.member.email, 'status': 'already_member'},
+            {'email': 'nobody@dvfu.ru', 'status': 'not_found'},
+            {'email': 'x@gmail.com', 'status': 'invalid_email'},
+        ])
+        invite = TeamMember.objects.get(team=self.team, user=newcomer)
+        self.assertEqual((invite.is_confirmed, invite.invited_by), (False, self.leader))
+
+    def test_concurrent_invite_is_not_reported(self):
+        first, second = make_user(), make_user()
+        other_inviter = make_user()
+        bulk_create = TeamMember.objects.bulk_create
+
+        def insert_after_concurrent_invite(rows, **kwargs):
+            # Параллельный запрос пригласил first между проверкой и вставкой
+            TeamMember.objects.create(team=self.team, user=first, invited_by=other_inviter)
+            return bulk_create(rows, **kwargs)
+
+        with mock.patch.object(TeamMember.objects, 'bulk_create', side_effect=insert_after_concurrent_invite):
+            response = self.invite([first.email, second.email])
+
+        self.assertEqual(response.data['invited'], 1)
+        self.assertEqual(response.data['results'], [
+            {'email': first.email, 'status': 'already_member'},
+            {'email': second.email, 'status': 'invited'},
+        ])
+        self.assertEqual(TeamMember.objects.get(team=self.team, user=first).invited_by, other_inviter)
+
+    def test_only_leader_invites(self):
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.invite([make_user().email]).status_code, 403)
@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from projects import thumbnails
+from projects.models import KanbanCard, KanbanCardFile
+
+from .utils import make_project, make_user
+
+
+def make_png(size=(200, 100), color=(200, 30, 30, 255)):
+    output = BytesIO()
+    Image.new('RGBA', size, color).save(output, format='PNG')
+    return ContentFile(output.getvalue())
+
+
+class GenerateThumbnailsTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, THUMBNAIL_FORMAT='WEBP')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = make_user()
+
+    def set_avatar(self, name, content):
+        self.user.avatar.save(name, content)
+        self.user.refresh_from_db()
+
+    def open_thumbnail(self, user, size_name):
+        with user.avatar.storage.open(user.thumbnails['sizes'][size_name]) as file:
+            image = Image.open(file)
+            image.load()
+        return image
+
+    def test_avatar_copies(self):
+        self.set_avatar('photo.png', make_png())
+
+        thumbnails.generate_thumbnails('avatar', self.user.pk)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.thumbnails['source'], self.user.avatar.name)
+        self.assertEqual(set(self.user.thumbnails['sizes']), {'small', 'medium'})
+        small = self.open_thumbnail(self.user, 'small')
+        self.assertEqual((small.format, small.size), ('WEBP', (48, 48)))
+        # Повторный запуск без замены файла ничего не делает
+        with mock.patch.object(thumbnails, 'build_thumbnails') as build:
+            thumbnails.generate_thumbnails('avatar', self.user.pk)
+        build.assert_not_called()
+
+    def test_replaced_file_removes_stale_copies(self):
+        self.set_avatar('first.png', make_png())
+        thumbnails.generate_thumbnails('avatar', self.user.pk)
+        self.user.refresh_from_db()
+        old_names = list(self.user.thumbnails['sizes'].values())
+
+        self.set_avatar('second.png', make_png(color=(0, 0, 255, 255)))
+        thumbnails.generate_thumbnails('avatar', self.user.pk)
+
+        self.user.refresh_from_db()
+        storage = self.user.avatar.storage
+        self.assertTrue(all(not storage.exists(name) for name in old_names))
+        self.assertTrue(all(storage.exists(name) for name in self.user.thumbnails['sizes'].values()))
+
+    def test_file_replaced_during_generation(self):
+        self.set_avatar('first.png', make_png())
+        build_thumbnails = thumbnails.build_thumbnails
+        created = {}
+
+        def build_and_replace(instance, kind):
+            result = build_thumbnails(instance, kind)
+            created.update(result['sizes'])
+            # Пока создавались копии, пользователь загрузил другой аватар
+            type(instance).objects.filter(pk=instance.pk).update(avatar='avatars/newer.png')
+            return result
+
+        with mock.patch.object(thumbnails, 'build_thumbnails', side_effect=build_and_replace):
+            thumbnails.generate_thumbnails('avatar', self.user.pk)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.thumbnails, {})
+        self.assertTrue(created)
+        self.assertTrue(all(not self.user.avatar.storage.exists(name) for name in created.values()))
+
+    @override_settings(THUMBNAIL_FORMAT='JPEG')
+    def test_jpeg_flattens_transparency_on_white(self):
+        self.set_avatar('transparent.png', make_png(color=(0, 0, 0, 0)))
+
+        thumbnails.generate_thumbnails('avatar', self.user.pk)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.thumbnails['sizes']['small'].endswith('.small.jpg'))
+        small = self.open_thumbnail(self.user, 'small')
+        self.assertEqual((small.format, small.mode), ('JPEG', 'RGB'))
+        self.assertEqual(small.getpixel((24, 24)), (255, 255, 255))
+
+    def test_card_file_that_is_not_an_image(self):
+        author = make_user()
+        card = KanbanCard.objects.create(project=make_project(), title='Карточка', created_by=author)
+        card_file = KanbanCardFile(card=card, uploaded_by=author)
+        card_file.file.save('notes.txt', ContentFile(b'text'))
+
+        thumbnails.generate_thumbnails('card_file', card_file.pk)
+
+        card_file.refresh_from_db()
+        self.assertEqual(card_file.thumbnails, {'source': card_file.file.name, 'sizes': {}})
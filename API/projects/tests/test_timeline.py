@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from projects.models import StatusTransition
+
+from .utils import make_project, make_team, make_user
+
+
+class TimelineTests(APITestCase):
+    def setUp(self):
+        self.leader = make_user()
+        self.project = make_project(make_team(self.leader))
+        self.client.force_authenticate(self.leader)
+        now = timezone.now()
+        # Пары записей с одинаковым временем: порядок внутри пары задает id
+        self.transitions = [
+            StatusTransition.objects.create(
+                project=self.project, entity='stage' if index % 3 else 'project', entity_id=index,
+                title=f'Объект {index}', field='status', from_value='draft', to_value='submitted',
+                actor=self.leader, created_at=now - timedelta(minutes=index // 2),
+            )
+            for index in range(7)
+        ]
+        StatusTransition.objects.create(
+            project=make_project(), entity='project', entity_id=1, title='Чужой', field='status', to_value='submitted'
+        )
+
+    def url(self, project=None):
+        return f'/api/projects/projects/{(project or self.project).pk}/timeline/'
+
+    def read_all(self, params):
+        ids, url, pages = [], self.url(), 0
+        while url:
+            response = self.client.get(url, params if not pages else None)
+            self.assertEqual(response.status_code, 200)
+            ids += [transition['id'] for transition in response.data['results']]
+            url, pages = response.data['next'], pages + 1
+        return ids, pages
+
+    def expected_ids(self, transitions):
+        ordered = sorted(transitions, key=lambda transition: (transition.created_at, transition.id), reverse=True)
+        return [transition.id for transition in ordered]
+
+    def test_pages_by_cursor(self):
+        response = self.client.get(self.url(), {'limit': 3})
+        self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+        first = response.data['results'][0]
+        self.assertEqual(first['actor']['id'], self.leader.pk)
+        self.assertEqual((first['from_value'], first['to_value']), ('draft', 'submitted'))
+
+        # Каждая запись ровно один раз, от новых к старым, в том числе при равном времени
+        ids, pages = self.read_all({'limit': 3})
+        self.assertEqual(ids, self.expected_ids(self.transitions))
+        self.assertEqual(pages, 3)
+
+    def test_previous_page(self):
+        first = self.client.get(self.url(), {'limit': 3}).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+
+    def test_entity_filter(self):
+        ids, _ = self.read_all({'entity': 'stage', 'limit': 2})
+        stages = [transition for transition in self.transitions if transition.entity == 'stage']
+        self.assertEqual(ids, self.expected_ids(stages))
+
+        response = self.client.get(self.url(), {'entity': 'team'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_team_project_hidden(self):
+        self.assertEqual(self.client.get(self.url(make_project())).status_code, 404)
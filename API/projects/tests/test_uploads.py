@@ -0,0 +1,87 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from projects.models import ProjectFile, UploadSession
+
+from .utils import make_project, make_team, make_user
+
+CONTENT = b'0123456789' * 1000
+
+
+class ChunkedUploadTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root, UPLOAD_SESSION_DIR=os.path.join(media_root, '.uploads'), MEDIA_STORAGE='local'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = make_user()
+        self.project = make_project(make_team(self.user))
+        self.client.force_authenticate(self.user)
+
+    def create_session(self, checksum=None):
+        response = self.client.post('/api/projects/uploads/', {
+            'target': 'project_file',
+            'target_id': self.project.pk,
+            'filename': 'report.txt',
+            'size': len(CONTENT),
+            'checksum': checksum or hashlib.sha256(CONTENT).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['mode'], 'chunked')
+        return response.data['id']
+
+    def put_chunk(self, session_id, offset, data):
+        return self.client.put(
+            f'/api/projects/uploads/{session_id}/chunk/?offset={offset}', data,
+            content_type='application/octet-stream'
+        )
+
+    def finalize(self, session_id):
+        return self.client.post(f'/api/projects/uploads/{session_id}/finalize/')
+
+    def test_chunks_and_finalize(self):
+        session_id = self.create_session()
+        response = self.put_chunk(session_id, 0, CONTENT[:4000])
+        self.assertEqual(response.data['received'], 4000)
+
+        # Повтор уже полученной части и пропуск данных отклоняются с текущим received
+        for offset in (0, 5000):
+            response = self.put_chunk(session_id, offset, CONTENT[offset:offset + 1000])
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.data['received'], 4000)
+
+        response = self.finalize(session_id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['received'], 4000)
+
+        response = self.put_chunk(session_id, 4000, CONTENT[4000:])
+        self.assertEqual(response.data['received'], len(CONTENT))
+
+        response = self.finalize(session_id)
+        self.assertEqual(response.status_code, 201)
+        project_file = ProjectFile.objects.get(pk=response.data['id'])
+        with project_file.file.open('rb') as file:
+            self.assertEqual(file.read(), CONTENT)
+        self.assertFalse(UploadSession.objects.filter(pk=session_id).exists())
+
+    def test_chunk_beyond_size(self):
+        session_id = self.create_session()
+        response = self.put_chunk(session_id, 0, CONTENT + b'!')
+        self.assertEqual(response.status_code, 400)
+
+    def test_checksum_mismatch(self):
+        session_id = self.create_session(checksum='0' * 64)
+        self.put_chunk(session_id, 0, CONTENT)
+        response = self.finalize(session_id)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.filter(pk=session_id).exists())
+        self.assertFalse(ProjectFile.objects.exists())
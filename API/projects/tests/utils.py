@@ -0,0 +1,41 @@
+"""
+Общие данные для тестов приложения projects.
+"""
+from itertools import count
+
+from django.contrib.auth import get_user_model
+
+from projects.models import Project, Stage, Team, TeamMember
+
+User = get_user_model()
+
+sequence = count(1)
+
+
+def make_user(is_staff=False, **fields):
+    number = next(sequence)
+    fields.setdefault('email', f'user-{number}@dvfu.ru')
+    fields.setdefault('username', f'user-{number}')
+    return User.objects.create_user(password='password', is_staff=is_staff, **fields)
+
+
+def make_team(leader=None, members=()):
+    """Команда с подтвержденными участниками; leader становится team_leader"""
+    leader = leader or make_user()
+    team = Team.objects.create(name=f'Команда {next(sequence)}', created_by=leader)
+    TeamMember.objects.create(team=team, user=leader, role='team_leader', is_confirmed=True)
+    for user in members:
+        TeamMember.objects.create(team=team, user=user, is_confirmed=True)
+    return team
+
+
+def make_project(team=None, **fields):
+    team = team or make_team()
+    fields.setdefault('name', f'Проект {next(sequence)}')
+    return Project.objects.create(team=team, created_by=team.created_by, **fields)
+
+
+def make_stage(project=None, **fields):
+    project = project or make_project()
+    fields.setdefault('name', f'Этап {next(sequence)}')
+    return Stage.objects.create(project=project, **fields)
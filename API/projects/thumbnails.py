@@ -0,0 +1,132 @@
+"""
+Уменьшенные копии изображений: аватары и картинки в карточках.
+
+Копии создаются фоновой задачей после сохранения объекта и хранятся рядом с
+оригиналом (avatars/photo.jpg -> avatars/photo.small.webp). Имена копий
+лежат в JSON-поле thumbnails объекта вместе с именем исходного файла,
+чтобы после замены файла копии пересоздавались.
+"""
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import KanbanCardFile
+
+logger = logging.getLogger(__name__)
+
+# Какие модели и поля обрабатываются; ключ - раздел THUMBNAIL_SIZES
+THUMBNAIL_SOURCES = {
+    'avatar': (get_user_model(), 'avatar'),
+    'card_file': (KanbanCardFile, 'file'),
+}
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tif', '.tiff'}
+FORMAT_EXTENSIONS = {'WEBP': '.webp', 'JPEG': '.jpg'}
+
+
+def is_image_name(name):
+    return posixpath.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def needs_thumbnails(instance, field_name):
+    """Файл изменился с последней генерации копий"""
+    name = getattr(instance, field_name).name or ''
+    return (instance.thumbnails or {}).get('source', '') != name
+
+
+def get_thumbnail_name(name, size_name):
+    root, _ = posixpath.splitext(name)
+    return f'{root}.{size_name}{FORMAT_EXTENSIONS[settings.THUMBNAIL_FORMAT]}'
+
+
+def get_thumbnail_file(instance, field_name, size_name):
+    """FieldFile копии нужного размера или None"""
+    name = (instance.thumbnails or {}).get('sizes', {}).get(size_name)
+    if not name:
+        return None
+    return FieldFile(instance, instance._meta.get_field(field_name), name)
+
+
+def render_thumbnail(image, size, crop):
+    """Уменьшенная копия в THUMBNAIL_FORMAT: crop - вписать с обрезкой, иначе по большей стороне"""
+    if crop:
+        thumbnail = ImageOps.fit(image, size, Image.LANCZOS)
+    else:
+        thumbnail = image.copy()
+        thumbnail.thumbnail(size, Image.LANCZOS)
+
+    if settings.THUMBNAIL_FORMAT == 'JPEG' and thumbnail.mode not in ('RGB', 'L'):
+        # У JPEG нет прозрачности: кладем изображение на белый фон
+        background = Image.new('RGB', thumbnail.size, 'white')
+        rgba = thumbnail.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        thumbnail = background
+    elif thumbnail.mode not in ('RGB', 'RGBA', 'L'):
+        thumbnail = thumbnail.convert('RGBA')
+
+    output = BytesIO()
+    thumbnail.save(output, format=settings.THUMBNAIL_FORMAT, quality=settings.THUMBNAIL_QUALITY)
+    return output.getvalue()
+
+
+def build_thumbnails(instance, kind):
+    """Создает копии для файла объекта и возвращает новое значение поля thumbnails"""
+    _, field_name = THUMBNAIL_SOURCES[kind]
+    field_file = getattr(instance, field_name)
+    name = field_file.name or ''
+    sizes = {}
+
+    if name and is_image_name(name):
+        try:
+            with field_file.open('rb') as source, Image.open(source) as image:
+                image = ImageOps.exif_transpose(image)
+                for size_name, options in settings.THUMBNAIL_SIZES[kind].items():
+                    content = render_thumbnail(image, options['size'], options.get('crop', False))
+                    sizes[size_name] = field_file.storage.save(
+                        get_thumbnail_name(name, size_name), ContentFile(content)
+                    )
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            logger.warning('Не удалось создать уменьшенные копии для %s', name, exc_info=True)
+            sizes = {}
+
+    return {'source': name, 'sizes': sizes}
+
+
+def delete_thumbnails(storage, thumbnails):
+    for name in (thumbnails or {}).get('sizes', {}).values():
+        storage.delete(name)
+
+
+def generate_thumbnails(kind, pk):
+    """Создает копии для объекта и сохраняет их имена, удаляя устаревшие"""
+    model, field_name = THUMBNAIL_SOURCES[kind]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_thumbnails(instance, field_name):
+        return
+
+    old_thumbnails = instance.thumbnails
+    thumbnails = build_thumbnails(instance, kind)
+
+    # Файл могли заменить, пока создавались копии: тогда записываем копии
+    # только если исходный файл все еще тот же
+    same_source = Q(**{field_name: thumbnails['source']})
+    if not thumbnails['source']:
+        same_source |= Q(**{f'{field_name}__isnull': True})
+    changes = {'thumbnails': thumbnails}
+    if any(field.name == 'updated_at' for field in model._meta.fields):
+        # Кэш bootstrap привязан к updated_at пользователя
+        changes['updated_at'] = timezone.now()
+    updated = model.objects.filter(same_source, pk=pk).update(**changes)
+    storage = getattr(instance, field_name).storage
+    if updated:
+        delete_thumbnails(storage, old_thumbnails)
+    else:
+        delete_thumbnails(storage, thumbnails)
@@ -0,0 +1,49 @@
+"""
+Журнал смены статусов (StatusTransition).
+
+record_transition() вызывается в действиях ViewSet внутри transaction.atomic()
+вместе с сохранением объекта: запись в журнале появляется тогда и только
+тогда, когда изменение зафиксировано.
+"""
+from .models import Project, Stage, Task, KanbanCard, StatusTransition
+
+# Тип записи и название объекта для каждой модели
+ENTITIES = {
+    Project: ('project', 'name'),
+    Stage: ('stage', 'name'),
+    Task: ('task', 'name'),
+    KanbanCard: ('card', 'title'),
+}
+
+
+def get_project_id(instance):
+    if isinstance(instance, Project):
+        return instance.pk
+    if isinstance(instance, Task):
+        return instance.stage.project_id
+    return instance.project_id
+
+
+def build_transition(instance, field, previous, actor=None, comment=''):
+    """Несохраненная запись о смене поля field с previous на текущее значение"""
+    entity, title_field = ENTITIES[type(instance)]
+    return StatusTransition(
+        project_id=get_project_id(instance),
+        entity=entity,
+        entity_id=instance.pk,
+        title=getattr(instance, title_field)[:200],
+        field=field,
+        from_value=previous or '',
+        to_value=getattr(instance, field),
+        actor=actor if actor is not None and actor.is_authenticated else None,
+        comment=comment,
+    )
+
+
+def record_transition(instance, field, previous, actor=None, comment=''):
+    """Записывает смену поля, если значение действительно изменилось"""
+    if getattr(instance, field) == previous:
+        return None
+    transition = build_transition(instance, field, previous, actor, comment)
+    transition.save()
+    return transition
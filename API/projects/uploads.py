@@ -0,0 +1,149 @@
+"""
+Возобновляемая загрузка файлов по частям.
+
+Части пишутся сразу на диск во временный файл сессии, после завершения
+файл проверяется по SHA-256 и переносится в хранилище без копирования
+в память. В режиме direct (MEDIA_STORAGE=s3) файл загружается клиентом
+прямо в хранилище, см. object_storage.py.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.files import File
+from django.http import Http404
+
+from . import object_storage
+from .models import Project, ProjectFile, Stage, KanbanCard, KanbanCardFile
+
+READ_BLOCK_SIZE = 64 * 1024
+
+# Модель, к которой относится объект загрузки, для каждого target
+TARGET_MODELS = {
+    'project_file': Project,
+    'card_file': KanbanCard,
+    'stage_artifact': Stage,
+    'project_passport': Project,
+}
+
+
+class PartialUploadFile(File):
+    """Файл сессии загрузки, который хранилище может перенести, а не копировать"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def get_session_path(session):
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f'{session.pk}.part')
+
+
+def get_target_project(obj):
+    if isinstance(obj, Project):
+        return obj
+    return obj.project
+
+
+def user_can_access_project(user, project):
+    """Участник команды проекта или преподаватель"""
+    if user.is_staff or getattr(user, 'is_teacher', False):
+        return True
+    return project.team.team_members.filter(user=user, is_confirmed=True).exists()
+
+
+def get_upload_target(target, target_id, user):
+    """Возвращает объект, к которому прикрепляется файл, с проверкой доступа"""
+    model = TARGET_MODELS[target]
+    try:
+        obj = model.objects.get(pk=target_id)
+    except model.DoesNotExist:
+        raise Http404('Объект для загрузки не найден')
+    if not user_can_access_project(user, get_target_project(obj)):
+        raise PermissionDenied('Нет доступа к проекту')
+    return obj
+
+
+def write_chunk(session, offset, stream, length):
+    """Дописывает часть в файл сессии, возвращает новое число полученных байт"""
+    os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+    path = get_session_path(session)
+    mode = 'r+b' if os.path.exists(path) else 'wb'
+    written = 0
+    with open(path, mode) as part:
+        part.seek(offset)
+        while written < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - written))
+            if not block:
+                # Соединение оборвалось: сохраняем то, что успели получить
+                break
+            part.write(block)
+            written += len(block)
+        part.truncate(offset + written)
+    return offset + written
+
+
+def get_file_checksum(path):
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as part:
+        for block in iter(lambda: part.read(READ_BLOCK_SIZE), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def get_target_field(target, obj, name, user):
+    """Объект, который будет сохранен, и имя его поля с файлом"""
+    if target == 'project_file':
+        return ProjectFile(project=obj, name=name, uploaded_by=user), 'file'
+    if target == 'card_file':
+        return KanbanCardFile(card=obj, name=name, uploaded_by=user), 'file'
+    if target == 'stage_artifact':
+        return obj, 'artifact'
+    return obj, 'passport'
+
+
+def attach_file(target, obj, name, content, user):
+    """Прикрепляет загруженный файл к объекту и возвращает созданный/измененный объект"""
+    instance, field_name = get_target_field(target, obj, name, user)
+    getattr(instance, field_name).save(name, content, save=False)
+    instance.save()
+    return instance
+
+
+def finalize_session(session, user):
+    """Проверяет файл сессии и прикрепляет его к объекту"""
+    path = get_session_path(session)
+    obj = get_upload_target(session.target, session.target_id, user)
+    with open(path, 'rb') as part:
+        instance = attach_file(session.target, obj, session.filename, PartialUploadFile(part), user)
+    if os.path.exists(path):
+        os.remove(path)
+    return instance
+
+
+def prepare_direct_upload(session, user):
+    """Выбирает имя объекта для прямой загрузки в хранилище"""
+    obj = get_upload_target(session.target, session.target_id, user)
+    instance, field_name = get_target_field(session.target, obj, session.filename, user)
+    session.object_name = object_storage.build_direct_upload_name(
+        getattr(instance, field_name), instance, session.filename, session
+    )
+
+
+def finalize_direct_session(session, user):
+    """Прикрепляет уже загруженный в хранилище объект, не копируя его"""
+    obj = get_upload_target(session.target, session.target_id, user)
+    instance, field_name = get_target_field(session.target, obj, session.filename, user)
+    setattr(instance, field_name, session.object_name)
+    instance.save()
+    return instance
+
+
+def discard_session(session):
+    if session.mode == 'direct':
+        object_storage.delete_object(session.object_name)
+    else:
+        path = get_session_path(session)
+        if os.path.exists(path):
+            os.remove(path)
+    session.delete()
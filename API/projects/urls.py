@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     TeamViewSet, ProjectViewSet, ProjectCommentViewSet, ProjectFileViewSet, ProjectCheckViewSet,
     StageViewSet, StageCommentViewSet, TaskViewSet,
     KnowledgeBaseViewSet, TeacherDashboardViewSet,
-    KanbanCardViewSet, KanbanCardFileViewSet, KanbanCardCommentViewSet, KanbanCardCheckViewSet
+    KanbanCardViewSet, KanbanCardFileViewSet, KanbanCardCommentViewSet, KanbanCardCheckViewSet,
+    UploadSessionViewSet
 )
 
 router = DefaultRouter()
@@ -22,7 +24,14 @@ router.register(r'stage-comments', StageCommentViewSet, basename='stage-comment'
 router.register(r'tasks', TaskViewSet, basename='task')
 router.register(r'knowledge-base', KnowledgeBaseViewSet, basename='knowledge-base')
 router.register(r'teacher-dashboard', TeacherDashboardViewSet, basename='teacher-dashboard')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 
 urlpatterns = [
     path('', include(router.urls)),
+    # Асинхронные варианты эндпоинтов чтения (выигрыш под ASGI)
+    path('async/knowledge-base/', async_views.knowledge_base, name='async-knowledge-base'),
+    path('async/kanban-cards/', async_views.kanban_cards, name='async-kanban-cards'),
+    path('async/teacher-dashboard/pending_projects/', async_views.pending_projects,
+         name='async-pending-projects'),
+    path('async/teacher-dashboard/pending_stages/', async_views.pending_stages, name='async-pending-stages'),
 ]
@@ -1,27 +1,201 @@
-from rest_framework import viewsets, status
+import csv
+import os
+
+from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.settings import api_settings
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import content_disposition_header
 from .models import (
     Team, TeamMember, Project, ProjectComment, ProjectFile, ProjectCheck,
     Stage, StageComment, Task, KnowledgeBase,
-    KanbanCard, KanbanCardFile, KanbanCardComment, KanbanCardCheck
+    KanbanCard, KanbanCardFile, KanbanCardComment, KanbanCardCheck, UploadSession, StatusTransition
 )
 from .serializers import (
     TeamSerializer, TeamMemberSerializer, ProjectSerializer, ProjectDetailSerializer,
     ProjectCommentSerializer, ProjectFileSerializer, ProjectCheckSerializer,
     StageSerializer, StageCommentSerializer, TaskSerializer, KnowledgeBaseSerializer,
-    KanbanCardSerializer, KanbanCardFileSerializer, KanbanCardCommentSerializer, KanbanCardCheckSerializer
+    KanbanCardSerializer, KanbanCardFileSerializer, KanbanCardCommentSerializer, KanbanCardCheckSerializer,
+    UploadSessionSerializer, StatusTransitionSerializer
 )
 from .permissions import IsTeamMember, IsTeamLeader, IsProjectTeamMember, IsTeacher
+from .renderers import NormalizedJSONRenderer
+from .cache import invalidate_data_version
+from .progress import PROGRESS_FIELDS
+from .transitions import record_transition
+from . import analytics, checks, exports, media, object_storage, review_queue, reviews, roster, thumbnails, uploads
 
 User = get_user_model()
 
 
-class TeamViewSet(viewsets.ModelViewSet):
+def protected_download(request, url_name, pk, project, field_file, filename=''):
+    """Отдает файл участнику команды проекта или преподавателю"""
+    user = request.user if request.user.is_authenticated else None
+    if user is None:
+        user_id = media.get_signed_user_id(request.query_params.get('signature', ''), url_name, pk)
+        user = User.objects.filter(pk=user_id, is_active=True).first() if user_id else None
+    if user is None:
+        return Response(
+            {'error': 'Ссылка недействительна или устарела'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    if not uploads.user_can_access_project(user, project):
+        return Response(
+            {'error': 'Нет доступа к этому проекту'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    if not field_file:
+        return Response(
+            {'error': 'Файл не загружен'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return media.file_response(request, field_file, filename)
+
+
+def review_claim_conflict(item, user):
+    """Ответ 409, если работу сейчас проверяет другой преподаватель (очередь проверки)"""
+    reviewer = review_queue.get_other_reviewer(item, user)
+    if reviewer is None:
+        return None
+    return Response(
+        {'error': f'Работу проверяет {reviewer.email}', 'claimed_until': item.claimed_until},
+        status=status.HTTP_409_CONFLICT
+    )
+
+
+def lock_for_review(item, user, not_submitted_error):
+    """
+    Перечитывает работу с блокировкой строки (вызывать внутри transaction.atomic())
+    и проверяет, что она на проверке и ее не проверяет другой преподаватель.
+
+    Возвращает (работа, None) или (None, ответ с ошибкой): параллельное решение
+    или аренда, взятая после get_object(), видны здесь, а не теряются при save().
+    """
+    item = type(item).objects.select_for_update().get(pk=item.pk)
+    if item.status != 'submitted':
+        return None, Response({'error': not_submitted_error}, status=status.HTTP_400_BAD_REQUEST)
+    conflict = review_claim_conflict(item, user)
+    if conflict is not None:
+        return None, conflict
+    return item, None
+
+
+def bulk_review_response(request, model):
+    """Пакет решений преподавателя по проектам или этапам (см. projects/reviews.py)"""
+    items = request.data.get('items')
+    if not isinstance(items, list) or not items:
+        return Response(
+            {'error': 'items должен быть непустым списком {"id", "decision", "comment"}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > settings.REVIEW_BULK_MAX_ITEMS:
+        return Response(
+            {'error': f'Не больше {settings.REVIEW_BULK_MAX_ITEMS} решений за раз'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    results = reviews.bulk_review(model, items, request.user)
+    return Response({
+        'reviewed': sum(1 for result in results if 'status' in result),
+        'results': results,
+    })
+
+
+def parse_check_values(data):
+    """Переданные is_checked и comment отметки преподавателя; None, если они неверные"""
+    values = {field: data[field] for field in checks.CHECK_FIELDS if field in data}
+    if 'is_checked' in values and not isinstance(values['is_checked'], bool):
+        return None
+    if 'comment' in values and not isinstance(values['comment'], str):
+        return None
+    return values
+
+
+def upsert_check_response(view, request, model, not_found):
+    """Отметка преподавателя на одном проекте или карточке (см. projects/checks.py)"""
+    link = checks.CHECK_LINKS[model]
+    parent_id = request.data.get(link)
+    # Только целое число: int() принял бы и true, и 2.7
+    if type(parent_id) is not int:
+        return Response({'error': f'{link} обязателен (id)'}, status=status.HTTP_400_BAD_REQUEST)
+    values = parse_check_values(request.data)
+    if not values:
+        return Response(
+            {'error': 'Укажите is_checked (true/false) и/или comment (строка)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if checks.find_missing_parents(model, [parent_id]):
+        return Response({'error': not_found}, status=status.HTTP_404_NOT_FOUND)
+    checks.upsert_checks(model, request.user, [parent_id], values)
+    check = model.objects.select_related('teacher').get(**{f'{link}_id': parent_id}, teacher=request.user)
+    return Response(view.get_serializer(check).data)
+
+
+def batch_checks_response(request, model, key, not_found):
+    """Одна и та же отметка на многих проектах или карточках одним запросом"""
+    ids = request.data.get(key)
+    if not isinstance(ids, list) or not ids or not all(type(pk) is int for pk in ids):
+        return Response({'error': f'{key} должен быть непустым списком id'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > settings.TEACHER_CHECKS_MAX_ITEMS:
+        return Response(
+            {'error': f'Не больше {settings.TEACHER_CHECKS_MAX_ITEMS} отметок за раз'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    is_checked = request.data.get('is_checked')
+    if not isinstance(is_checked, bool):
+        return Response({'error': 'is_checked: true или false'}, status=status.HTTP_400_BAD_REQUEST)
+    # Повтор id в одном ON CONFLICT DO UPDATE - ошибка PostgreSQL; порядок id - порядок блокировок
+    ids = sorted(set(ids))
+    missing = checks.find_missing_parents(model, ids)
+    if missing:
+        return Response({'error': not_found, key: missing}, status=status.HTTP_404_NOT_FOUND)
+    checks.upsert_checks(model, request.user, ids, {'is_checked': is_checked})
+    return Response({key: ids, 'is_checked': is_checked})
+
+
+class NormalizedFormatMixin:
+    """
+    Нормализованный формат ответа (?format=normalized).
+
+    Вложенные пользователи, комментарии и файлы заменяются на id, а сами
+    объекты по одному разу попадают в таблицу included.
+    """
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + [NormalizedJSONRenderer]
+
+    def is_normalized(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return getattr(renderer, 'format', None) == NormalizedJSONRenderer.format
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.is_normalized():
+            if getattr(self, 'included', None) is None:
+                self.included = {}
+            context['included'] = self.included
+        return context
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        included = getattr(self, 'included', None)
+        if included is not None and isinstance(response, Response) and response.status_code < 400:
+            response.data = {
+                'data': response.data,
+                'included': {
+                    key: [table[pk] for pk in sorted(table)]
+                    for key, table in included.items()
+                },
+            }
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class TeamViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с командами"""
     serializer_class = TeamSerializer
     permission_classes = [IsAuthenticated]
@@ -96,9 +270,129 @@ class TeamViewSet(viewsets.ModelViewSet):
             invited_by=request.user
         )
         
-        serializer = TeamMemberSerializer(member)
+        serializer = TeamMemberSerializer(member, context=self.get_serializer_context())
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def invite_members(self, request, pk=None):
+        """Пригласить сразу несколько участников: {"emails": [...]}"""
+        team = self.get_object()
+
+        if not team.team_members.filter(user=request.user, role='team_leader', is_confirmed=True).exists():
+            return Response(
+                {'error': 'Только тимлид может приглашать участников'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        emails = request.data.get('emails')
+        if not isinstance(emails, list) or not emails:
+            return Response(
+                {'error': 'emails должен быть непустым списком'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(emails) > settings.TEAM_INVITE_MAX_EMAILS:
+            return Response(
+                {'error': f'Не больше {settings.TEAM_INVITE_MAX_EMAILS} приглашений за раз'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = {}
+        valid_emails = []
+        for email in emails:
+            email = str(email).strip()
+            if email in results:
+                continue
+            if not email.endswith('@dvfu.ru'):
+                results[email] = 'invalid_email'
+            else:
+                results[email] = None
+                valid_emails.append(email)
+
+        users = {user.email: user for user in User.objects.filter(email__in=valid_emails)}
+        existing = set(team.team_members.filter(user__in=users.values()).values_list('user_id', flat=True))
+
+        new_members = []
+        for email in valid_emails:
+            user = users.get(email)
+            if user is None:
+                results[email] = 'not_found'
+            elif user.id in existing:
+                results[email] = 'already_member'
+            else:
+                new_members.append(TeamMember(
+                    team=team,
+                    user=user,
+                    role='member',
+                    is_confirmed=False,
+                    invited_by=request.user
+                ))
+
+        invited = set()
+        if new_members:
+            started = timezone.now()
+            # Параллельное приглашение того же пользователя не приведет к ошибке
+            TeamMember.objects.bulk_create(new_members, ignore_conflicts=True)
+            # Строки, которые успел вставить параллельный запрос, пропущены молча:
+            # приглашенными считаются только строки, созданные этим запросом
+            invited = set(team.team_members.filter(
+                user__in=[member.user_id for member in new_members],
+                invited_by=request.user,
+                created_at__gte=started,
+            ).values_list('user_id', flat=True))
+            invalidate_data_version(team_ids=[team.pk])
+        for member in new_members:
+            results[member.user.email] = 'invited' if member.user_id in invited else 'already_member'
+
+        return Response({
+            'invited': len(invited),
+            'results': [{'email': email, 'status': outcome} for email, outcome in results.items()],
+        })
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAuthenticated, IsTeacher])
+    def import_roster(self, request):
+        """
+        Импорт списка студентов (преподаватель).
+
+        JSON {"rows": [{"email", "first_name", "last_name", "team", "role"}]}
+        или CSV-файл в поле file с теми же колонками. ?dry_run=1 - только проверка.
+        При любой ошибке в списке ничего не создается.
+        """
+        try:
+            rows = roster.parse_roster(request.data, request.FILES.get('file'))
+        except (ValueError, UnicodeDecodeError, csv.Error) as error:
+            return Response(
+                {'error': str(error) or 'Не удалось прочитать список'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not rows:
+            return Response(
+                {'error': 'Список пуст'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > settings.ROSTER_IMPORT_MAX_ROWS:
+            return Response(
+                {'error': f'Не больше {settings.ROSTER_IMPORT_MAX_ROWS} строк за один импорт'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows, errors = roster.validate_roster(rows)
+        if errors:
+            return Response(
+                {'error': 'Список содержит ошибки, ничего не импортировано', 'rows': errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if request.query_params.get('dry_run'):
+            return Response({'valid': True, 'rows': len(rows)})
+
+        try:
+            result = roster.import_roster(rows, request.user)
+        except IntegrityError:
+            return Response(
+                {'error': 'Данные изменились во время импорта, повторите попытку'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(result, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def confirm_participation(self, request, pk=None):
         """Подтвердить участие в команде"""
@@ -114,7 +408,7 @@ class TeamViewSet(viewsets.ModelViewSet):
             member.is_confirmed = True
             member.joined_at = timezone.now()
             member.save()
-            serializer = TeamMemberSerializer(member)
+            serializer = TeamMemberSerializer(member, context=self.get_serializer_context())
             return Response(serializer.data)
         except TeamMember.DoesNotExist:
             return Response(
@@ -145,7 +439,7 @@ class TeamViewSet(viewsets.ModelViewSet):
             member = team.team_members.get(user_id=user_id)
             member.role = new_role
             member.save()
-            serializer = TeamMemberSerializer(member)
+            serializer = TeamMemberSerializer(member, context=self.get_serializer_context())
             return Response(serializer.data)
         except TeamMember.DoesNotExist:
             return Response(
@@ -154,7 +448,18 @@ class TeamViewSet(viewsets.ModelViewSet):
             )
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class TimelinePagination(CursorPagination):
+    """
+    Лента проекта по ключу (created_at, id): следующая страница читается по
+    индексу от позиции курсора, без OFFSET и без подсчета общего числа записей.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 200
+
+
+class ProjectViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с проектами"""
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
@@ -195,9 +500,12 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        previous = project.status
         project.status = 'submitted'
         project.submitted_at = timezone.now()
-        project.save()
+        with transaction.atomic():
+            project.save()
+            record_transition(project, 'status', previous, request.user)
         
         serializer = self.get_serializer(project)
         return Response(serializer.data)
@@ -206,17 +514,17 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def approve(self, request, pk=None):
         """Принять проект (преподаватель)"""
         project = self.get_object()
-        
-        if project.status != 'submitted':
-            return Response(
-                {'error': 'Проект не находится на проверке'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        project.status = 'approved'
-        project.reviewed_by = request.user
-        project.reviewed_at = timezone.now()
-        project.save()
+        with transaction.atomic():
+            project, error = lock_for_review(project, request.user, 'Проект не находится на проверке')
+            if error is not None:
+                return error
+            previous = project.status
+            project.status = 'approved'
+            project.reviewed_by = request.user
+            project.reviewed_at = timezone.now()
+            review_queue.finish_review(project)
+            project.save()
+            record_transition(project, 'status', previous, request.user)
         
         serializer = self.get_serializer(project)
         return Response(serializer.data)
@@ -225,25 +533,24 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def request_revision(self, request, pk=None):
         """Вернуть проект на доработку (преподаватель)"""
         project = self.get_object()
-        
-        if project.status != 'submitted':
-            return Response(
-                {'error': 'Проект не находится на проверке'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
         comment_text = request.data.get('comment', '')
-        if comment_text:
-            ProjectComment.objects.create(
-                project=project,
-                author=request.user,
-                text=comment_text
-            )
-        
-        project.status = 'revision'
-        project.reviewed_by = request.user
-        project.reviewed_at = timezone.now()
-        project.save()
+        with transaction.atomic():
+            project, error = lock_for_review(project, request.user, 'Проект не находится на проверке')
+            if error is not None:
+                return error
+            previous = project.status
+            project.status = 'revision'
+            project.reviewed_by = request.user
+            project.reviewed_at = timezone.now()
+            review_queue.finish_review(project)
+            if comment_text:
+                ProjectComment.objects.create(
+                    project=project,
+                    author=request.user,
+                    text=comment_text
+                )
+            project.save()
+            record_transition(project, 'status', previous, request.user, comment_text)
         
         serializer = self.get_serializer(project)
         return Response(serializer.data)
@@ -252,29 +559,82 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def reject(self, request, pk=None):
         """Отклонить проект (преподаватель)"""
         project = self.get_object()
-        
-        if project.status != 'submitted':
-            return Response(
-                {'error': 'Проект не находится на проверке'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
         comment_text = request.data.get('comment', '')
-        if comment_text:
-            ProjectComment.objects.create(
-                project=project,
-                author=request.user,
-                text=comment_text
-            )
-        
-        project.status = 'rejected'
-        project.reviewed_by = request.user
-        project.reviewed_at = timezone.now()
-        project.save()
+        with transaction.atomic():
+            project, error = lock_for_review(project, request.user, 'Проект не находится на проверке')
+            if error is not None:
+                return error
+            previous = project.status
+            project.status = 'rejected'
+            project.reviewed_by = request.user
+            project.reviewed_at = timezone.now()
+            review_queue.finish_review(project)
+            if comment_text:
+                ProjectComment.objects.create(
+                    project=project,
+                    author=request.user,
+                    text=comment_text
+                )
+            project.save()
+            record_transition(project, 'status', previous, request.user, comment_text)
         
         serializer = self.get_serializer(project)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsTeacher])
+    def bulk_review(self, request):
+        """
+        Проверить несколько проектов за раз (преподаватель).
+
+        {"items": [{"id": 1, "decision": "approve|request_revision|reject", "comment": "..."}]}.
+        Ответ - статус или код ошибки по каждому проекту; остальные проекты пакета при ошибке сохраняются.
+        """
+        return bulk_review_response(request, Project)
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Скачать проект целиком в ZIP: паспорт, файлы, артефакты, вложения карточек и project.json"""
+        project = get_object_or_404(Project.objects.select_related('team', 'created_by'), pk=pk)
+        if not uploads.user_can_access_project(request.user, project):
+            return Response(
+                {'error': 'Нет доступа к этому проекту'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        response = StreamingHttpResponse(exports.stream_project_zip(project), content_type='application/zip')
+        response['Content-Disposition'] = content_disposition_header(True, f'project-{project.pk}.zip')
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Лента смены статусов проекта, его этапов, задач и карточек.
+
+        Постранично курсором (?cursor=..., ?limit=50), ?entity=stage - только
+        записи одного типа. Данные берутся только из журнала.
+        """
+        project = self.get_object()
+        transitions = StatusTransition.objects.filter(project=project).select_related('actor')
+        entity = request.query_params.get('entity')
+        if entity:
+            if entity not in dict(StatusTransition.ENTITY_CHOICES):
+                return Response(
+                    {'error': f'Тип объекта: {", ".join(dict(StatusTransition.ENTITY_CHOICES))}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            transitions = transitions.filter(entity=entity)
+
+        paginator = TimelinePagination()
+        page = paginator.paginate_queryset(transitions, request, view=self)
+        serializer = StatusTransitionSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='passport', permission_classes=[AllowAny])
+    def download_passport(self, request, pk=None):
+        """Скачать файл паспорта проекта"""
+        project = get_object_or_404(Project.objects.select_related('team'), pk=pk)
+        return protected_download(request, 'project-download-passport', pk, project, project.passport)
+
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated])
     def move_card(self, request, pk=None):
         """Переместить карточку проекта между колонками канбан-доски"""
@@ -297,15 +657,18 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        previous = project.kanban_column
         project.kanban_column = new_column
         project.order = new_order
-        project.save()
+        with transaction.atomic():
+            project.save()
+            record_transition(project, 'kanban_column', previous, request.user)
         
         serializer = self.get_serializer(project)
         return Response(serializer.data)
 
 
-class ProjectCommentViewSet(viewsets.ModelViewSet):
+class ProjectCommentViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с комментариями к проекту"""
     serializer_class = ProjectCommentSerializer
     permission_classes = [IsAuthenticated, IsProjectTeamMember]
@@ -328,7 +691,7 @@ class ProjectCommentViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user)
 
 
-class StageViewSet(viewsets.ModelViewSet):
+class StageViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с этапами"""
     serializer_class = StageSerializer
     permission_classes = [IsAuthenticated, IsProjectTeamMember]
@@ -370,9 +733,12 @@ class StageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        previous = stage.status
         stage.status = 'submitted'
         stage.submitted_at = timezone.now()
-        stage.save()
+        with transaction.atomic():
+            stage.save()
+            record_transition(stage, 'status', previous, request.user)
         
         serializer = self.get_serializer(stage)
         return Response(serializer.data)
@@ -381,17 +747,17 @@ class StageViewSet(viewsets.ModelViewSet):
     def approve(self, request, pk=None):
         """Принять этап (преподаватель)"""
         stage = self.get_object()
-        
-        if stage.status != 'submitted':
-            return Response(
-                {'error': 'Этап не находится на проверке'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        stage.status = 'approved'
-        stage.reviewed_by = request.user
-        stage.reviewed_at = timezone.now()
-        stage.save()
+        with transaction.atomic():
+            stage, error = lock_for_review(stage, request.user, 'Этап не находится на проверке')
+            if error is not None:
+                return error
+            previous = stage.status
+            stage.status = 'approved'
+            stage.reviewed_by = request.user
+            stage.reviewed_at = timezone.now()
+            review_queue.finish_review(stage)
+            stage.save()
+            record_transition(stage, 'status', previous, request.user)
         
         serializer = self.get_serializer(stage)
         return Response(serializer.data)
@@ -400,31 +766,46 @@ class StageViewSet(viewsets.ModelViewSet):
     def request_revision(self, request, pk=None):
         """Вернуть этап на доработку (преподаватель)"""
         stage = self.get_object()
-        
-        if stage.status != 'submitted':
-            return Response(
-                {'error': 'Этап не находится на проверке'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
         comment_text = request.data.get('comment', '')
-        if comment_text:
-            StageComment.objects.create(
-                stage=stage,
-                author=request.user,
-                text=comment_text
-            )
-        
-        stage.status = 'revision'
-        stage.reviewed_by = request.user
-        stage.reviewed_at = timezone.now()
-        stage.save()
+        with transaction.atomic():
+            stage, error = lock_for_review(stage, request.user, 'Этап не находится на проверке')
+            if error is not None:
+                return error
+            previous = stage.status
+            stage.status = 'revision'
+            stage.reviewed_by = request.user
+            stage.reviewed_at = timezone.now()
+            review_queue.finish_review(stage)
+            if comment_text:
+                StageComment.objects.create(
+                    stage=stage,
+                    author=request.user,
+                    text=comment_text
+                )
+            stage.save()
+            record_transition(stage, 'status', previous, request.user, comment_text)
         
         serializer = self.get_serializer(stage)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsTeacher])
+    def bulk_review(self, request):
+        """
+        Проверить несколько этапов за раз (преподаватель).
 
-class StageCommentViewSet(viewsets.ModelViewSet):
+        {"items": [{"id": 1, "decision": "approve|request_revision", "comment": "..."}]}.
+        Ответ - статус или код ошибки по каждому этапу; остальные этапы пакета при ошибке сохраняются.
+        """
+        return bulk_review_response(request, Stage)
+
+    @action(detail=True, methods=['get'], url_path='artifact', permission_classes=[AllowAny])
+    def download_artifact(self, request, pk=None):
+        """Скачать артефакт этапа"""
+        stage = get_object_or_404(Stage.objects.select_related('project__team'), pk=pk)
+        return protected_download(request, 'stage-download-artifact', pk, stage.project, stage.artifact)
+
+
+class StageCommentViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с комментариями к этапам"""
     serializer_class = StageCommentSerializer
     permission_classes = [IsAuthenticated, IsProjectTeamMember]
@@ -447,7 +828,7 @@ class StageCommentViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с задачами"""
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsProjectTeamMember]
@@ -520,9 +901,12 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        previous = task.status
         task.status = 'completed'
         task.completed_at = timezone.now()
-        task.save()
+        with transaction.atomic():
+            task.save()
+            record_transition(task, 'status', previous, request.user)
         
         serializer = self.get_serializer(task)
         return Response(serializer.data)
@@ -540,15 +924,18 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         blocker = request.data.get('blocker', '')
+        previous = task.status
         task.status = 'returned'
         task.blocker = blocker
-        task.save()
+        with transaction.atomic():
+            task.save()
+            record_transition(task, 'status', previous, request.user, blocker)
         
         serializer = self.get_serializer(task)
         return Response(serializer.data)
 
 
-class ProjectFileViewSet(viewsets.ModelViewSet):
+class ProjectFileViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с файлами проектов"""
     serializer_class = ProjectFileSerializer
     permission_classes = [IsAuthenticated]
@@ -570,8 +957,16 @@ class ProjectFileViewSet(viewsets.ModelViewSet):
         """При создании файла устанавливаем загрузившего"""
         serializer.save(uploaded_by=self.request.user)
 
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def download(self, request, pk=None):
+        """Скачать файл проекта"""
+        project_file = get_object_or_404(ProjectFile.objects.select_related('project__team'), pk=pk)
+        return protected_download(
+            request, 'project-file-download', pk, project_file.project, project_file.file, project_file.name
+        )
+
 
-class ProjectCheckViewSet(viewsets.ModelViewSet):
+class ProjectCheckViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с галочками преподавателя"""
     serializer_class = ProjectCheckSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
@@ -614,8 +1009,23 @@ class ProjectCheckViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(check)
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'])
+    def upsert(self, request):
+        """
+        Поставить или изменить галочку на проекте одним запросом.
+
+        {"project": 1, "is_checked": true, "comment": "..."}: отметка создается,
+        если ее нет; у существующей меняются только переданные поля.
+        """
+        return upsert_check_response(self, request, ProjectCheck, 'Проект не найден')
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Поставить или снять галочку на многих проектах: {"projects": [1, 2], "is_checked": true}"""
+        return batch_checks_response(request, ProjectCheck, 'projects', 'Некоторые проекты не найдены')
+
 
-class KanbanCardViewSet(viewsets.ModelViewSet):
+class KanbanCardViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с карточками канбан-доски"""
     serializer_class = KanbanCardSerializer
     permission_classes = [IsAuthenticated]
@@ -679,15 +1089,18 @@ class KanbanCardViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        previous = card.column
         card.column = new_column
         card.order = new_order
-        card.save()
+        with transaction.atomic():
+            card.save()
+            record_transition(card, 'column', previous, request.user)
         
         serializer = self.get_serializer(card)
         return Response(serializer.data)
 
 
-class KanbanCardFileViewSet(viewsets.ModelViewSet):
+class KanbanCardFileViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с файлами карточек"""
     serializer_class = KanbanCardFileSerializer
     permission_classes = [IsAuthenticated]
@@ -709,8 +1122,22 @@ class KanbanCardFileViewSet(viewsets.ModelViewSet):
         """При создании файла устанавливаем загрузившего"""
         serializer.save(uploaded_by=self.request.user)
 
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def download(self, request, pk=None):
+        """Скачать файл карточки"""
+        card_file = get_object_or_404(KanbanCardFile.objects.select_related('card__project__team'), pk=pk)
+        field_file, filename = card_file.file, card_file.name
+        rendition = request.query_params.get('rendition')
+        if rendition:
+            # Уменьшенная копия картинки, например ?rendition=preview
+            field_file = thumbnails.get_thumbnail_file(card_file, 'file', rendition)
+            filename = field_file and os.path.basename(field_file.name)
+        return protected_download(
+            request, 'kanban-card-file-download', pk, card_file.card.project, field_file, filename
+        )
+
 
-class KanbanCardCommentViewSet(viewsets.ModelViewSet):
+class KanbanCardCommentViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с комментариями к карточкам"""
     serializer_class = KanbanCardCommentSerializer
     permission_classes = [IsAuthenticated]
@@ -733,7 +1160,7 @@ class KanbanCardCommentViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user)
 
 
-class KanbanCardCheckViewSet(viewsets.ModelViewSet):
+class KanbanCardCheckViewSet(NormalizedFormatMixin, viewsets.ModelViewSet):
     """ViewSet для работы с галочками преподавателя на карточках"""
     serializer_class = KanbanCardCheckSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
@@ -776,6 +1203,21 @@ class KanbanCardCheckViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(check)
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'])
+    def upsert(self, request):
+        """
+        Поставить или изменить галочку на карточке одним запросом.
+
+        {"card": 1, "is_checked": true, "comment": "..."}: отметка создается,
+        если ее нет; у существующей меняются только переданные поля.
+        """
+        return upsert_check_response(self, request, KanbanCardCheck, 'Карточка не найдена')
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Поставить или снять галочку на многих карточках: {"cards": [1, 2], "is_checked": true}"""
+        return batch_checks_response(request, KanbanCardCheck, 'cards', 'Некоторые карточки не найдены')
+
 
 class KnowledgeBaseViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet для работы с базой знаний (только чтение)"""
@@ -790,7 +1232,7 @@ class KnowledgeBaseViewSet(viewsets.ReadOnlyModelViewSet):
         return KnowledgeBase.objects.all()
 
 
-class TeacherDashboardViewSet(viewsets.ViewSet):
+class TeacherDashboardViewSet(NormalizedFormatMixin, viewsets.GenericViewSet):
     """ViewSet для панели преподавателя"""
     permission_classes = [IsAuthenticated, IsTeacher]
 
@@ -798,12 +1240,309 @@ class TeacherDashboardViewSet(viewsets.ViewSet):
     def pending_projects(self, request):
         """Получить список проектов на проверке"""
         projects = Project.objects.filter(status='submitted').order_by('-submitted_at')
-        serializer = ProjectSerializer(projects, many=True, context={'request': request})
+        serializer = ProjectSerializer(projects, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def pending_stages(self, request):
         """Получить список этапов на проверке"""
         stages = Stage.objects.filter(status='submitted').order_by('-submitted_at')
-        serializer = StageSerializer(stages, many=True, context={'request': request})
+        serializer = StageSerializer(stages, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def claim_next(self, request):
+        """
+        Взять следующую работу на проверку.
+
+        Выдается самая ранняя свободная работа, и на REVIEW_CLAIM_MINUTES она
+        закрепляется за преподавателем: другим ее не выдадут, а принять или
+        вернуть ее сможет только он. {"kind": "project"|"stage"} - только из
+        одной очереди. Если очередь пуста, item = null.
+        """
+        kind = request.data.get('kind')
+        if kind is not None and kind not in review_queue.QUEUE_MODELS:
+            return Response(
+                {'error': f'kind: {", ".join(review_queue.QUEUE_MODELS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        claimed = review_queue.claim_next(request.user, [kind] if kind else review_queue.QUEUE_MODELS)
+        if claimed is None:
+            return Response({'kind': None, 'claimed_until': None, 'item': None})
+
+        kind, item = claimed
+        serializer_class = ProjectSerializer if kind == 'project' else StageSerializer
+        serializer = serializer_class(item, context=self.get_serializer_context())
+        return Response({'kind': kind, 'claimed_until': item.claimed_until, 'item': serializer.data})
+
+    @action(detail=False, methods=['post'])
+    def release_claim(self, request):
+        """Вернуть взятую работу в очередь: {"kind": "project"|"stage", "id": 1}"""
+        kind = request.data.get('kind')
+        if kind not in review_queue.QUEUE_MODELS:
+            return Response(
+                {'error': f'kind: {", ".join(review_queue.QUEUE_MODELS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            pk = int(request.data.get('id'))
+        except (TypeError, ValueError):
+            return Response({'error': 'Укажите id работы'}, status=status.HTTP_400_BAD_REQUEST)
+        if not review_queue.release(request.user, kind, pk):
+            return Response(
+                {'error': 'Эта работа не закреплена за вами'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response({'kind': kind, 'id': pk, 'released': True})
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Ход выполнения по всем проектам и итоги.
+
+        Сводка хранится в строке проекта, поэтому ответ - один запрос без
+        обхода этапов и задач. ?status=approved - только проекты с этим статусом.
+        """
+        projects = Project.objects.order_by('team__name', 'id')
+        if request.query_params.get('status'):
+            projects = projects.filter(status=request.query_params['status'])
+
+        rows = []
+        totals = dict.fromkeys(PROGRESS_FIELDS, 0)
+        for project in projects.values('id', 'name', 'status', 'team_id', 'team__name', *PROGRESS_FIELDS):
+            rows.append({
+                'id': project['id'],
+                'name': project['name'],
+                'status': project['status'],
+                'team': project['team_id'],
+                'team_name': project['team__name'],
+                **{field: project[field] for field in PROGRESS_FIELDS},
+            })
+            for field in PROGRESS_FIELDS:
+                totals[field] += project[field]
+        totals['projects'] = len(rows)
+        totals['projects_with_overdue'] = sum(1 for row in rows if row['tasks_overdue'])
+        return Response({'totals': totals, 'projects': rows})
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Аналитика потока по журналу смены статусов.
+
+        Время карточек в колонках, ожидание проверки этапов (медиана, p90,
+        гистограмма) и выполненные задачи по неделям - по командам и по всем.
+        ?weeks=8 - число недель пропускной способности (1-52).
+        """
+        try:
+            weeks = int(request.query_params.get('weeks', analytics.DEFAULT_WEEKS))
+        except ValueError:
+            weeks = 0
+        if not 1 <= weeks <= analytics.MAX_WEEKS:
+            return Response(
+                {'error': f'weeks - целое число от 1 до {analytics.MAX_WEEKS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(analytics.flow_analytics(weeks))
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_projects(self, request):
+        """
+        Сводка по всем проектам в CSV или JSONL.
+
+        ?export_format=csv|jsonl, ?columns=id,name,status,... (по умолчанию все),
+        ?status=submitted - только проекты с этим статусом.
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in exports.EXPORT_FORMATS:
+            return Response(
+                {'error': f'Формат выгрузки: {", ".join(exports.EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        columns = [column for column in request.query_params.get('columns', '').split(',') if column]
+        columns = columns or list(exports.PROJECT_EXPORT_COLUMNS)
+        unknown = [column for column in columns if column not in exports.PROJECT_EXPORT_COLUMNS]
+        if unknown:
+            return Response(
+                {'error': f'Неизвестные колонки: {", ".join(unknown)}',
+                 'available_columns': list(exports.PROJECT_EXPORT_COLUMNS)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filters = {}
+        if request.query_params.get('status'):
+            filters['status'] = request.query_params['status']
+
+        queryset = exports.get_projects_for_export(filters)
+        response = StreamingHttpResponse(
+            exports.stream_projects_export(queryset, columns, export_format),
+            content_type=exports.EXPORT_FORMATS[export_format]
+        )
+        filename = f'projects-{timezone.localdate():%Y-%m-%d}.{export_format}'
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet для возобновляемой загрузки файлов по частям.
+
+    POST uploads/ создает сессию, PUT uploads/{id}/chunk/?offset=N принимает
+    очередную часть (тело запроса - байты файла), POST uploads/{id}/finalize/
+    проверяет SHA-256 и прикрепляет файл к объекту.
+
+    С объектным хранилищем (MEDIA_STORAGE=s3) по умолчанию создается сессия
+    mode=direct: в ответе есть upload_url и upload_headers, клиент загружает
+    файл одним PUT прямо в хранилище и затем вызывает finalize.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    # Сериализаторы объектов, к которым прикрепляется загруженный файл
+    target_serializers = {
+        'project_file': ProjectFileSerializer,
+        'card_file': KanbanCardFileSerializer,
+        'stage_artifact': StageSerializer,
+        'project_passport': ProjectSerializer,
+    }
+
+    def get_queryset(self):
+        """Пользователь видит только свои сессии загрузки"""
+        return UploadSession.objects.filter(created_by=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # Проверяем доступ к объекту, к которому будет прикреплен файл
+        uploads.get_upload_target(data['target'], data['target_id'], request.user)
+        mode = data.get('mode') or ('direct' if object_storage.is_enabled() else 'chunked')
+        session = UploadSession(**dict(data, mode=mode), created_by=request.user)
+
+        response_data = {}
+        if mode == 'direct':
+            uploads.prepare_direct_upload(session, request.user)
+            upload_url, upload_headers = object_storage.presign_upload(session.object_name, session.checksum)
+            response_data = {
+                'upload_url': upload_url,
+                'upload_method': 'PUT',
+                'upload_headers': upload_headers,
+                'upload_expires_in': settings.S3_PRESIGNED_URL_EXPIRES,
+            }
+        session.save()
+
+        response_data.update(self.get_serializer(session).data)
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        uploads.discard_session(instance)
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """Принять часть файла по смещению offset"""
+        try:
+            offset = int(request.query_params.get('offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'offset обязателен'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+            return Response(
+                {'error': f'Максимальный размер части {settings.UPLOAD_CHUNK_MAX_SIZE} байт'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        with transaction.atomic():
+            session = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+
+            if session.mode == 'direct':
+                return Response(
+                    {'error': 'Файл этой сессии загружается напрямую в хранилище'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Часть должна продолжать уже полученные данные, иначе клиент
+            # запрашивает сессию и продолжает с received
+            if offset != session.received:
+                return Response(
+                    {'error': 'Неверное смещение', 'received': session.received},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if offset + length > session.size:
+                return Response(
+                    {'error': 'Часть выходит за размер файла'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            session.received = uploads.write_chunk(session, offset, request.stream, length)
+            session.save(update_fields=['received', 'updated_at'])
+
+        serializer = self.get_serializer(session)
         return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Проверить файл и прикрепить его к объекту"""
+        session = self.get_object()
+
+        if session.mode == 'direct':
+            return self.finalize_direct(request, session)
+
+        if session.received != session.size:
+            return Response(
+                {'error': 'Файл загружен не полностью', 'received': session.received},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if uploads.get_file_checksum(uploads.get_session_path(session)) != session.checksum:
+            uploads.discard_session(session)
+            return Response(
+                {'error': 'Контрольная сумма не совпадает, загрузите файл заново'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            instance = uploads.finalize_session(session, request.user)
+            session.delete()
+
+        return self.target_response(session, instance)
+
+    def finalize_direct(self, request, session):
+        """Проверить объект, загруженный напрямую в хранилище"""
+        head = object_storage.head_object(session.object_name)
+        if head is None:
+            return Response(
+                {'error': 'Файл еще не загружен в хранилище'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        size, checksum = head
+        if size != session.size:
+            uploads.discard_session(session)
+            return Response(
+                {'error': 'Размер файла не совпадает, загрузите файл заново'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if checksum is None:
+            checksum = object_storage.get_object_checksum(session.object_name)
+        if checksum != session.checksum:
+            uploads.discard_session(session)
+            return Response(
+                {'error': 'Контрольная сумма не совпадает, загрузите файл заново'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            instance = uploads.finalize_direct_session(session, request.user)
+            session.delete()
+
+        return self.target_response(session, instance)
+
+    def target_response(self, session, instance):
+        serializer_class = self.target_serializers[session.target]
+        serializer = serializer_class(instance, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
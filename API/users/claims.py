@@ -0,0 +1,73 @@
+"""
+Активация аккаунтов из импорта списка студентов (projects/roster.py).
+
+Импорт создает пользователей без пароля с отметкой pending_claim и ставит
+в очередь письма с одноразовым кодом приглашения. Задать пароль такому
+аккаунту можно только с этим кодом (POST /api/auth/users/claim/): код
+доказывает, что студент владеет почтой. Остальные аккаунты, в том числе с
+непригодным паролем, заняты - их email при регистрации не принимается.
+
+В базе хранится только SHA-256 кода; новое письмо заменяет прежний код.
+"""
+import hashlib
+import secrets
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mass_mail
+from django.db import transaction
+
+User = get_user_model()
+
+CLAIM_SUBJECT = 'Активация аккаунта ProjectHelper'
+CLAIM_MESSAGE = (
+    'Здравствуйте!\n\n'
+    'Преподаватель добавил вас в ProjectHelper. Чтобы задать пароль и войти, перейдите по ссылке:\n'
+    '{url}\n\n'
+    'Код приглашения: {token}\n'
+    'Если вы не ждали этого письма, просто проигнорируйте его.\n'
+)
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def send_claim_invites(emails):
+    """Выдает новые коды приглашения неактивированным аккаунтам emails и отправляет письма"""
+    with transaction.atomic():
+        users = list(User.objects.select_for_update().filter(email__in=emails, pending_claim=True))
+        tokens = {}
+        for user in users:
+            tokens[user.pk] = secrets.token_urlsafe(32)
+            user.claim_token_hash = hash_token(tokens[user.pk])
+        User.objects.bulk_update(users, ['claim_token_hash'])
+
+    messages = []
+    for user in users:
+        url = f"{settings.ACCOUNT_CLAIM_URL}?{urlencode({'email': user.email, 'token': tokens[user.pk]})}"
+        message = CLAIM_MESSAGE.format(url=url, token=tokens[user.pk])
+        messages.append((CLAIM_SUBJECT, message, settings.DEFAULT_FROM_EMAIL, [user.email]))
+    # Одно соединение с почтовым сервером на все письма
+    send_mass_mail(messages, fail_silently=False)
+    return len(messages)
+
+
+def claim_account(email, token, password, first_name='', last_name=''):
+    """Задает пароль аккаунту из импорта по коду приглашения; None, если код не подходит"""
+    if not token:
+        return None
+    with transaction.atomic():
+        user = User.objects.select_for_update().filter(
+            email__iexact=email, pending_claim=True, claim_token_hash=hash_token(token)
+        ).first()
+        if user is None:
+            return None
+        user.set_password(password)
+        user.first_name = first_name or user.first_name
+        user.last_name = last_name or user.last_name
+        user.pending_claim = False
+        user.claim_token_hash = ''
+        user.save()
+    return user
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_remove_user_yandex_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Уменьшенные копии аватара'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_squashed_0003_user_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='claim_token_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='SHA-256 кода приглашения'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='pending_claim',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Ожидает активации'),
+        ),
+    ]
@@ -6,8 +6,12 @@ class User(AbstractUser):
     """Кастомная модель пользователя"""
     email = models.EmailField(unique=True, verbose_name='Email')
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True, verbose_name='Аватар')
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Уменьшенные копии аватара')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+    # Аккаунт из импорта списка студентов, который студент еще не занял (см. users/claims.py)
+    pending_claim = models.BooleanField(default=False, editable=False, verbose_name='Ожидает активации')
+    claim_token_hash = models.CharField(max_length=64, blank=True, editable=False, verbose_name='SHA-256 кода приглашения')
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -2,24 +2,30 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 
+from projects.serializers import AvatarThumbnailsField
+from .claims import claim_account
+
 User = get_user_model()
 
 
 class UserSerializer(serializers.ModelSerializer):
     """Сериализатор пользователя"""
+    avatar_thumbnails = AvatarThumbnailsField()
     
     class Meta:
         model = User
-        fields = ['id', 'email', 'first_name', 'last_name', 'avatar', 'date_joined']
+        fields = ['id', 'email', 'first_name', 'last_name', 'avatar', 'avatar_thumbnails', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Сериализатор профиля пользователя"""
+    avatar_thumbnails = AvatarThumbnailsField()
     
     class Meta:
         model = User
-        fields = ['id', 'email', 'username', 'first_name', 'last_name', 'avatar', 'date_joined', 'is_staff']
+        fields = ['id', 'email', 'username', 'first_name', 'last_name', 'avatar', 'avatar_thumbnails',
+                  'date_joined', 'is_staff']
         read_only_fields = ['id', 'email', 'username', 'date_joined', 'is_staff']
 
 
@@ -94,6 +100,33 @@ class TeacherRegisterSerializer(RegisterSerializer):
         return user
 
 
+class ClaimAccountSerializer(serializers.Serializer):
+    """Сериализатор для активации аккаунта из импорта списка по коду приглашения"""
+    email = serializers.EmailField(required=True)
+    invite_token = serializers.CharField(write_only=True, required=True, label='Код приглашения')
+    password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
+    password2 = serializers.CharField(write_only=True, required=True, label='Подтверждение пароля')
+    first_name = serializers.CharField(required=False, allow_blank=True, max_length=150)
+    last_name = serializers.CharField(required=False, allow_blank=True, max_length=150)
+
+    def validate(self, attrs):
+        if attrs['password'] != attrs['password2']:
+            raise serializers.ValidationError({"password": "Пароли не совпадают"})
+        return attrs
+
+    def create(self, validated_data):
+        user = claim_account(
+            validated_data['email'],
+            validated_data['invite_token'],
+            validated_data['password'],
+            validated_data.get('first_name', ''),
+            validated_data.get('last_name', ''),
+        )
+        if user is None:
+            raise serializers.ValidationError({"invite_token": "Приглашение недействительно или уже использовано"})
+        return user
+
+
 class LoginSerializer(serializers.Serializer):
     """Сериализатор для входа"""
     email = serializers.EmailField(required=True)
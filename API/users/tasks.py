@@ -0,0 +1,11 @@
+"""
+Фоновые задачи приложения users (выполняются manage.py run_worker).
+"""
+from jobs.queue import task
+
+from . import claims
+
+
+@task('users.send_claim_invites')
+def send_claim_invites(emails):
+    claims.send_claim_invites(emails)
@@ -0,0 +1,138 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from jobs.queue import claim_jobs, run_job
+from projects.cache import check_shared_cache
+from projects.models import TeamMember
+from projects.tests.utils import make_project, make_team, make_user
+
+User = get_user_model()
+
+
+class BootstrapCacheTests(APITestCase):
+    def setUp(self):
+        self.first = make_user()
+        self.second = make_user()
+        self.teacher = make_user(is_staff=True)
+        self.project = make_project(make_team(self.first))
+        make_project(make_team(self.second))
+
+    def get_etag(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/auth/users/bootstrap/')
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_not_modified(self):
+        etag = self.get_etag(self.first)
+        response = self.client.get('/api/auth/users/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_invalidates_only_team_members_and_teachers(self):
+        etags = {user.pk: self.get_etag(user) for user in (self.first, self.second, self.teacher)}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.description = 'Новое описание'
+            self.project.save()
+        self.assertNotEqual(self.get_etag(self.first), etags[self.first.pk])
+        self.assertEqual(self.get_etag(self.second), etags[self.second.pk])
+        self.assertNotEqual(self.get_etag(self.teacher), etags[self.teacher.pk])
+
+    def test_removed_member_is_invalidated(self):
+        team = make_team(members=[self.second])
+        etag = self.get_etag(self.second)
+        with self.captureOnCommitCallbacks(execute=True):
+            team.team_members.filter(user=self.second).get().delete()
+        response = self.client.get('/api/auth/users/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(team.pk, [member['team_id'] for member in response.data['teams']])
+
+
+class SharedCacheCheckTests(APITestCase):
+    @override_settings(DEBUG=False, CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_is_error(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ['projects.E001'])
+        with self.assertRaises(SystemCheckError):
+            call_command('check')
+
+    @override_settings(DEBUG=True, CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_allowed_with_debug(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class ClaimAccountTests(APITestCase):
+    email = 'student@dvfu.ru'
+
+    def setUp(self):
+        self.teacher = make_user(is_staff=True)
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post('/api/projects/teams/import/', {'rows': [
+            {'email': self.email, 'first_name': 'Иван', 'team': 'Команда 1', 'role': 'team_leader'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['invites_sent'], 1)
+        self.client.force_authenticate(None)
+
+    def send_invites(self):
+        for job in claim_jobs('test', 10):
+            self.assertTrue(run_job(job))
+        return re.search(r'Код приглашения: (\S+)', mail.outbox[-1].body).group(1)
+
+    def claim(self, token, email=None):
+        return self.client.post('/api/auth/users/claim/', {
+            'email': email or self.email, 'invite_token': token,
+            'password': 'Secret-password-1', 'password2': 'Secret-password-1',
+        }, format='json')
+
+    def register(self, url='/api/auth/users/register/', **extra):
+        return self.client.post(url, {
+            'email': self.email, 'password': 'Secret-password-1', 'password2': 'Secret-password-1', **extra,
+        }, format='json')
+
+    def test_imported_account_is_claimed_with_token(self):
+        token = self.send_invites()
+        self.assertEqual(mail.outbox[-1].to, [self.email])
+        self.assertEqual(self.claim('wrong-token').status_code, 400)
+
+        response = self.claim(token)
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(email=self.email)
+        self.assertTrue(user.check_password('Secret-password-1'))
+        self.assertFalse(user.pending_claim)
+        self.assertEqual(response.data['user']['id'], user.pk)
+        # Код одноразовый
+        self.assertEqual(self.claim(token).status_code, 400)
+
+    def test_reimport_replaces_token(self):
+        first = self.send_invites()
+        self.client.force_authenticate(self.teacher)
+        self.client.post('/api/projects/teams/import/', {'rows': [{'email': self.email}]}, format='json')
+        self.client.force_authenticate(None)
+        second = self.send_invites()
+        self.assertEqual(self.claim(first).status_code, 400)
+        self.assertEqual(self.claim(second).status_code, 200)
+
+    def test_register_cannot_take_imported_account(self):
+        self.send_invites()
+        self.assertEqual(self.register().status_code, 400)
+        self.assertEqual(
+            self.register('/api/auth/users/register_teacher/', teacher_key='teacher-secret-key-change-in-production')
+            .status_code, 400
+        )
+        user = User.objects.get(email=self.email)
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(TeamMember.objects.filter(user=user, role='team_leader').exists())
+
+    def test_account_without_password_is_not_claimable(self):
+        user = make_user(email='locked@dvfu.ru')
+        user.set_unusable_password()
+        user.save()
+        self.assertEqual(self.register(email='locked@dvfu.ru').status_code, 400)
+        self.assertEqual(self.claim('', email='locked@dvfu.ru').status_code, 400)
+        user.refresh_from_db()
+        self.assertFalse(user.has_usable_password())
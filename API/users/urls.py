@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from projects.async_views import current_user
 from .views import UserViewSet
 
 router = DefaultRouter()
@@ -7,4 +8,5 @@ router.register(r'users', UserViewSet, basename='user')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('async/users/me/', current_user, name='async-user-me'),
 ]
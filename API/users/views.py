@@ -1,12 +1,19 @@
+import hashlib
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
+from django.core.cache import cache
 from rest_framework.authtoken.models import Token
+from projects.cache import get_data_version
+from projects.models import TeamMember, Project, Stage
+from projects.progress import PROGRESS_FIELDS
 from .serializers import (
     UserSerializer, UserProfileSerializer, 
-    RegisterSerializer, TeacherRegisterSerializer, LoginSerializer
+    RegisterSerializer, TeacherRegisterSerializer, LoginSerializer, ClaimAccountSerializer
 )
 
 User = get_user_model()
@@ -28,6 +35,81 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = UserProfileSerializer(request.user)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def bootstrap(self, request):
+        """Все данные для первого экрана одним запросом (кэшируется по версии данных пользователя)"""
+        user = request.user
+        version = get_data_version(user.pk, is_teacher=user.is_staff or getattr(user, 'is_teacher', False))
+        cache_key = f'bootstrap:{user.pk}:{user.updated_at.timestamp()}:{version}'
+        etag = '"%s"' % hashlib.md5(cache_key.encode()).hexdigest()
+
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = cache.get(cache_key)
+            if data is None:
+                data = self.get_bootstrap_data(request)
+                cache.set(cache_key, data, settings.BOOTSTRAP_CACHE_TIMEOUT)
+            response = Response(data)
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def get_bootstrap_data(self, request):
+        """Собирает профиль, команды, проекты и очередь проверки фиксированным числом запросов"""
+        user = request.user
+        is_teacher = user.is_staff or getattr(user, 'is_teacher', False)
+
+        memberships = [
+            {
+                'team_id': member['team_id'],
+                'team_name': member['team__name'],
+                'role': member['role'],
+                'is_confirmed': member['is_confirmed'],
+                'joined_at': member['joined_at'],
+            }
+            for member in TeamMember.objects.filter(user=user).values(
+                'team_id', 'team__name', 'role', 'is_confirmed', 'joined_at'
+            )
+        ]
+
+        projects = Project.objects.all()
+        if not is_teacher:
+            confirmed_teams = [member['team_id'] for member in memberships if member['is_confirmed']]
+            projects = projects.filter(team_id__in=confirmed_teams)
+        project_summaries = [
+            {
+                'id': project['id'],
+                'name': project['name'],
+                'status': project['status'],
+                'team_id': project['team_id'],
+                'team_name': project['team__name'],
+                'kanban_column': project['kanban_column'],
+                'order': project['order'],
+                'submitted_at': project['submitted_at'],
+                'updated_at': project['updated_at'],
+                # Сводка хранится в строке проекта, этапы и задачи не читаются
+                'progress': {field: project[field] for field in PROGRESS_FIELDS},
+            }
+            for project in projects.values(
+                'id', 'name', 'status', 'team_id', 'team__name', 'kanban_column',
+                'order', 'submitted_at', 'updated_at', *PROGRESS_FIELDS
+            )
+        ]
+
+        data = {
+            'user': UserProfileSerializer(user, context={'request': request}).data,
+            'teams': memberships,
+            'projects': project_summaries,
+        }
+        if is_teacher:
+            data['pending_review'] = {
+                'projects': Project.objects.filter(status='submitted').count(),
+                'stages': Stage.objects.filter(status='submitted').count(),
+            }
+        return data
+
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def register(self, request):
         """Регистрация нового пользователя"""
@@ -41,6 +123,19 @@ class UserViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    def claim(self, request):
+        """Активация аккаунта из импорта списка студентов по коду приглашения из письма"""
+        serializer = ClaimAccountSerializer(data=request.data)
+        if serializer.is_valid():
+            user = serializer.save()
+            token, created = Token.objects.get_or_create(user=user)
+            return Response({
+                'token': token.key,
+                'user': UserProfileSerializer(user).data
+            })
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def login(self, request):
         """Вход пользователя"""